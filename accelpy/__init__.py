@@ -25,13 +25,68 @@ if (_py[0] < 3) or (_py[0] == 3 and _py[1] < 6):
     from sys import version
     raise ImportError(
         'Accelpy require Python 3.6 or more (Currently %s)' % version)
-del _py
 
-from accelpy._host import Host, iter_hosts
+__all__ = ['Host', 'iter_hosts', 'JobQueue', 'execute', 'push_files',
+           'exceptions']
+
+
+def _import_public(name):
+    """
+    Import a public object and makes cleaner namespace.
+
+    Args:
+        name (str): Object name.
+
+    Returns:
+        object: Public object.
+    """
+    if name == 'exceptions':
+        from importlib import import_module
+        return import_module('accelpy.exceptions')
+
+    if name == 'JobQueue':
+        from accelpy import _jobs as module
+    elif name == 'execute':
+        from accelpy import _ssh as module
+    elif name == 'push_files':
+        from accelpy import _distribute as module
+    else:
+        from accelpy import _host as module
+    value = getattr(module, name)
+    value.__module__ = __name__
+    globals()[name] = value
+    return value
+
 
-__all__ = ['Host', 'iter_hosts', 'exceptions']
+if _py[0] == 3 and _py[1] < 7:
+    # Module "__getattr__" not supported (PEP 562)
+    for _name in __all__:
+        _import_public(_name)
+    del _name
 
-# Makes cleaner namespace
-for _name in __all__:
-    locals()[_name].__module__ = __name__
-del _name
+else:
+    def __getattr__(name):
+        """
+        Import public objects on first access, to speed up "import accelpy"
+        (PEP 562).
+
+        Args:
+            name (str): Attribute name.
+
+        Returns:
+            object: Attribute value.
+        """
+        if name in __all__:
+            return _import_public(name)
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    def __dir__():
+        """
+        Module attributes, including public objects not imported yet.
+
+        Returns:
+            list of str: Attributes names.
+        """
+        return sorted(set(globals()) | set(__all__))
+
+del _py
@@ -4,46 +4,76 @@
 """Command line interface"""
 
 
-def _host(args, init=False, **kwargs):
+def _host_name(args):
     """
-    Return Host instance.
+    Return the name of an existing host configuration.
 
     Args:
         args (argparse.Namespace): CLI arguments.
-        kwargs: accelpy._host.Host keyword arguments.
 
     Returns:
-        accelpy._host.Host: Host instance.
+        str: Host name.
     """
     from os.path import join, isfile, isdir
-
-    from accelpy import Host
     from accelpy._common import HOME_DIR
 
     name = args.name
     latest_path = join(HOME_DIR, 'hosts/latest')
 
+    if not name and isfile(latest_path):
+        # Use latest used name if "--name" not specified
+        with open(latest_path, 'rt') as latest_file:
+            latest = latest_file.read()
+
+        if isdir(join(HOME_DIR, 'hosts', latest)):
+            name = latest
+
+    if not name:
+        raise OSError(f'A new configuration needs to be created first with '
+                      f'"init", or an existing configuration must be '
+                      f'specified with "--name".')
+
+    elif name and not isdir(join(HOME_DIR, 'hosts', name)):
+        raise OSError(f'No configuration named "{name}".')
+
+    return name
+
+
+def _set_latest(name):
+    """
+    Save name as latest used host name.
+
+    Args:
+        name (str): Host name.
+    """
+    from os.path import join
+    from accelpy._common import HOME_DIR
+
+    with open(join(HOME_DIR, 'hosts/latest'), 'wt') as latest_file:
+        latest_file.write(name)
+
+
+def _host(args, init=False, **kwargs):
+    """
+    Return Host instance.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+        kwargs: accelpy._host.Host keyword arguments.
+
+    Returns:
+        accelpy._host.Host: Host instance.
+    """
+    from accelpy import Host
+
     if init:
         # Create a new configuration
+        name = args.name
         kwargs.update(dict(application=args.application, provider=args.provider,
                            user_config=args.user_config))
     else:
         # Load an existing configuration
-        if not name and isfile(latest_path):
-            # Use latest used name if "--name" not specified
-            with open(latest_path, 'rt') as latest_file:
-                latest = latest_file.read()
-
-            if isdir(join(HOME_DIR, 'hosts', latest)):
-                name = latest
-
-        if not name:
-            raise OSError(f'A new configuration needs to be created first with '
-                          f'"init", or an existing configuration must be '
-                          f'specified with "--name".')
-
-        elif name and not isdir(join(HOME_DIR, 'hosts', name)):
-            raise OSError(f'No configuration named "{name}".')
+        name = _host_name(args)
 
     # Create host object
     host = Host(name=name, **kwargs)
@@ -51,10 +81,7 @@ def _host(args, init=False, **kwargs):
     if not name:
         print(host.name)
 
-    # Save name as latest used name
-    with open(latest_path, 'wt') as latest_file:
-        latest_file.write(host.name)
-
+    _set_latest(host.name)
     return host
 
 
@@ -124,6 +151,31 @@ def _action_destroy(args):
     return _host(args, keep_config=not args.delete).destroy(quiet=args.quiet)
 
 
+def _action_ssh(args):
+    """
+    Connect to the host with SSH, or close its SSH master connections.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: command output.
+    """
+    from accelpy._ssh import close_master, get_connection, ssh_command
+
+    name = _host_name(args)
+    if args.close:
+        closed = close_master(name)
+        return f'{closed} SSH master connection(s) closed.'
+
+    from subprocess import run
+    returncode = run(ssh_command(
+        get_connection(name, args.private_ip), args.command,
+        persist=args.persist)).returncode
+    if returncode:
+        raise SystemExit(returncode)
+
+
 def _action_ssh_private_key(args):
     """
     accelpy._host.ssh_private_key.
@@ -187,15 +239,287 @@ def _action_list(_):
     return '\n'.join(_iter_hosts_names())
 
 
+def _action_exec(args):
+    """
+    Run a command on hosts over SSH.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+    """
+    from sys import stderr
+    from accelpy._ssh import execute, format_summary
+    from accelpy.exceptions import RuntimeException
+
+    results = execute(args.command, hosts=args.hosts, max_workers=args.jobs,
+                      private_ip=args.private_ip, timeout=args.timeout)
+    print(format_summary(results), file=stderr)
+
+    failed = sum(1 for result in results
+                 if result['returncode'] or result['error'])
+    if failed:
+        raise RuntimeException(
+            f'Command failed on {failed}/{len(results)} host(s).')
+
+
+def _action_push_files(args):
+    """
+    Distribute files to hosts over SSH.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+    """
+    from sys import stderr
+    from accelpy._distribute import format_summary, push_files
+    from accelpy.exceptions import RuntimeException
+
+    results = push_files(
+        args.file, destination=args.destination, hosts=args.hosts,
+        seeds=args.seeds, fanout=args.fanout, retries=args.retries)
+    print(format_summary(results), file=stderr)
+
+    failed = sum(1 for result in results if result['error'])
+    if failed:
+        raise RuntimeException(
+            f'Files distribution failed on {failed}/{len(results)} host(s).')
+
+
+def _action_inventory(args):
+    """
+    Return the Ansible dynamic inventory of hosts.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: Inventory in JSON format.
+    """
+    from json import dumps
+    from accelpy._inventory import get_host_variables, get_inventory
+
+    if args.host:
+        return dumps(get_host_variables(args.host, args.private_ip), indent=2,
+                     sort_keys=True)
+    return dumps(get_inventory(args.hosts, args.private_ip), indent=2,
+                 sort_keys=True)
+
+
+# Commands that run on the provisioning server if "ACCELPY_SERVER" is set
+_REMOTE_ACTIONS = ('init', 'plan', 'apply', 'build', 'destroy',
+                   'ssh_private_key', 'ssh_user', 'private_ip', 'public_ip',
+                   'list')
+
+
+def _action_serve(args):
+    """
+    Run the provisioning server.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+    """
+    from signal import signal, SIGTERM
+    from accelpy._server import Server
+
+    def terminate(*_):
+        """Stop the server on SIGTERM"""
+        raise KeyboardInterrupt
+
+    signal(SIGTERM, terminate)
+    if args.metrics:
+        from accelpy._metrics import start_http_server
+        start_http_server(args.metrics)
+
+    server = Server(address=args.address, max_jobs=args.jobs,
+                    verbose=args.verbose)
+    print(f'Serving on "{server.address}".', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def _remote_action(address, args):
+    """
+    Run a command on the provisioning server.
+
+    Args:
+        address (str): Server address.
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: command output.
+    """
+    from os.path import abspath, exists
+    from accelpy._server import Client, HOST_OUTPUTS
+
+    client = Client(address)
+    action = args.action
+
+    if action == 'list':
+        return '\n'.join(client.list_hosts())
+
+    elif action == 'init':
+        # Paths are relative to the client working directory
+        application = args.application
+        if application and exists(application):
+            application = abspath(application)
+        user_config = abspath(args.user_config) if args.user_config else None
+
+        name = client.run(
+            'init', args.name, application=application,
+            provider=args.provider, user_config=user_config)
+        _set_latest(name)
+        return name if not args.name else None
+
+    name = _host_name(args)
+    _set_latest(name)
+
+    if action in HOST_OUTPUTS:
+        output = client.get_outputs(name)[action]
+        if output is None:
+            from accelpy.exceptions import ConfigurationException
+            raise ConfigurationException('Configuration not applied.')
+        return output
+
+    elif action == 'plan':
+        return client.run(action, name)
+
+    elif action == 'build':
+        return client.run(action, name, quiet=args.quiet,
+                          update_application=args.update_application)
+
+    elif action == 'destroy':
+        return client.run(action, name, quiet=args.quiet, delete=args.delete)
+
+    return client.run(action, name, quiet=args.quiet)
+
+
 def _action_lint(args):
     """
-    Lint application definition.
+    Lint application definitions.
 
     Args:
         args (argparse.Namespace): CLI arguments.
     """
-    from accelpy._application import Application
-    Application(args.file)
+    from accelpy._application import lint
+    from accelpy.exceptions import ConfigurationException
+
+    paths = _list_yaml_files(args.file)
+    if not paths:
+        raise ConfigurationException('No application definition file found.')
+
+    # Lint files in parallel if more than one
+    if len(paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from os import cpu_count
+
+        jobs = args.jobs or cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            errors = list(executor.map(
+                lint, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+    else:
+        errors = [lint(path) for path in paths]
+
+    results = list(zip(paths, errors))
+    report = _LINT_REPORTS[args.format](results)
+    if report:
+        print(report)
+
+    invalid = sum(1 for error in errors if error)
+    if invalid:
+        raise ConfigurationException(
+            f'{invalid}/{len(paths)} application definition(s) are invalid.')
+
+
+def _list_yaml_files(paths):
+    """
+    List YAML files from paths, directories and glob patterns.
+
+    Args:
+        paths (iterable of str): Paths, directories or glob patterns.
+
+    Returns:
+        list of str: YAML files paths.
+    """
+    from glob import glob
+    from os import walk
+    from os.path import isdir, join, splitext
+
+    files = []
+    for path in paths:
+
+        # Directory: Add all YAML files recursively
+        if isdir(path):
+            for root, _, names in walk(path):
+                files.extend(sorted(
+                    join(root, name) for name in names
+                    if splitext(name)[1].lower() in ('.yml', '.yaml')))
+
+        # Glob pattern
+        elif any(char in path for char in '*?['):
+            files.extend(sorted(glob(path, recursive=True)))
+
+        # Single file
+        else:
+            files.append(path)
+
+    return files
+
+
+def _lint_report_text(results):
+    """
+    Lint report as text.
+
+    Args:
+        results (list of tuple): Path and error message (or None) pairs.
+
+    Returns:
+        str: report.
+    """
+    from accelpy._common import error
+    return '\n'.join(f'{path}: {error(message)}'
+                     for path, message in results if message)
+
+
+def _lint_report_json(results):
+    """
+    Lint report as JSON.
+
+    Args:
+        results (list of tuple): Path and error message (or None) pairs.
+
+    Returns:
+        str: report.
+    """
+    from json import dumps
+    return dumps([dict(file=path, valid=not message, error=message)
+                  for path, message in results], indent=2)
+
+
+def _lint_report_junit(results):
+    """
+    Lint report as JUnit XML.
+
+    Args:
+        results (list of tuple): Path and error message (or None) pairs.
+
+    Returns:
+        str: report.
+    """
+    from xml.etree.ElementTree import Element, SubElement, tostring
+
+    suite = Element('testsuite', name='accelpy lint', tests=str(len(results)),
+                    failures=str(sum(1 for _, message in results if message)))
+    for path, message in results:
+        case = SubElement(suite, 'testcase', classname='accelpy.lint',
+                          name=path)
+        if message:
+            SubElement(case, 'failure', message=message).text = message
+
+    return tostring(suite, encoding='unicode')
+
+
+_LINT_REPORTS = dict(
+    text=_lint_report_text, json=_lint_report_json, junit=_lint_report_junit)
 
 
 def _action_push(args):
@@ -254,6 +578,10 @@ def _yaml_completer(prefix, parsed_args, **__):
                 yield path
 
 
+# Maximum number of values returned by completion from web service
+_COMPLETION_LIMIT = 100
+
+
 def _get_cached_app(prefix, name, after, getter):
     """
     Get from cache if available, else get from web server.
@@ -267,15 +595,18 @@ def _get_cached_app(prefix, name, after, getter):
     Returns:
         iterable of str:
     """
-    from itertools import chain
-    from accelpy._common import get_cli_cache, set_cli_cache
+    from itertools import chain, islice
+    from accelpy._common import get_cli_cache
 
     cached = f'{name}|{prefix}'
     values = get_cli_cache(cached, recursive=True)
 
     # If no cached values, get from web server then cache values
     if not values:
-        values = set_cli_cache(cached, list(getter(prefix)))
+        values = _iter_and_cache(cached, getter(prefix))
+
+        # Get first value now to raise web server errors here
+        values = chain(list(islice(values, 1)), values)
 
     # If cached values, filter before return
     else:
@@ -284,6 +615,32 @@ def _get_cached_app(prefix, name, after, getter):
     return chain(after, values)
 
 
+def _iter_and_cache(name, values):
+    """
+    Yield values from web server, and cache them once all retrieved.
+
+    Stop once "_COMPLETION_LIMIT" values are returned. In this case, values
+    are not cached since incomplete.
+
+    Args:
+        name (str): Cache name to use.
+        values (iterable of str): Values.
+
+    Yields:
+        str: value
+    """
+    from accelpy._common import set_cli_cache
+
+    to_cache = []
+    for value in values:
+        if len(to_cache) == _COMPLETION_LIMIT:
+            return
+        to_cache.append(value)
+        yield value
+
+    set_cli_cache(name, to_cache)
+
+
 def _get_product_ids(prefix):
     """
     Get products IDs from web server.
@@ -292,10 +649,10 @@ def _get_product_ids(prefix):
         prefix (str): Application prefix to filter.
 
     Returns:
-        list of str: Product ids.
+        generator of str: Product ids.
     """
     from accelpy._application import Application
-    return Application.list(prefix)
+    return Application.iter_list(prefix, prefetch=True)
 
 
 def _get_versions(prefix):
@@ -306,12 +663,13 @@ def _get_versions(prefix):
         prefix (str): Application prefix to filter.
 
     Returns:
-        list of str: Versions.
+        generator of str: Versions.
     """
     from accelpy._application import Application
     product_id, version_prefix = prefix.split(':', 1)
     return (f"{product_id}:{version}" for version in
-            Application.list_versions(product_id, version_prefix))
+            Application.iter_versions(
+                product_id, version_prefix, prefetch=True))
 
 
 def _application_completer(prefix, parsed_args, **__):
@@ -393,6 +751,66 @@ def _provider_completer(prefix, parsed_args, **_):
     return (provider for provider in providers if provider.startswith(prefix))
 
 
+def _run_action(action, args):
+    """
+    Run a command, on the provisioning server if the "ACCELPY_SERVER"
+    environment variable is set.
+
+    Args:
+        action (str): Command.
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: command output.
+    """
+    from os import environ
+
+    server = environ.get('ACCELPY_SERVER')
+    if server and action in _REMOTE_ACTIONS:
+        return _remote_action(server, args)
+    return globals()[f'_action_{action}'](args)
+
+
+def _profile_path(action):
+    """
+    Return the default profile reports path.
+
+    Args:
+        action (str): Command.
+
+    Returns:
+        str: Reports path without extension.
+    """
+    from time import strftime
+    return f'accelpy-profile-{action}-{strftime("%Y%m%d-%H%M%S")}'
+
+
+def _profile_argv(argv, actions):
+    """
+    Handle "--profile" without value followed by the command name, that
+    argparse would otherwise use as the path.
+
+    Only arguments before the command name are checked, so commands arguments
+    are never changed.
+
+    Args:
+        argv (list of str): Command line arguments.
+        actions (iterable of str): Commands names.
+
+    Returns:
+        list of str: Command line arguments.
+    """
+    argv = list(argv)
+    for index, arg in enumerate(argv):
+        if arg == '--' or arg in actions:
+            break
+        elif arg == '--profile' and argv[index + 1:index + 2] and \
+                argv[index + 1] in actions:
+            argv[index] = '--profile='
+            break
+    return argv
+
+
 def _run_command():
     """
     Command line entry point
@@ -421,6 +839,13 @@ def _run_command():
     parser = ArgumentParser(
         prog='accelpy', description=f'Accelpy {accelpy_version}.',
         epilog=epilog)
+    parser.add_argument(
+        '--profile', metavar='PATH', nargs='?', const='',
+        help='Profile the command (Python functions and utilities '
+             'subprocesses), then write "PATH.pstats" and "PATH.json" '
+             'reports and print a summary. Use as "--profile", '
+             '"--profile PATH" or "--profile=PATH". Default to '
+             '"accelpy-profile-<command>-<date>" in current directory.')
     sub_parsers = parser.add_subparsers(
         dest='action', title='Commands',
         help='accelpy commands', description=
@@ -475,8 +900,9 @@ def _run_command():
     action.add_argument(
         '--update_application', '-u', action='store_true',
         help='If applicable, update the application definition Yaml file to '
-             'use this image as host base for the selected provider. Warning, '
-             'this will reset any yaml file formatting and comments.')
+             'use this image as host base for the selected provider. Yaml '
+             'file formatting and comments are preserved only if "ruamel.yaml" '
+             'is installed.')
     action.add_argument(
         '--quiet', '-q', action='store_true',
         help='If specified, hide outputs.')
@@ -494,6 +920,32 @@ def _run_command():
         '--delete', '-d', action='store_true',
         help='Delete configuration after command completion.')
 
+    # Parser: "accelpy ssh"
+    description = ('Connect to the host with SSH, or run a command on it. The '
+                   'SSH master connection of the host is reused, or started '
+                   'and kept in background to speed up next connections.')
+    action = sub_parsers.add_parser(
+        'ssh', help=description, description=description, epilog=epilog)
+    action.add_argument(
+        'command', nargs='*',
+        help='Command to run on the host. If not specified, start an '
+             'interactive shell. Use "--" to separate it from accelpy '
+             'arguments.')
+    action.add_argument(
+        '--name', '-n', help=name_help).completer = names_completer
+    action.add_argument(
+        '--close', action='store_true',
+        help='Close SSH master connections of the host.')
+    action.add_argument(
+        '--private_ip', '-p', action='store_true',
+        help='If specified, connect to the private IP address instead of the '
+             'public IP address.')
+    action.add_argument(
+        '--persist',
+        help='Lifetime of the idle SSH master connection, like "30m", "2h" or '
+             '"no". Default to "ACCELPY_SSH_PERSIST" environment variable '
+             'value, or "30m".')
+
     # Parser: "accelpy ssh_private_key"
     description = 'Print the host SSH private key path.'
     action = sub_parsers.add_parser(
@@ -528,12 +980,99 @@ def _run_command():
     sub_parsers.add_parser(
         'list', help=description, description=description)
 
+    # Parser: "accelpy exec"
+    description = ('Run a command on hosts over SSH. Outputs are prefixed by '
+                   'the host name, and a summary with the exit code and '
+                   'duration on each host is printed on exit.')
+    action = sub_parsers.add_parser(
+        'exec', help=description, description=description, epilog=epilog)
+    action.add_argument(
+        'command', nargs='+',
+        help='Command to run on hosts. Use "--" to separate it from accelpy '
+             'arguments.')
+    action.add_argument(
+        '--hosts', '-H', default='all',
+        help='Comma separated hosts configurations names or glob patterns. '
+             'Default to "all".').completer = names_completer
+    action.add_argument(
+        '--jobs', '-j', type=int,
+        help='Maximum number of hosts commands running concurrently. '
+             'Default to 16.')
+    action.add_argument(
+        '--private_ip', '-p', action='store_true',
+        help='If specified, connect to the private IP address instead of the '
+             'public IP address.')
+    action.add_argument(
+        '--timeout', '-t', type=float,
+        help='Timeout in seconds of the command on each host.')
+
+    # Parser: "accelpy push_files"
+    description = ('Distribute files to hosts over SSH. The controller sends '
+                   'files to a few hosts that forward them to others hosts '
+                   'over their private IP address. Checksums are verified and '
+                   'interrupted transfers are resumed.')
+    action = sub_parsers.add_parser(
+        'push_files', help=description, description=description,
+        epilog=epilog)
+    action.add_argument('file', nargs='+', help='Path to files to send.')
+    action.add_argument(
+        '--destination', '-d', default='.',
+        help='Destination directory on hosts. Relative paths are relative to '
+             'the user home directory. Default to the user home directory.')
+    action.add_argument(
+        '--hosts', '-H', default='all',
+        help='Comma separated hosts configurations names or glob patterns. '
+             'Default to "all".').completer = names_completer
+    action.add_argument(
+        '--seeds', '-s', type=int,
+        help='Maximum number of hosts the controller sends files to '
+             'concurrently. Default to 2.')
+    action.add_argument(
+        '--fanout', '-f', type=int,
+        help='Maximum number of hosts each host forwards files to '
+             'concurrently. "0" to send files only from the controller. '
+             'Default to 2.')
+    action.add_argument(
+        '--retries', '-r', type=int,
+        help='Number of retries of a failed transfer to an host. Default to 2.')
+
+    # Parser: "accelpy inventory"
+    description = ('Print the Ansible dynamic inventory of hosts, in the '
+                   'Ansible inventory script format. Hosts are grouped by '
+                   'provider, application and application type.')
+    action = sub_parsers.add_parser(
+        'inventory', help=description, description=description)
+    action.add_argument(
+        '--list', action='store_true',
+        help='Print the whole inventory. This is the default.')
+    action.add_argument(
+        '--host', help='Print variables of this host only.'
+    ).completer = names_completer
+    action.add_argument(
+        '--hosts', '-H', default='all',
+        help='Comma separated hosts configurations names or glob patterns. '
+             'Default to "all".').completer = names_completer
+    action.add_argument(
+        '--private_ip', '-p', action='store_true',
+        help='If specified, connect to the private IP address instead of the '
+             'public IP address.')
+
     # Parser: "accelpy lint"
-    description = 'lint an application definition file.'
+    description = 'lint application definition files.'
     action = sub_parsers.add_parser(
         'lint', help=description, description=description)
     action.add_argument(
-        'file', help='Path to YAML file to lint.').completer = _yaml_completer
+        'file', nargs='+',
+        help='Path to YAML file to lint. Can also be a directory (All YAML '
+             'files are linted recursively) or a glob pattern. Multiple paths '
+             'can be specified.').completer = _yaml_completer
+    action.add_argument(
+        '--format', '-f', choices=tuple(_LINT_REPORTS), default='text',
+        help='Report format. Default to "text".')
+    action.add_argument(
+        '--jobs', '-j', type=int,
+        help='Number of parallel processes to use when linting multiple files.'
+             ' Default to the number of CPU.')
 
     # Parser: "accelpy push"
     description = 'Push an application definition file to Accelize web service.'
@@ -542,11 +1081,36 @@ def _run_command():
     action.add_argument(
         'file', help='Path to YAML file to push.').completer = _yaml_completer
 
+    # Parser: "accelpy serve"
+    description = ('Run the provisioning server. Other commands run on this '
+                   'server if the "ACCELPY_SERVER" environment variable is set '
+                   'to its address.')
+    action = sub_parsers.add_parser(
+        'serve', help=description, description=description)
+    action.add_argument(
+        '--address', '-a',
+        help='Unix socket path, or "host:port" TCP address to listen on. '
+             'Default to the "~/.accelize/server.sock" Unix socket.')
+    action.add_argument(
+        '--jobs', '-j', type=int, default=4,
+        help='Maximum number of host commands running concurrently. '
+             'Default to 4.')
+    action.add_argument(
+        '--verbose', '-v', action='store_true',
+        help='If specified, show requests and commands outputs.')
+    action.add_argument(
+        '--metrics', '-m', metavar='HOST:PORT',
+        help='If specified, expose Prometheus metrics on "/metrics" on this '
+             'TCP address. Metrics are always available on "/metrics" on the '
+             'server address.')
+
     # Enable autocompletion
     autocomplete(parser)
 
     # Get arguments and call function
-    args = parser.parse_args()
+    import sys
+    args = parser.parse_args(
+        _profile_argv(sys.argv[1:], sub_parsers.choices))
     action = args.action
     if not action:
         from accelpy._common import error
@@ -559,13 +1123,18 @@ def _run_command():
     # Adds parent directory to sys.path:
     # Allows import of accelpy if this script is run locally
     from os.path import dirname, realpath
-    import sys
     sys.path.insert(0, dirname(dirname(realpath(__file__))))
 
     # Run command
     from accelpy.exceptions import AccelizeException
     try:
-        output = globals()[f'_action_{action}'](args)
+        if args.profile is not None:
+            from accelpy._profile import Profiler
+            with Profiler(args.profile or _profile_path(action), ' '.join(
+                    ['accelpy'] + sys.argv[1:])):
+                output = _run_action(action, args)
+        else:
+            output = _run_action(action, args)
         if output:
             print(output)
         parser.exit()
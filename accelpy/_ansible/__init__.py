@@ -6,7 +6,8 @@ from sys import executable
 
 from accelpy._common import (
     call, get_sources_dirs, symlink, get_sources_filters,
-    get_python_package_entry_point, debug, no_color)
+    get_python_package_entry_point, debug, no_color, propagate_context)
+from accelpy._tracing import span
 from accelpy._yaml import yaml_read, yaml_write
 
 
@@ -160,15 +161,28 @@ class Ansible:
         return cls._ANSIBLE_EXECUTABLE
 
     @staticmethod
-    def environment():
+    def environment(config_dir=None):
         """
         Ansible running environment.
 
+        Args:
+            config_dir (path-like object): Host configuration directory. If
+                specified, reuse the SSH master connection of this host.
+
         Returns:
             dict: Ansible environment.
         """
         no_color_mode = no_color()
         debug_mode = debug()
+
+        if config_dir:
+            # Lazy import: Only required with an host
+            from accelpy._ssh import master_options
+            ssh_args = ' '.join(f'-o {option}' for option in master_options(
+                fsdecode(config_dir)))
+        else:
+            ssh_args = '-o ControlMaster=auto -o ControlPersist=60s'
+
         return {
             # Reduce output except in debug mode
             'ANSIBLE_DISPLAY_SKIPPED_HOSTS': debug_mode,
@@ -183,8 +197,7 @@ class Ansible:
 
             # Speed up Ansible
             'ANSIBLE_PIPELINING': True,
-            'ANSIBLE_SSH_ARGS':
-                '"-o ControlMaster=auto -o ControlPersist=60s"'
+            'ANSIBLE_SSH_ARGS': f'"{ssh_args}"'
         }
 
     def _ansible(self, *args, utility=None, check=True, pipe_stdout=False,
@@ -217,7 +230,10 @@ class Ansible:
             roles (iterable of str): Roles to install.
             roles_path (str): Path to the directory containing roles.
         """
-        if roles:
+        if not roles:
+            return
+
+        with span('ansible.galaxy_install', roles=','.join(sorted(roles))):
 
             # Lazy import, because may be never used
             from tempfile import TemporaryDirectory
@@ -234,7 +250,7 @@ class Ansible:
                                                       prefix='.accelpy_')
                         temp_dirs.append(temp_dir)
                         futures.append(executor.submit(
-                            self._ansible, 'install',
+                            propagate_context(self._ansible), 'install',
                             f'--roles-path={temp_dir.name}', role,
                             utility='galaxy', pipe_stdout=True, retries=3))
 
@@ -1,10 +1,66 @@
 """Extra Ansible filters"""
 
+# Ports below this value are restricted to privileged users
+_RESTRICTED_PORT = 1024
+
+# Offset applied to redirect restricted ports in the unrestricted range
+_REDIRECT_OFFSET = 60000
+
+
+def _port_range(start, end, offset=0):
+    """
+    Format a port range.
+
+    Args:
+        start (int): First port of the range.
+        end (int): Last port of the range.
+        offset (int): Offset to apply to ports.
+
+    Returns:
+        str: "port" or "start-end".
+    """
+    start += offset
+    end += offset
+    return str(start) if start == end else f'{start}-{end}'
+
+
+def _merge_ranges(firewall_rules):
+    """
+    Merge overlapping and contiguous ports ranges of each protocol.
+
+    Args:
+        firewall_rules (list of dict): Firewall rules.
+
+    Returns:
+        list of tuple: start port, end port, protocol.
+    """
+    ranges = sorted(
+        (int(rule['start_port']), int(rule['end_port']), rule['protocol'])
+        for rule in firewall_rules)
+
+    merged = {}
+    for start, end, protocol in ranges:
+        protocol_ranges = merged.setdefault(protocol, [])
+        if protocol_ranges and start <= protocol_ranges[-1][1] + 1:
+            last_start, last_end = protocol_ranges[-1]
+            protocol_ranges[-1] = (last_start, max(last_end, end))
+        else:
+            protocol_ranges.append((start, end))
+
+    return sorted((start, end, protocol)
+                  for protocol, protocol_ranges in merged.items()
+                  for start, end in protocol_ranges)
+
 
 def rules_ports(
         firewall_rules, only_restricted=False, redirect=False, *_, **__):
     """
-    Return restricted ports (<1024) from firewall rules.
+    Return ports ranges from firewall rules.
+
+    Ranges are kept intact, so the result size depends on the number of rules
+    and not on the number of ports. Redirected restricted ports are the
+    exception: The iptables "REDIRECT" target does not map a ports range to
+    another ports range one-to-one, so there is one entry per redirected port.
 
     Args:
         firewall_rules (list of dict): Firewall rules.
@@ -13,19 +69,33 @@ def rules_ports(
             unrestricted port range.
 
     Returns:
-        list of dict: port, redirected port, protocol
+        list of dict: port, redirected port, protocol. "port" and "redirect"
+            are formatted as "port" or "start-end".
     """
     filtered = []
-    for rule in firewall_rules:
-        start = int(rule['start_port'])
-        end = int(rule['end_port'])
-        if not only_restricted or start < 1024:
-            protocol = rule['protocol']
-            filtered += [{
-                'port': str(port),
-                'redirect': str(port + (
-                    60000 if port < 1024 and redirect else 0)),
-                'protocol': protocol} for port in range(start, end + 1)]
+    for start, end, protocol in _merge_ranges(firewall_rules):
+
+        # Restricted part of the range
+        if start < _RESTRICTED_PORT:
+            restricted_end = min(end, _RESTRICTED_PORT - 1)
+            if redirect:
+                filtered.extend({
+                    'port': str(port),
+                    'redirect': str(port + _REDIRECT_OFFSET),
+                    'protocol': protocol}
+                    for port in range(start, restricted_end + 1))
+            else:
+                port = _port_range(start, restricted_end)
+                filtered.append(
+                    {'port': port, 'redirect': port, 'protocol': protocol})
+            start = restricted_end + 1
+
+        # Unrestricted part of the range
+        if not only_restricted and start <= end:
+            port = _port_range(start, end)
+            filtered.append(
+                {'port': port, 'redirect': port, 'protocol': protocol})
+
     return filtered
 
 
@@ -33,6 +103,8 @@ def publish_ports(firewall_rules, redirect=False, *_, **__):
     """
     Returns all ports as "--publish" arguments.
 
+    Ports ranges are published with a single "-p start-end:start-end" argument.
+
     Args:
         firewall_rules (list of dict): Firewall rules.
         redirect (bool): Apply port redirection for port <1024.
@@ -46,21 +118,26 @@ def publish_ports(firewall_rules, redirect=False, *_, **__):
         for port in rules_ports(firewall_rules, redirect=redirect))
 
 
-def publish_devices(path_list, *_, device=False, privileged=False, **__):
+def publish_devices(devices, *_, device=False, privileged=False, **__):
     """
     Returns paths as "--device" or "--mount" arguments.
 
     Fall back to "--privileged" if no devices found.
 
     Args:
-        path_list (str): List of devices paths, one path per line.
+        devices (list of dict or str): Devices as returned by the
+            "fpga_devices" module, or list of devices paths, one path per line.
         device (bool): If True, use "--device" args, else use only "--mount"
         privileged (bool): If True, force the add of "--privileged" argument.
 
     Returns:
         str: arguments
     """
-    path_list = [path for path in path_list.strip().splitlines()
+    if isinstance(devices, str):
+        devices = devices.strip().splitlines()
+    path_list = [
+        item['path'] if isinstance(item, dict) else item for item in devices]
+    path_list = [path for path in path_list
                  if path.lstrip('/').split('/', 1)[0] in ('dev', 'sys')]
     args_list = []
     prefixes = ('/dev/dri', '/sys/devices/pci0000:00')
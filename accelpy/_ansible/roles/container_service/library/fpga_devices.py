@@ -0,0 +1,205 @@
+#!/usr/bin/python
+# coding=utf-8
+"""List FPGA devices"""
+
+DOCUMENTATION = '''
+---
+module: fpga_devices
+short_description: List FPGA devices that can be accessed by a group.
+description:
+  - Enumerates "/dev" and the PCI devices of FPGA vendors in
+    "/sys/bus/pci/devices" and returns paths owned by the specified group.
+  - Only these trees are scanned, the root filesystem is never walked.
+options:
+  group:
+    description: Group owning the devices.
+    default: fpgauser
+  pci_ids:
+    description:
+      - PCI IDs of FPGA devices formatted as "vendor" or "vendor:device"
+        (Hexadecimal, like "lspci -d").
+    default: ['1d0f', '10ee']
+  dev_root:
+    description: Devices directory.
+    default: /dev
+  sysfs_root:
+    description: Sysfs mount point.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: List FPGA devices that can be accessed by FPGA user group
+  fpga_devices:
+    group: fpgauser
+  register: fpga_devices_list
+'''
+
+RETURN = '''
+devices:
+  description: Devices owned by the group.
+  returned: always
+  type: list
+  sample:
+    - path: /sys/devices/pci0000:00/0000:00:1d.0/resource0
+      pci_slot: "0000:00:1d.0"
+      vendor: "1d0f"
+      device: "f000"
+    - path: /dev/xdma0_user
+      pci_slot: null
+      vendor: null
+      device: null
+pci_devices:
+  description: FPGA PCI devices found.
+  returned: always
+  type: list
+  sample:
+    - path: /sys/devices/pci0000:00/0000:00:1d.0
+      pci_slot: "0000:00:1d.0"
+      vendor: "1d0f"
+      device: "f000"
+'''
+
+from grp import getgrnam
+from os import scandir, walk, stat
+from os.path import join, realpath
+
+# Pseudo-filesystems in "/dev" that can contain many non device files
+_DEV_EXCLUDE = ('shm', 'mqueue', 'pts', 'hugepages')
+
+
+def _read_id(path):
+    """
+    Read a sysfs PCI ID file.
+
+    Args:
+        path (str): Path to "vendor" or "device" file.
+
+    Returns:
+        str or None: ID as lowercase hexadecimal without "0x" prefix.
+    """
+    try:
+        with open(path, 'rt') as file:
+            return file.read().strip().lower().replace('0x', '', 1)
+    except OSError:
+        return None
+
+
+def _match_pci_id(vendor, device, pci_ids):
+    """
+    Check if PCI IDs match.
+
+    Args:
+        vendor (str): Vendor ID.
+        device (str): Device ID.
+        pci_ids (iterable of str): Expected IDs as "vendor" or "vendor:device".
+
+    Returns:
+        bool: True if match.
+    """
+    for pci_id in pci_ids:
+        expected_vendor, _, expected_device = pci_id.lower().partition(':')
+        if expected_vendor == vendor and expected_device in ('', device):
+            return True
+    return False
+
+
+def list_pci_devices(pci_ids, sysfs_root='/sys'):
+    """
+    List PCI devices matching IDs.
+
+    Args:
+        pci_ids (iterable of str): PCI IDs as "vendor" or "vendor:device".
+        sysfs_root (str): Sysfs mount point.
+
+    Returns:
+        list of dict: PCI devices.
+    """
+    pci_devices = []
+    try:
+        entries = list(scandir(join(sysfs_root, 'bus/pci/devices')))
+    except OSError:
+        return pci_devices
+
+    for entry in sorted(entries, key=lambda item: item.name):
+        vendor = _read_id(join(entry.path, 'vendor'))
+        device = _read_id(join(entry.path, 'device'))
+        if _match_pci_id(vendor, device, pci_ids):
+            pci_devices.append(dict(
+                path=realpath(entry.path), pci_slot=entry.name,
+                vendor=vendor, device=device))
+    return pci_devices
+
+
+def list_devices(group='fpgauser', pci_ids=('1d0f', '10ee'), dev_root='/dev',
+                 sysfs_root='/sys'):
+    """
+    List FPGA devices that can be accessed by a group.
+
+    Args:
+        group (str): Group owning the devices.
+        pci_ids (iterable of str): PCI IDs as "vendor" or "vendor:device".
+        dev_root (str): Devices directory.
+        sysfs_root (str): Sysfs mount point.
+
+    Returns:
+        tuple of list of dict: devices, PCI devices.
+    """
+    pci_devices = list_pci_devices(pci_ids, sysfs_root)
+
+    try:
+        gid = getgrnam(group).gr_gid
+    except KeyError:
+        # Group does not exist: Nothing can be accessed by this group
+        return [], pci_devices
+
+    devices = []
+
+    # PCI devices attributes files (Resources, configuration, ...)
+    for pci_device in pci_devices:
+        with scandir(pci_device['path']) as entries:
+            for entry in entries:
+                if (not entry.is_symlink() and
+                        entry.stat(follow_symlinks=False).st_gid == gid):
+                    devices.append(dict(
+                        path=entry.path, pci_slot=pci_device['pci_slot'],
+                        vendor=pci_device['vendor'],
+                        device=pci_device['device']))
+
+    # Devices nodes
+    for root, dirs, files in walk(dev_root):
+        if root == dev_root:
+            dirs[:] = [name for name in dirs if name not in _DEV_EXCLUDE]
+        for name in dirs + files:
+            path = join(root, name)
+            try:
+                if stat(path, follow_symlinks=False).st_gid != gid:
+                    continue
+            except OSError:
+                # Device removed while listing
+                continue
+            devices.append(
+                dict(path=path, pci_slot=None, vendor=None, device=None))
+
+    devices.sort(key=lambda item: item['path'])
+    return devices, pci_devices
+
+
+def main():
+    """Module entry point"""
+    # Lazy import: Allow to use this module functions without Ansible
+    from ansible.module_utils.basic import AnsibleModule
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            group=dict(type='str', default='fpgauser'),
+            pci_ids=dict(type='list', default=['1d0f', '10ee']),
+            dev_root=dict(type='path', default='/dev'),
+            sysfs_root=dict(type='path', default='/sys')),
+        supports_check_mode=True)
+
+    devices, pci_devices = list_devices(**module.params)
+    module.exit_json(changed=False, devices=devices, pci_devices=pci_devices)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,19 @@
 """Application Definition"""
 from copy import deepcopy
 from json import dumps
-from os import fsdecode
-from re import fullmatch
-
-from accelpy._common import accelize_ws_session
-from accelpy._yaml import yaml_read, yaml_write
-from accelpy.exceptions import ConfigurationException, RuntimeException
+from os import fsdecode, remove, scandir, utime
+from os.path import join
+from time import time
+from re import compile as re_compile
+
+from accelpy._common import (
+    accelize_ws_session, ensure_home_dir, HOME_DIR, hash_cli_name, json_read,
+    json_write, write_atomic)
+from accelpy._metrics import count_cache
+from accelpy._yaml import (
+    yaml_read, yaml_write, yaml_read_round_trip, yaml_write_round_trip)
+from accelpy.exceptions import (
+    AccelizeException, ConfigurationException, RuntimeException)
 
 # Application definition format
 FORMAT = {
@@ -84,6 +91,663 @@ FORMAT = {
 }
 
 
+def _compile_value_checker(key, key_format, section_name):
+    """
+    Compile a key format to a value checker.
+
+    Args:
+        key (str): Key
+        key_format (dict): Key format
+        section_name (str): Section name
+
+    Returns:
+        function: Value checker that take the value as argument and return the
+            value (eventually converted).
+
+    Raises:
+        accelpy.exceptions.ConfigException: Error in value (On checker call).
+    """
+    value_type = key_format.get('value_type', str)
+    default = key_format.get('default')
+    valid_values = key_format.get('values')
+    regex = key_format.get('regex')
+    regex_help = key_format.get('regex_help', 'See documentation')
+    regex_match = re_compile(regex).fullmatch if regex else None
+
+    # List of values
+    if isinstance(value_type, tuple) and value_type[0] == list:
+        element_type = value_type[1]
+        type_error = (f'The "{key}" key in "{section_name}" section must be a '
+                      f'list of "{element_type.__name__}".')
+
+        def check_value(value):
+            """List value checker"""
+            # Checks value content type
+            if isinstance(value, list):
+                for element in value:
+                    if not isinstance(element, element_type):
+                        raise ConfigurationException(type_error)
+                return value
+
+            # Single element list
+            elif isinstance(value, element_type):
+                return [value]
+
+            # Bad value in list
+            elif value is not None:
+                raise ConfigurationException(type_error)
+
+            return value
+
+        return check_value
+
+    # Single value
+    type_error = (f'The "{key}" key in "{section_name}" section must be a '
+                  f'"{value_type.__name__}".')
+
+    def check_type(value):
+        """Single value type checker"""
+        if value is not None and not isinstance(value, value_type):
+            if value_type is str:
+                return str(value)
+            raise ConfigurationException(type_error)
+        return value
+
+    # Check single value in allowed values
+    if valid_values:
+        allowed = ", ".join(str(valid_value) for valid_value in valid_values)
+
+        def check_value(value):
+            """Allowed values checker"""
+            value = check_type(value)
+            if not (value in valid_values or value == default):
+                raise ConfigurationException(
+                    f'Invalid value "{value}" for "{key}" key in '
+                    f'"{section_name}" section (possibles values are '
+                    f'{allowed}).')
+            return value
+
+    # Check single value match regex
+    elif regex_match:
+        def check_value(value):
+            """Regex checker"""
+            value = check_type(value)
+            if value and not regex_match(value):
+                raise ConfigurationException(
+                    f'Invalid value "{value}" for "{key}" key in '
+                    f'"{section_name}" section ({regex_help}).')
+            return value
+
+    else:
+        check_value = check_type
+
+    return check_value
+
+
+class _SectionValidator:
+    """
+    Section validator compiled from a section format.
+
+    Args:
+        section_name (str): Section name.
+        section_format (dict): Section format.
+    """
+    __slots__ = ('_name', '_node_type', '_checkers', '_defaults', '_required',
+                 '_keys')
+
+    def __init__(self, section_name, section_format):
+        self._name = section_name
+        self._node_type = section_format['_node']
+        self._checkers = checkers = dict()
+        self._defaults = defaults = dict()
+        self._required = required = []
+
+        for key, key_format in section_format.items():
+            if key == '_node':
+                continue
+            checkers[key] = _compile_value_checker(
+                key, key_format, section_name)
+            defaults[key] = key_format.get('default')
+            if key_format.get('required', False):
+                required.append(key)
+
+        # Keys that are not providers
+        self._keys = frozenset(section_format)
+
+    @property
+    def node_type(self):
+        """
+        Type of section node
+
+        Returns:
+            class: dict or list.
+        """
+        return self._node_type
+
+    def __call__(self, section, providers):
+        """
+        Validate a section
+
+        Args:
+            section (dict or list): Section to validate.
+            providers (set of str): Set where add found providers.
+
+        Raises:
+            accelpy.exceptions.ConfigException: Error in section format.
+
+        Returns:
+            dict or list: section.
+        """
+        section_name = self._name
+
+        if not isinstance(section, self._node_type):
+            if self._node_type is dict:
+                raise ConfigurationException(
+                    f'The section "{section_name}" must be a "mapping".')
+            else:
+                section = [section]
+
+        if section_name == 'package' and not section:
+            raise ConfigurationException(
+                f'The section "{section_name}" must contain a least one '
+                f'"mapping".')
+
+        for node in (section if isinstance(section, list) else (section,)):
+            self._validate_node(node)
+
+            # Keys that are not in format are providers
+            keys = self._keys
+            node_providers = [key for key in node if key not in keys]
+            if node_providers:
+                self._validate_providers(node, node_providers)
+                providers.update(node_providers)
+            else:
+                self._check_required(node)
+
+        return section
+
+    def _validate_node(self, node):
+        """
+        Validate a node, and complete missing values with defaults.
+
+        Args:
+            node (dict): Node to validate
+
+        Raises:
+            accelpy.exceptions.ConfigException: Error in node format.
+        """
+        defaults = self._defaults
+        for key, check_value in self._checkers.items():
+            try:
+                value = node[key]
+            except KeyError:
+                # Set default value if missing
+                value = defaults[key]
+                if value.__class__ in (dict, list):
+                    # Mutable default must not be shared
+                    value = value.copy()
+
+            # Check and eventually update value
+            node[key] = check_value(value)
+
+    def _check_required(self, node):
+        """
+        Check for required value in default provider.
+
+        Args:
+            node (dict): Node to validate
+
+        Raises:
+            accelpy.exceptions.ConfigException: Error in node format.
+        """
+        for key in self._required:
+            if node[key] is None:
+                raise ConfigurationException(
+                    f'The "{key}" key in "{self._name}" section is required.')
+
+    def _validate_providers(self, node, providers):
+        """
+        Validate providers override nodes.
+
+        Args:
+            node (dict): Node to validate
+            providers (list of str): Providers in this node.
+
+        Raises:
+            accelpy.exceptions.ConfigException: Error in node format.
+        """
+        section_name = self._name
+        checkers = self._checkers
+
+        for provider in providers:
+
+            if provider in FORMAT:
+                raise ConfigurationException(
+                    f'Provider in "{section_name}" section cannot be named with'
+                    f' reserved name "{provider}".')
+
+            provider_node = node[provider]
+
+            # Provider that is not a dict is likely an unknown key
+            if not isinstance(provider_node, dict):
+                raise ConfigurationException(
+                    f'Unknown "{provider_node}" key in '
+                    f'"{section_name}" section.')
+
+            # Required value for provider
+            for key in self._required:
+                if provider_node.get(key, node[key]) is None:
+                    raise ConfigurationException(
+                        f'The "{key}" key in "{section_name}" section is '
+                        f'required for "{provider}" provider.')
+
+            # Check values
+            for key in provider_node:
+                try:
+                    check_value = checkers[key]
+
+                # Check for unknown keys in provider
+                except KeyError:
+                    raise ConfigurationException(
+                        f'Unknown "{key}" key in "{section_name}" section '
+                        f'for "{provider}" provider.')
+
+                provider_node[key] = check_value(provider_node[key])
+
+
+class _DefinitionValidator:
+    """
+    Definition validator compiled from a definition format.
+
+    Args:
+        definition_format (dict): Definition format.
+    """
+    __slots__ = ('_sections',)
+
+    def __init__(self, definition_format):
+        self._sections = {
+            section_name: _SectionValidator(section_name, section_format)
+            for section_name, section_format in definition_format.items()}
+
+    def __call__(self, definition, providers):
+        """
+        Validate definition file content, and complete missing values.
+
+        Args:
+            definition (dict): Definition.
+            providers (set of str): Set where add found providers.
+
+        Returns:
+            dict: definition
+
+        Raises:
+            accelpy.exceptions.ConfigException: Error in definition format.
+        """
+        if not isinstance(definition, dict):
+            raise ConfigurationException('The definition must be a "mapping".')
+
+        sections = self._sections
+        for section_name, validate_section in sections.items():
+            try:
+                section = definition[section_name]
+            except KeyError:
+                # Create missing definition section
+                section = validate_section.node_type()
+
+            definition[section_name] = validate_section(section, providers)
+
+        # Check for unknown sections
+        for section_name in definition:
+            if section_name not in sections:
+                raise ConfigurationException(
+                    f'Unknown "{section_name}" section.')
+
+        return definition
+
+
+# Validator compiled from the application definition format
+_VALIDATOR = _DefinitionValidator(FORMAT)
+
+# Validated definitions cache
+DEFINITION_CACHE_DIR = join(HOME_DIR, '.cache_definitions')
+
+# Time to live in seconds of unused validated definitions cache entries
+_DEFINITION_CACHE_TTL = 30 * 86400
+
+
+def _definition_cache_path(content):
+    """
+    Return the validated definition cache path.
+
+    Args:
+        content (bytes): Definition file content.
+
+    Returns:
+        str: path.
+    """
+    # Lazy import: Only required with definitions files
+    from hashlib import blake2b
+    from marshal import version as marshal_version
+    from accelpy import __version__
+
+    digest = blake2b(content, digest_size=32)
+    digest.update(f'{__version__}|{marshal_version}'.encode())
+    return join(DEFINITION_CACHE_DIR, digest.hexdigest())
+
+
+def _prune_definition_cache():
+    """
+    Remove validated definitions cache entries that were not used since
+    "_DEFINITION_CACHE_TTL" seconds.
+    """
+    expiry = time() - _DEFINITION_CACHE_TTL
+    try:
+        with scandir(DEFINITION_CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < expiry:
+                        remove(entry.path)
+                except OSError:  # pragma: no cover
+                    # Removed concurrently
+                    continue
+    except OSError:  # pragma: no cover
+        # Cache is optional
+        return
+
+
+def _read_definition(path, providers):
+    """
+    Read and validate a definition file.
+
+    Validated definitions are cached based on the file content and the
+    accelpy version.
+
+    Args:
+        path (str): Path to definition file.
+        providers (set of str): Set where add found providers.
+
+    Returns:
+        dict: Validated definition.
+    """
+    # Lazy import: Only required with definitions files
+    from marshal import dumps as marshal_dumps, loads as marshal_loads
+
+    with open(path, 'rb') as file:
+        content = file.read()
+    cache_path = _definition_cache_path(content)
+
+    # Get validated definition from cache
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            definition, cached_providers = marshal_loads(cache_file.read())
+        providers.update(cached_providers)
+
+        # Mark as used, unused entries are pruned
+        utime(cache_path)
+        count_cache('definition', 'hit')
+        return definition
+
+    except (OSError, EOFError, ValueError, TypeError):
+        # Not cached, invalid or concurrently pruned cache file
+        count_cache('definition', 'miss')
+
+    # Read and validate definition file
+    definition = _VALIDATOR(yaml_read(path, content), providers)
+
+    # Cache validated definition
+    try:
+        cached = marshal_dumps((definition, list(providers)))
+    except ValueError:
+        # Definition contains values that cannot be cached (like dates)
+        return definition
+
+    try:
+        ensure_home_dir(DEFINITION_CACHE_DIR)
+        _prune_definition_cache()
+        write_atomic(cache_path, cached)
+    except OSError:  # pragma: no cover
+        # Cache is optional
+        pass
+
+    return definition
+
+
+# Definitions from web service store
+DEFINITION_STORE_DIR = join(HOME_DIR, '.cache_applications')
+
+# Time to live in seconds of definitions retrieved without version
+_LATEST_TTL = 60
+
+
+def _store_path(application):
+    """
+    Return the definition store path.
+
+    Definitions are stored by user credentials client ID and web service
+    endpoint, because available definitions depend on them.
+
+    Args:
+        application (str): Application in format "product_id:version" or
+            "product_id".
+
+    Returns:
+        str: path.
+
+    Raises:
+        accelpy.exceptions.AccelizeException: No valid user credentials.
+    """
+    # Lazy import: Credentials location may change at runtime
+    from accelpy._common import get_accelize_cred
+
+    try:
+        credentials = json_read(get_accelize_cred())
+        client_id = credentials['client_id']
+    except (OSError, KeyError, TypeError):
+        raise ConfigurationException('Invalid Accelize credentials')
+
+    return join(DEFINITION_STORE_DIR, hash_cli_name(
+        f"{credentials.get('endpoint', '')}|{client_id}|{application}"))
+
+
+def _store_get(application):
+    """
+    Get definition from store.
+
+    Args:
+        application (str): Application in format "product_id:version" or
+            "product_id".
+
+    Returns:
+        dict: Stored entry with "definition", "etag" and "timestamp" keys, or
+            empty dict if not stored.
+    """
+    try:
+        return json_read(_store_path(application))
+    except (OSError, AccelizeException):
+        return dict()
+
+
+def _store_set(application, definition, etag=None):
+    """
+    Add definition to store.
+
+    Args:
+        application (str): Application in format "product_id:version" or
+            "product_id".
+        definition (dict): Raw definition from web service.
+        etag (str): Definition "ETag".
+    """
+    try:
+        ensure_home_dir(DEFINITION_STORE_DIR)
+        json_write(dict(definition=definition, etag=etag, timestamp=time()),
+                   _store_path(application))
+    except (OSError, AccelizeException):
+        # Store is optional, definition will be requested again
+        pass
+
+
+def _store_remove(*applications):
+    """
+    Remove definitions from store.
+
+    Args:
+        applications (str): Applications in format "product_id:version" or
+            "product_id".
+    """
+    for application in applications:
+        try:
+            remove(_store_path(application))
+        except (OSError, AccelizeException):
+            continue
+
+
+def _iter_results(path, params=None, prefetch=False):
+    """
+    Iterate over results of a paginated Accelize web service listing.
+
+    Pages are requested lazily, following "next" links.
+
+    Args:
+        path (str): URL path.
+        params (dict): Request parameters.
+        prefetch (bool): If True, request the next page in background while
+            current page results are consumed.
+
+    Yields:
+        object: result.
+    """
+    request = accelize_ws_session.request
+    executor = None
+    try:
+        response = request(path, params=params)
+
+        while True:
+            next_url = response.get('next')
+
+            if next_url and prefetch:
+                if executor is None:
+                    # Lazy import: Only used with multiples pages
+                    from concurrent.futures import ThreadPoolExecutor
+                    executor = ThreadPoolExecutor(max_workers=1)
+                next_response = executor.submit(request, next_url)
+
+            yield from response['results']
+
+            if not next_url:
+                return
+
+            response = (next_response.result() if prefetch else
+                        request(next_url))
+    finally:
+        if executor is not None:
+            # Do not wait a prefetched page that will never be used
+            executor.shutdown(wait=False)
+
+
+def lint(path):
+    """
+    Lint an application definition file.
+
+    Args:
+        path (path-like object): Path to YAML definition file.
+
+    Returns:
+        str or None: Error message, or None if the definition is valid.
+    """
+    try:
+        Application(path)
+    except (AccelizeException, OSError) as exception:
+        return str(exception)
+
+
+def _clean_node(node):
+    """
+    Return node without empty and None values.
+
+    Args:
+        node (dict): Node.
+
+    Returns:
+        dict: Cleaned node.
+    """
+    return {key: value for key, value in node.items()
+            if value or value is False}
+
+
+def _to_dict(definition):
+    """
+    Return definition without empty and None values.
+
+    Args:
+        definition (dict): Definition.
+
+    Returns:
+        dict: Cleaned definition.
+    """
+    result = dict()
+    for section_name, section in definition.items():
+
+        if isinstance(section, list):
+            section = [node for node in (
+                _clean_node(element) for element in section) if node]
+        else:
+            section = _clean_node(section)
+
+        if section:
+            result[section_name] = section
+
+    return result
+
+
+def _round_trip_update(document, original, updated):
+    """
+    Update a round-trip YAML document node with changed values only.
+
+    Args:
+        document (object): Round-trip YAML document node.
+        original (object): Node content as read from the document.
+        updated (object): Updated node content.
+
+    Returns:
+        object: Updated document node.
+    """
+    if original == updated:
+        return document
+
+    # Mappings: Update changed keys only
+    if (isinstance(original, dict) and isinstance(updated, dict) and
+            isinstance(document, dict)):
+        for key in tuple(document):
+            if key in original and key not in updated:
+                del document[key]
+
+        for key, value in updated.items():
+            if key in document and key in original:
+                document[key] = _round_trip_update(
+                    document[key], original[key], value)
+            elif value != original.get(key):
+                document[key] = value
+
+        return document
+
+    # Sequences: Update elements if the length is unchanged
+    if (isinstance(original, list) and isinstance(updated, list) and
+            len(original) == len(updated)):
+
+        if isinstance(document, list) and len(document) == len(original):
+            for index, value in enumerate(updated):
+                document[index] = _round_trip_update(
+                    document[index], original[index], value)
+            return document
+
+        # Single element sequence written as the element itself
+        elif not isinstance(document, list) and len(original) == 1:
+            return _round_trip_update(document, original[0], updated[0])
+
+    # Other values: Replace
+    return updated
+
+
 class Application:
     """
     Application definition
@@ -98,30 +762,33 @@ class Application:
         self._providers = set()
         self._configuration_id = None
 
-        # Load from dict
+        # Load from dict and validate content
         if isinstance(definition, dict):
             self._path = None
-            definition = deepcopy(definition)
+            self._definition = _VALIDATOR(deepcopy(definition), self._providers)
 
-        # Load from file
+        # Load from file and validate content
         else:
             self._path = fsdecode(definition)
-            definition = yaml_read(self._path)
-
-        # Validate content
-        self._definition = self._validate(definition)
+            self._definition = _read_definition(self._path, self._providers)
 
-        # Cache definition for each provider
-        self._provider_definition = self._create_provider_definitions()
+        # Definition for each provider, created on first access
+        self._provider_definition = dict()
 
     def __getitem__(self, key):
         # Get global definition
         if key in FORMAT:
             return self._definition[key]
 
-        # Get provider cached definition, or default definition
-        return self._provider_definition.get(
-            key, self._provider_definition[None])
+        # Get provider definition, or default definition
+        if key not in self._providers:
+            key = None
+        try:
+            return self._provider_definition[key]
+        except KeyError:
+            definition = self._provider_definition[key] = \
+                self._create_provider_definition(key)
+            return definition
 
     @classmethod
     def from_id(cls, application):
@@ -145,7 +812,11 @@ class Application:
     @staticmethod
     def _get_definition(application):
         """
-        Load application from Accelize web service.
+        Load application from local store or Accelize web service.
+
+        Definitions with a version are immutable and are stored indefinitely.
+        Definitions without version are revalidated with the web service after
+        a short time.
 
         Args:
             application (str): Application if format "product_id:version" or
@@ -159,11 +830,37 @@ class Application:
             params['product_id'], params['version'] = application.split(':', 1)
         except ValueError:
             params['product_id'] = application
-        return accelize_ws_session.request(
-            '/auth/objects/productconfiguration/', params=params)['results'][0]
 
-    @staticmethod
-    def list(prefix=''):
+        stored = _store_get(application)
+        if stored and ('version' in params or
+                       stored['timestamp'] + _LATEST_TTL > time()):
+            count_cache('application_store', 'hit')
+            return stored['definition']
+
+        response, etag = accelize_ws_session.conditional_request(
+            '/auth/objects/productconfiguration/', etag=stored.get('etag'),
+            params=params)
+
+        # Not modified since stored
+        if response is None:
+            count_cache('application_store', 'revalidated')
+            definition = stored['definition']
+
+        else:
+            count_cache('application_store', 'miss')
+            definition = response['results'][0]
+
+            # Also store the definition with its version
+            if 'version' not in params:
+                versioned = (f"{params['product_id']}:"
+                             f"{definition['application']['version']}")
+                _store_set(versioned, definition)
+
+        _store_set(application, definition, etag)
+        return definition
+
+    @classmethod
+    def list(cls, prefix=''):
         """
         List available applications on Accelize web service.
 
@@ -173,12 +870,27 @@ class Application:
         Returns:
             list of str: products.
         """
-        return accelize_ws_session.request(
-            '/auth/objects/productconfigurationlistproduct/', params=dict(
-                product_id__startswith=prefix) if prefix else None)['results']
+        return list(cls.iter_list(prefix))
 
     @staticmethod
-    def list_versions(product_id, prefix=''):
+    def iter_list(prefix='', prefetch=False):
+        """
+        Iterate over available applications on Accelize web service.
+
+        Args:
+            prefix (str): Product ID prefix to filter.
+            prefetch (bool): If True, request the next page in background.
+
+        Returns:
+            generator of str: products.
+        """
+        return _iter_results(
+            '/auth/objects/productconfigurationlistproduct/', params=dict(
+                product_id__startswith=prefix) if prefix else None,
+            prefetch=prefetch)
+
+    @classmethod
+    def list_versions(cls, product_id, prefix=''):
         """
         List available applications on Accelize web service.
 
@@ -189,12 +901,27 @@ class Application:
         Returns:
             list of str: versions.
         """
+        return list(cls.iter_versions(product_id, prefix))
+
+    @staticmethod
+    def iter_versions(product_id, prefix='', prefetch=False):
+        """
+        Iterate over available applications versions on Accelize web service.
+
+        Args:
+            product_id (str): Product ID linked to the application.
+            prefix (str): Version prefix to filter.
+            prefetch (bool): If True, request the next page in background.
+
+        Returns:
+            generator of str: versions.
+        """
         params = dict(product_id=product_id)
         if prefix:
             params['version__startswith'] = prefix
-        return accelize_ws_session.request(
-            '/auth/objects/productconfigurationlistversion/',
-            params=params)['results']
+        return _iter_results(
+            '/auth/objects/productconfigurationlistversion/', params=params,
+            prefetch=prefetch)
 
     def push(self):
         """
@@ -205,6 +932,9 @@ class Application:
             data=dumps(self.to_dict()),
             method='post')['application']['configuration_id']
 
+        # Latest version may have changed
+        _store_remove(self._definition['application']['product_id'])
+
     def delete(self):
         """
         Delete application definition on Accelize web service.
@@ -217,6 +947,10 @@ class Application:
             f'/auth/objects/productconfiguration/{self._configuration_id}/',
             method='delete')
 
+        application = self._definition['application']
+        product_id = application['product_id']
+        _store_remove(product_id, f"{product_id}:{application['version']}")
+
     @property
     def providers(self):
         """
@@ -227,30 +961,37 @@ class Application:
         """
         return self._providers
 
-    def _create_provider_definitions(self):
+    def _create_provider_definition(self, provider):
         """
-        Create cached definition for each provider + a default unspecified
-        provider.
+        Create definition for a provider.
+
+        Nodes without provider specific values are not copied, but shared with
+        the global definition. The provider definition should be considered
+        read-only.
+
+        Args:
+            provider (str or None): provider, None for default definition.
 
         Returns:
             dict: Definition
         """
-        result = dict()
-        for provider in list(self._providers) + [None]:
-            result[provider] = provider_definition = dict()
+        provider_definition = dict()
+        get_provider_node = self._get_provider_node
 
-            for section in self._definition:
-                node = self._definition[section]
+        for section_name, section in self._definition.items():
 
-                if isinstance(node, dict):
-                    provider_definition[section] = self._get_provider_node(
-                        node, provider)
-                else:
-                    provider_definition[section] = [
-                        self._get_provider_node(node[i], provider)
-                        for i in range(len(node))]
+            if isinstance(section, dict):
+                provider_definition[section_name] = get_provider_node(
+                    section, provider)
+                continue
+
+            nodes = [get_provider_node(node, provider) for node in section]
+            provider_definition[section_name] = (
+                # Share the list if all nodes are shared
+                section if all(provider_node is node for provider_node, node
+                               in zip(nodes, section)) else nodes)
 
-        return result
+        return provider_definition
 
     def _get_provider_node(self, node, provider):
         """
@@ -263,7 +1004,15 @@ class Application:
         Returns:
             dict: Node
         """
-        result_node = node.copy()
+        providers = self._providers
+
+        # No provider specific values: Use node as is
+        if providers.isdisjoint(node):
+            return node
+
+        # Clean up Providers
+        result_node = {key: value for key, value in node.items()
+                       if key not in providers}
 
         # Update node with provider specific values
         try:
@@ -271,310 +1020,44 @@ class Application:
         except KeyError:
             pass
 
-        # Clean up other Providers
-        for key in self._providers:
-            try:
-                del result_node[key]
-            except KeyError:
-                pass
-
         return result_node
 
-    def save(self, path=None):
+    def save(self, path=None, round_trip=False):
         """
         Save the definition file.
 
         Args:
             path (path-like object): Path where save Yaml definition file.
+            round_trip (bool): If True, only update values that changed in the
+                existing definition file, and preserve its formatting and
+                comments. Requires "ruamel.yaml". If None, use round-trip mode
+                only if "ruamel.yaml" is installed.
         """
-        yaml_write(self.to_dict(), path or self._path)
-
-    def to_dict(self):
-        """
-        Return definition as a dictionary.
-
-        Returns:
-            dict: definition
-        """
-        # Clean up empty and None values
-        definition = deepcopy(self._definition)
-        for section_name in tuple(definition):
-            section = definition[section_name]
-
-            if isinstance(section, list):
-                for element in tuple(section):
-                    for key in tuple(element):
-                        if not element[key] and element[key] is not False:
-                            del element[key]
-                    if not element:  # pragma: no cover
-                        # Should never append because currently all list
-                        # sections have at least one mandatory key
-                        section.remove(element)
-
-            else:
-                for key in tuple(section):
-                    if not section[key] and section[key] is not False:
-                        del section[key]
-
-            if not section:
-                del definition[section_name]
-
-        return definition
-
-    def _validate(self, definition):
-        """
-        Validate definition file content, and complete missing values.
-
-        Args:
-            definition (dict): Definition.
-
-        Returns:
-            dict: definition
-
-        Raises:
-            ValueError: Error in section format.
-        """
-        for section_name in FORMAT:
-
-            section_format = FORMAT[section_name]
-            node_type = section_format['_node']
-
+        if round_trip is None:
             try:
-                section = definition[section_name]
-            except KeyError:
-                # Create missing definition section
-                section = definition[section_name] = node_type()
-
-            definition[section_name] = self._validate_section(
-                node_type, section, section_name, section_format)
-
-        # Check for unknown sections
-        for section_name in definition:
-            if section_name not in FORMAT:
-                raise ConfigurationException(
-                    f'Unknown "{section_name}" section.')
-
-        return definition
+                import ruamel.yaml  # noqa: F401
+                round_trip = True
+            except ImportError:
+                round_trip = False
 
-    def _validate_section(
-            self, node_type, section, section_name, section_format):
-        """
-        Validate a section
-
-        Args:
-            node_type (class): Type of node (dict or list)
-            section (dict or list): Section to validate.
-            section_name (str): Section name.
-            section_format (dict): Section format.
-
-        Raises:
-            ValueError: Error in section format.
-
-        Returns:
-            dict or list: section.
-        """
-        if not isinstance(section, node_type):
-            if node_type == dict:
-                raise ConfigurationException(
-                    f'The section "{section_name}" must be a "mapping".')
-            else:
-                section = [section]
-
-        if section_name == 'package' and not section:
-            raise ConfigurationException(
-                f'The section "{section_name}" must contain a least one '
-                f'"mapping".')
-
-        for node in (section if isinstance(section, list) else (section,)):
-            args = (node, section_format, section_name)
-            self._validate_node(*args)
-            if not self._validate_provider_node(*args):
-                self._check_required(*args)
-
-        return section
-
-    @staticmethod
-    def _validate_node(node, node_format, section_name):
-        """
-        Validate a node.
-
-        Args:
-            node (dict): Node to validate
-            node_format (dict): Node format
-            section_name (str): Parent section name.
-
-        Raises:
-            accelpy.exceptions.ConfigException: Error in node format.
-        """
-        for key in node_format:
-
-            if key == '_node':
-                continue
-
-            key_format = node_format[key]
-
-            # Set default value if missing
-            node.setdefault(key, key_format.get('default'))
-            value = node[key]
-
-            # Check and eventually update value
-            node[key] = Application._check_value(
-                key, key_format, value, section_name)
-
-    @staticmethod
-    def _check_required(node, node_format, section_name):
-        """
-        Check for required value in default provider.
-
-        Args:
-            node (dict): Node to validate
-            node_format (dict): Node format
-            section_name (str): Parent section name.
-
-        Raises:
-            accelpy.exceptions.ConfigException: Error in node format.
-        """
-        for key in node_format:
-
-            if key == '_node':
-                continue
-
-            # Check required value for default provider
-            if node_format[key].get('required', False) and node[key] is None:
-                raise ConfigurationException(
-                    f'The "{key}" key in "{section_name}" section is required.')
-
-    @staticmethod
-    def _check_value(key, key_format, value, section_name):
-        """
-        Check if value is valid
-
-        Args:
-            key (str): Key
-            key_format (dict): Key format
-            value: Key value
-            section_name (str): Section name
-
-        Returns:
-            value.
-
-        Raises:
-            accelpy.exceptions.ConfigException: Error in value.
-        """
-        # Check list of values
-        value_type = key_format.get('value_type', str)
-        if isinstance(value_type, tuple) and value_type[0] == list:
-            # Checks value content type
-            if isinstance(value, value_type[0]):
-                for element in value:
-                    if not isinstance(element, value_type[1]):
-                        raise ConfigurationException(
-                            f'The "{key}" key in "{section_name}" section must '
-                            f'be a list of "{value_type[1].__name__}".')
+        if not round_trip or not self._path:
+            return yaml_write(self.to_dict(), path or self._path)
 
-            # Single element list
-            elif isinstance(value, value_type[1]):
-                return [value]
-
-            # Bad value in list
-            elif value is not None:
-                raise ConfigurationException(
-                    f'The "{key}" key in "{section_name}" section must be a '
-                    f'list of "{value_type[1].__name__}".')
+        # Compare with the definition of the existing file to update only
+        # changed values
+        document = yaml_read_round_trip(self._path)
+        original = _to_dict(_read_definition(self._path, set()))
+        yaml_write_round_trip(_round_trip_update(
+            document, original, self.to_dict()), path or self._path)
 
-        # Check single value type
-        elif value is not None and not isinstance(value, value_type):
-            if value_type is str:
-                value = str(value)
-            else:
-                raise ConfigurationException(
-                    f'The "{key}" key in "{section_name}" section must be a '
-                    f'"{value_type.__name__}".')
-
-        valid_values = key_format.get('values')
-        valid_regex = key_format.get('regex')
-
-        # Check single value in allowed values
-        if valid_values and not (
-                value in valid_values or value == key_format.get('default')):
-            raise ConfigurationException(
-                f'Invalid value "{value}" for "{key}" key in "{section_name}" '
-                f'section (possibles values are '
-                f'{", ".join(str(valid_value) for valid_value in valid_values)}'
-                ').')
-
-        # Check single value match regex
-        elif valid_regex and value and not fullmatch(valid_regex, value):
-            raise ConfigurationException(
-                f'Invalid value "{value}" for "{key}" key in "{section_name}" '
-                f'section '
-                f'({key_format.get("regex_help", "See documentation")}).')
-
-        return value
-
-    def _validate_provider_node(self, node, node_format, section_name):
+    def to_dict(self):
         """
-        Validate an provider override node.
-
-        Args:
-            node (dict): Node to validate
-            node_format (dict): Node format
-            section_name (str): Parent section name.
+        Return definition as a dictionary.
 
-        Raises:
-            ValueError: Error in node format.
+        Empty and None values are removed. Values are not copied and are
+        shared with the application definition.
 
         Returns:
-            bool: True in at least one provider found.
+            dict: definition
         """
-        provider_found = False
-        for provider in node:
-
-            # Not an provider
-            if provider in node_format:
-                continue
-
-            if provider in FORMAT:
-                raise ConfigurationException(
-                    f'Provider in "{section_name}" section cannot be named with'
-                    f' reserved name "{provider}".')
-
-            # Provider found
-            self._providers.add(provider)
-            provider_found = True
-            provider_node = node[provider]
-
-            # Provider that is not a dict is likely an unknown key
-            if not isinstance(provider_node, dict) or provider_node == '_node':
-                raise ConfigurationException(
-                    f'Unknown "{provider_node}" key in '
-                    f'"{section_name}" section.')
-
-            # Check provider integrity
-            for key in node_format:
-
-                if key == '_node':
-                    continue
-
-                value = provider_node.get(key, node.get(key))
-                key_format = node_format[key]
-
-                # Required value for provider
-                if key_format.get('required', False) and value is None:
-                    raise ConfigurationException(
-                        f'The "{key}" key in "{section_name}" section is '
-                        f'required for "{provider}" provider.')
-
-                # Check value
-                if key in provider_node:
-                    provider_node[key] = Application._check_value(
-                        key, key_format, value, section_name)
-
-            # Check for unknown keys in provider
-            for key in provider_node:
-                if key not in node_format or key == '_node':
-                    raise ConfigurationException(
-                        f'Unknown "{key}" key in "{section_name}" section '
-                        f'for "{provider}" provider.')
-
-        return provider_found
+        return _to_dict(self._definition)
@@ -1,20 +1,26 @@
 # coding=utf-8
 """Global configuration"""
 from importlib import import_module as _import_module
-from json import (load as _json_load, JSONDecodeError as _JSONDecodeError,
-                  dump as _json_dump)
+from json import (JSONDecodeError as _JSONDecodeError, dumps as _json_dumps,
+                  loads as _json_loads)
 from os import (fsdecode as _fsdecode, symlink as _symlink, chmod as _chmod,
                 makedirs as _makesdirs, scandir as _scandir,
-                listdir as _listdir, environ as _environ, remove as _remove)
+                listdir as _listdir, environ as _environ, remove as _remove,
+                replace as _replace, fsync as _fsync, stat as _stat,
+                open as _open, close as _close, O_RDONLY as _O_RDONLY)
 from os.path import (
     expanduser as _expanduser, isdir as _isdir, realpath as _realpath,
     join as _join, dirname as _dirname, basename as _basename,
     isfile as _isfile, splitext as _splitext)
-from platform import system as _system
-from subprocess import run as _run, PIPE as _PIPE
-from time import time as _time
+from threading import local as _local
+from time import time as _time, perf_counter as _perf_counter
 
+from accelpy._metrics import (
+    observe_call as _observe_call, count_cache as _count_cache)
+from accelpy._tracing import (
+    span as _span, propagate_span as _propagate_span)
 from accelpy.exceptions import (
+    AccelizeException as _AccelizeException,
     RuntimeException as _RuntimeException,
     AuthenticationException as _AuthenticationException,
     ConfigurationException as _ConfigurationException,
@@ -26,18 +32,85 @@ HOME_DIR = _expanduser('~/.accelize')
 # Cached values storage
 CACHE_DIR = _join(HOME_DIR, '.cache')
 
-# Ensure directory exists and have restricted access rights
-_makesdirs(CACHE_DIR, exist_ok=True)
-_chmod(HOME_DIR, 0o700)
+# JSON serializer, selected on first use
+_json_backend = None
+
+# User configuration directory creation status
+_home_dir_ready = False
+
+# Thread local "call" outputs redirection
+_call_output = _local()
 
 # ANSI shell colors
 _COLORS = dict(RED=31, GREEN=32, YELLOW=33, BLUE=34, PINK=35, CYAN=36, GREY=37)
 
 
+def _get_json_backend():
+    """
+    Return the JSON serializer to use.
+
+    Returns:
+        tuple: Fast serializer "dumps" (or None), fast serializer "loads" (or
+            None), decoding errors, fast serializer encoding errors.
+    """
+    global _json_backend
+    if _json_backend is not None:
+        return _json_backend
+
+    try:
+        # Use orjson if available
+        from orjson import dumps, loads, OPT_NON_STR_KEYS
+
+        def fast_dumps(data):
+            """orjson.dumps with "json.dumps" keys handling"""
+            return dumps(data, option=OPT_NON_STR_KEYS)
+
+        _json_backend = (fast_dumps, loads, (_JSONDecodeError,), (TypeError,))
+
+    except ImportError:
+        try:
+            # Else, use ujson if available
+            from ujson import dumps, loads
+
+            def fast_dumps(data):
+                """ujson.dumps with "json.dumps" characters escaping"""
+                return dumps(data, escape_forward_slashes=False).encode()
+
+            _json_backend = (fast_dumps, loads, (ValueError,),
+                             (TypeError, OverflowError))
+
+        except ImportError:
+            # Else use the standard library
+            _json_backend = (None, None, (_JSONDecodeError,), ())
+
+    return _json_backend
+
+
+def ensure_home_dir(path=None):
+    """
+    Ensure the user configuration directory exists and have restricted access
+    rights.
+
+    Args:
+        path (path-like object): Sub directory of the user configuration
+            directory to create.
+    """
+    global _home_dir_ready
+    if not _home_dir_ready:
+        _makesdirs(HOME_DIR, exist_ok=True)
+        _chmod(HOME_DIR, 0o700)
+        _home_dir_ready = True
+
+    if path:
+        _makesdirs(path, exist_ok=True)
+
+
 def json_read(path, **kwargs):
     """
     Read a JSON file.
 
+    "orjson" or "ujson" are used if installed and no "kwargs" are specified.
+
     Args:
         path (path-like object): Path to file to load.
         kwargs: "json.load" kwargs.
@@ -46,26 +119,117 @@ def json_read(path, **kwargs):
         dict or list: Un-serialized content
     """
     path = _realpath(_fsdecode(path))
-    with open(path, 'rt') as file:
-        try:
-            return _json_load(file, **kwargs)
+    with open(path, 'rb') as file:
+        content = file.read()
+
+    _, fast_loads, decode_errors, _ = _get_json_backend()
+    try:
+        if fast_loads is None or kwargs:
+            return _json_loads(content, **kwargs)
+        return fast_loads(content)
 
-        except _JSONDecodeError as exception:
-            raise _ConfigurationException(
-                f'Unable to read "{path}": {str(exception)}')
+    except decode_errors as exception:
+        raise _ConfigurationException(
+            f'Unable to read "{path}": {str(exception)}')
 
 
-def json_write(data, path, **kwargs):
+def json_write(data, path, fsync=False, **kwargs):
     """
-    Write a JSON file
+    Write a JSON file.
+
+    The file is written atomically: The content is written in a temporary file
+    that replace the file once completed, so the file is never partially
+    written. Mode of the replaced file is preserved, new files are only
+    readable by the user.
+
+    "orjson" or "ujson" are used if installed and no "kwargs" are specified.
 
     Args:
         data (dict or list): data to serialize.
         path (path-like object): Path where save file.
+        fsync (bool): If True, flush the file and its directory to disk before
+            returning.
         kwargs: "json.dump" kwargs.
     """
-    with open(_fsdecode(path), 'wt') as file:
-        _json_dump(data, file, **kwargs)
+    fast_dumps, _, _, encode_errors = _get_json_backend()
+    content = None
+    if fast_dumps is not None and not kwargs:
+        try:
+            content = fast_dumps(data)
+        except encode_errors:
+            # Unsupported by fast serializer (Like big integers)
+            pass
+    if content is None:
+        content = _json_dumps(data, **kwargs).encode()
+
+    write_atomic(path, content, fsync=fsync)
+
+
+def write_atomic(path, content, fsync=False, mode=None):
+    """
+    Write a file atomically.
+
+    The content is written in a temporary file that replace the file once
+    completed, so the file is never partially written. Mode of the replaced
+    file is preserved.
+
+    Args:
+        path (path-like object): Path where save file.
+        content (bytes): File content.
+        fsync (bool): If True, flush the file and its directory to disk before
+            returning.
+        mode (int): Mode of the file if new. Default to only readable by the
+            user.
+    """
+    # Lazy import: Only required to write files
+    from tempfile import mkstemp
+
+    # Follow symbolic links to update their target
+    path = _realpath(_fsdecode(path))
+    directory = _dirname(path)
+    fd, tmp_path = mkstemp(
+        prefix=f'.{_basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with open(fd, 'wb') as file:
+            file.write(content)
+            if fsync:
+                file.flush()
+                _fsync(file.fileno())
+
+        try:
+            _chmod(tmp_path, _stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            if mode is not None:
+                _chmod(tmp_path, mode)
+
+        _replace(tmp_path, path)
+
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+    if fsync:
+        # Persist the rename
+        dir_fd = _open(directory, _O_RDONLY)
+        try:
+            _fsync(dir_fd)
+        finally:
+            _close(dir_fd)
+
+
+def _run(*args, **kwargs):
+    """
+    "subprocess.run", imported on first call.
+
+    Args:
+        args: "subprocess.run" arguments.
+        kwargs: "subprocess.run" keyword arguments.
+
+    Returns:
+        subprocess.CompletedProcess: Result.
+    """
+    from subprocess import run
+    return run(*args, **kwargs)
 
 
 def recursive_update(to_update, update):
@@ -105,30 +269,102 @@ def call(command, check=True, pipe_stdout=False, retries=0, **run_kwargs):
     Returns:
         subprocess.CompletedProcess: Utility call result.
     """
-    kwargs = dict(universal_newlines=True, stderr=_PIPE)
+    # Lazy import: Only required when calling utilities
+    from subprocess import PIPE
+
+    kwargs = dict(universal_newlines=True, stderr=PIPE)
     kwargs.update(run_kwargs)
 
+    output = getattr(_call_output, 'file', None)
     if pipe_stdout:
-        kwargs.setdefault('stdout', _PIPE)
+        kwargs.setdefault('stdout', PIPE)
+    elif output is not None:
+        kwargs.setdefault('stdout', output)
+
+    with _span('call', command=' '.join(command),
+               argv=list(command)) as span:
+        start = _perf_counter()
+        retried = 0
+        while True:
+            if output is not None:
+                output.write(f"$ {' '.join(command)}\n")
+                output.flush()
 
-    retried = 0
-    while True:
-        result = _run(command, **kwargs)
+            result = _run(command, **kwargs)
 
-        if result.returncode and retried < retries:
-            retried += 1
-            continue
-        break
+            if output is not None:
+                # Also write outputs that were captured
+                for captured in (result.stdout, result.stderr):
+                    if captured and isinstance(captured, str):
+                        output.write(captured)
+                output.flush()
 
-    if check and result.returncode:
-        raise _RuntimeException('\n'.join((
-            'Error while running:', ' '.join(command), '',
-            (result.stderr or result.stdout or
-             warn('See stdout for more information.')).strip())))
+            if result.returncode and retried < retries:
+                retried += 1
+                continue
+            break
+
+        _observe_call(command, _perf_counter() - start, retried,
+                      result.returncode)
+        span.set_attribute('returncode', result.returncode)
+        span.set_attribute('retries', retried)
+
+        if check and result.returncode:
+            raise _RuntimeException('\n'.join((
+                'Error while running:', ' '.join(command), '',
+                (result.stderr or result.stdout or
+                 warn('See stdout for more information.')).strip())))
 
     return result
 
 
+class redirect_call_output:
+    """
+    Context manager that redirects outputs of "call" subprocesses run in the
+    current thread to a file.
+
+    Args:
+        file (file-like object): Text file opened for writing.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_call_output, 'file', None)
+        _call_output.file = self._file
+        return self._file
+
+    def __exit__(self, *_):
+        _call_output.file = self._previous
+
+
+def propagate_context(func):
+    """
+    Wrap a function to run it with the "call" outputs redirection and the
+    tracing span of the current thread. Used to run the function in another
+    thread.
+
+    Args:
+        func (callable): Function.
+
+    Returns:
+        callable: Wrapped function.
+    """
+    func = _propagate_span(func)
+    file = getattr(_call_output, 'file', None)
+    if file is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        """Run with "call" outputs redirection"""
+        with redirect_call_output(file):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
 def get_sources_dirs(*src):
     """
     Return sources directories.
@@ -244,8 +480,12 @@ def no_color():
     Returns:
         bool: True if no color mode.
     """
-    return (bool(_environ.get("ACCELPY_NO_COLOR", False)) and
-            _system() != 'Windows')
+    if not _environ.get("ACCELPY_NO_COLOR", False):
+        return False
+
+    # Lazy import: Only required in no color mode
+    from platform import system
+    return system() != 'Windows'
 
 
 def debug():
@@ -363,7 +603,17 @@ def get_cli_cache(name, recursive=False):
     # List cached values candidates
     timestamp = _time()
     candidates = {}
-    for filename in _listdir(CACHE_DIR):
+    try:
+        filenames = _listdir(CACHE_DIR)
+    except FileNotFoundError:
+        _count_cache('cli', 'miss')
+        return None
+
+    for filename in filenames:
+        if filename.startswith('.'):
+            # Temporary file being written
+            continue
+
         path = _join(CACHE_DIR, filename)
         cached_name, expiry = filename.rsplit('_', 1)
 
@@ -381,6 +631,7 @@ def get_cli_cache(name, recursive=False):
         candidates[cached_name] = path
 
     if not candidates:
+        _count_cache('cli', 'miss')
         return
 
     # Get cached value, or return None
@@ -396,9 +647,13 @@ def get_cli_cache(name, recursive=False):
 
     for hashed_name in (hash_cli_name(name) for name in names):
         try:
-            return json_read(candidates[hashed_name])
+            value = json_read(candidates[hashed_name])
         except KeyError:
             continue
+        _count_cache('cli', 'hit')
+        return value
+
+    _count_cache('cli', 'miss')
 
 
 def set_cli_cache(name, obj, expiry_timestamp=None, expiry_seconds=30):
@@ -421,9 +676,19 @@ def set_cli_cache(name, obj, expiry_timestamp=None, expiry_seconds=30):
     if expiry_timestamp is None:
         expiry_timestamp = int(_time()) + expiry_seconds
 
-    path = _join(CACHE_DIR, f"{hash_cli_name(name)}_{int(expiry_timestamp)}")
-    json_write(obj, path)
-    _chmod(path, 0o600)
+    hashed_name = hash_cli_name(name)
+    filename = f"{hashed_name}_{int(expiry_timestamp)}"
+    ensure_home_dir(CACHE_DIR)
+    json_write(obj, _join(CACHE_DIR, filename))
+
+    # Remove previous values with the same name
+    for other in _listdir(CACHE_DIR):
+        if other.startswith(f"{hashed_name}_") and other != filename:
+            try:
+                _remove(_join(CACHE_DIR, other))
+            except OSError:  # pragma: no cover
+                # May be already removed by another accelpy instance
+                continue
 
     return obj
 
@@ -431,17 +696,34 @@ def set_cli_cache(name, obj, expiry_timestamp=None, expiry_seconds=30):
 class _AccelizeWSSession:
     """
     Accelize Web Service session.
+
+    The session is thread-safe and can be shared between threads.
+
+    Args:
+        pool_size (int): Maximum number of connections kept alive in the
+            connection pool. Also used as default number of concurrent requests
+            in "batch_request".
     """
     _TIMEOUT = 10
     _RETRIES = 3
+    _POOL_SIZE = 10
+    _REFRESH_RATIO = 0.8
     _ENDPOINT = 'https://master.metering.accelize.com'
 
-    def __init__(self):
+    def __init__(self, pool_size=None):
+        # Lazy import: Only required to share the session between threads
+        from threading import Lock
+
         self._token_expire = 0
+        self._token_refresh = 0
         self._token = ''
+        self._refreshing = False
         self._session = None
         self._session_request = None
         self._endpoint = self._ENDPOINT
+        self._pool_size = pool_size or self._POOL_SIZE
+        self._session_lock = Lock()
+        self._token_lock = Lock()
 
     @property
     def _request(self):
@@ -452,23 +734,44 @@ class _AccelizeWSSession:
         Returns:
             requests.Response
         """
-        if self._session is None:
-            # Lazy import, may never be called
-            from requests import Session
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
-
-            # Create session with automatic retries on some error codes
-            adapter = HTTPAdapter(max_retries=Retry(
-                total=self._RETRIES, read=self._RETRIES, connect=self._RETRIES,
-                backoff_factor=0.3, status_forcelist=(408, 500, 502, 504)))
+        # Test the returned value, it is assigned once the session is ready
+        session_request = self._session_request
+        if session_request is None:
+            with self._session_lock:
+                session_request = self._session_request
+                if session_request is None:
+                    session_request = self._session_request = \
+                        self._create_session()
+
+        return session_request
+
+    def _create_session(self):
+        """
+        Create the HTTP session.
 
-            self._session = Session()
-            self._session.mount('http://', adapter)
-            self._session.mount('https://', adapter)
-            self._session_request = self._session.request
+        Connections are kept alive and pooled to be reused by all threads.
 
-        return self._session_request
+        Returns:
+            function: "Requests.Session.request" method.
+        """
+        # Lazy import, may never be called
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Create session with automatic retries on some error codes
+        adapter = HTTPAdapter(
+            pool_connections=self._pool_size, pool_maxsize=self._pool_size,
+            max_retries=Retry(
+                total=self._RETRIES, read=self._RETRIES,
+                connect=self._RETRIES, backoff_factor=0.3,
+                status_forcelist=(408, 500, 502, 504)))
+
+        session = Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        self._session = session
+        return session.request
 
     def request(self, path, method='get', **kwargs):
         """
@@ -482,37 +785,132 @@ class _AccelizeWSSession:
         Returns:
             dict or list: Response.
         """
+        response = self._authenticated_request(path, method, **kwargs)
+
+        # Handle HTTP status
+        if response.status_code >= 300:
+            raise _WebServerException(self._get_error_message(response))
+
+        # Return response content as JSON
+        try:
+            return response.json()
+        except _JSONDecodeError:
+            # Some responses return empty content
+            return
+
+    def batch_request(self, paths, method='get', max_workers=None,
+                      **kwargs):
+        """
+        Performs many requests concurrently with automatic authentication
+        handling.
+
+        Args:
+            paths (iterable of str): URL paths.
+            method (str): Request method.
+            max_workers (int): Maximum number of concurrent requests. Default
+                to the connection pool size.
+            kwargs: "Requests.Session.request" keyword arguments.
+
+        Returns:
+            list: Responses, in the same order as "paths".
+        """
+        paths = list(paths)
+        if len(paths) < 2:
+            return [self.request(path, method, **kwargs) for path in paths]
+
+        # Lazy import: Only required for concurrent requests
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Authenticate once before sending requests
+        self._authenticate()
+
+        with ThreadPoolExecutor(max_workers=min(
+                max_workers or self._pool_size, len(paths))) as executor:
+            return list(executor.map(
+                lambda path: self.request(path, method, **kwargs), paths))
+
+    def conditional_request(self, path, etag=None, **kwargs):
+        """
+        Performs a conditional "GET" request with automatic authentication
+        handling.
+
+        Args:
+            path (str): URL path
+            etag (str): "ETag" of the previously received content. If
+                specified, the content is not returned if not modified.
+            kwargs: "Requests.Session.request" keyword arguments.
+
+        Returns:
+            tuple: Response (or None if not modified), "ETag" (or None if not
+                supported by the web service).
+        """
+        response = self._authenticated_request(
+            path, 'get', headers={'If-None-Match': etag} if etag else None,
+            **kwargs)
+
+        # Content not modified
+        if response.status_code == 304:
+            return None, etag
+
+        # Handle HTTP status
+        elif response.status_code >= 300:
+            raise _WebServerException(self._get_error_message(response))
+
+        return response.json(), response.headers.get('ETag')
+
+    def _authenticated_request(self, path, method, headers=None, **kwargs):
+        """
+        Performs a request with automatic authentication handling.
+
+        Args:
+            path (str): URL path or absolute URL.
+            method (str): Request method.
+            headers (dict): Extra headers.
+            kwargs: "Requests.Session.request" keyword arguments.
+
+        Returns:
+            requests.Response: Response.
+        """
         retried = False
 
         while True:
             # Get authentication token if not already exists
-            self._authenticate()
+            token = self._authenticate()
+
+            # Path may already be an absolute URL (Like pagination links), the
+            # authentication token must only be sent to the web service
+            if path.startswith(('https://', 'http://')):
+                if not (path == self._endpoint or
+                        path.startswith(self._endpoint + '/')):
+                    raise _WebServerException(
+                        f'URL "{path}" is not on "{self._endpoint}"')
+                url = path
+            else:
+                url = self._endpoint + path
 
             # Perform request
+            request_headers = {
+                "Authorization": "Bearer " + token,
+                "Content-Type": "application/json",
+                "Accept": "application/vnd.accelize.v1+json"}
+            if headers:
+                request_headers.update(headers)
+
             response = self._request(
-                method, self._endpoint + path, headers={
-                    "Authorization": "Bearer " + self._token,
-                    "Content-Type": "application/json",
-                    "Accept": "application/vnd.accelize.v1+json"},
-                timeout=self._TIMEOUT, **kwargs)
+                method, url, headers=request_headers, timeout=self._TIMEOUT,
+                **kwargs)
 
             # Authentication token may be invalid, retry with a new one
             if response.status_code == 401 and not retried:
-                self._token = ''
-                self._token_expire = 0
+                with self._token_lock:
+                    # Another thread may already have renewed the token
+                    if self._token == token:
+                        self._token = ''
+                        self._token_expire = 0
                 retried = True
                 continue
 
-            # Handle HTTP status
-            elif response.status_code >= 300:
-                raise _WebServerException(self._get_error_message(response))
-
-            # Return response content as JSON
-            try:
-                return response.json()
-            except _JSONDecodeError:
-                # Some responses return empty content
-                return
+            return response
 
     @staticmethod
     def _get_error_message(response):
@@ -534,49 +932,149 @@ class _AccelizeWSSession:
         """
         Authenticate user from its credentials.
 
+        If many threads require a new token at the same time, only one thread
+        get it and others wait for it.
+
+        The token is refreshed in background before it expires.
+
+        Returns:
+            str: Authentication token.
+
         Raises:
             apyfal.exceptions.ClientAuthenticationException:
                 User credential are not valid.
         """
-        # Check if token expired
-        if self._token_expire and self._token_expire < _time():
-            self._token = ''
+        token = self._token
+        if token and not self._token_expired():
+            if self._token_refresh < _time():
+                self._start_token_refresh()
+            return token
+
+        with self._token_lock:
+            # Token may have been renewed by another thread while waiting
+            if self._token_expired():
+                self._token = ''
+
+            if not self._token:
+                self._set_token(*self._get_token())
+
+            return self._token
+
+    def _token_expired(self):
+        """
+        Check if the token is expired.
+
+        Returns:
+            bool: True if expired.
+        """
+        return bool(self._token_expire and self._token_expire < _time())
+
+    def _set_token(self, token, expire, refresh):
+        """
+        Set the token.
+
+        Args:
+            token (str): Token.
+            expire (int): Token expiry timestamp.
+            refresh (int): Token refresh timestamp.
+        """
+        self._token_expire = expire
+        self._token_refresh = refresh
+        self._token = token
+
+    def _start_token_refresh(self):
+        """
+        Start refreshing the token in a background thread.
+        """
+        with self._token_lock:
+            if self._refreshing or self._token_refresh >= _time():
+                return
+            self._refreshing = True
+
+        # Lazy import: Only required for long running sessions
+        from threading import Thread
+        Thread(target=self._refresh_token, daemon=True).start()
+
+    def _refresh_token(self):
+        """
+        Refresh the token, the current token is used until replaced.
+        """
+        token = None
+        try:
+            token = self._get_token(refresh=True)
+        except (_AccelizeException, OSError, KeyError, ValueError):
+            # Will be renewed on expiry
+            pass
+        finally:
+            with self._token_lock:
+                if token:
+                    self._set_token(*token)
+                else:
+                    self._token_refresh = self._token_expire
+                self._refreshing = False
+
+    def _get_token(self, refresh=False):
+        """
+        Get OAuth2 token from CLI cache or from web service.
 
-        # Get OAuth2 token
-        if not self._token:
-            # Get user credentials
-            credentials = json_read(get_accelize_cred())
-            client_id = credentials['client_id']
-            client_secret = credentials['client_secret']
+        Args:
+            refresh (bool): If True, ignore CLI cached token that needs to be
+                refreshed.
 
-            # Endpoint override in credentials file
-            self._endpoint = credentials.get('endpoint', self._ENDPOINT)
+        Returns:
+            tuple: token, expiry timestamp, refresh timestamp.
 
-            # Try to get CLI cached token
+        Raises:
+            apyfal.exceptions.ClientAuthenticationException:
+                User credential are not valid.
+        """
+        # Get user credentials
+        credentials = json_read(get_accelize_cred())
+        client_id = credentials['client_id']
+        client_secret = credentials['client_secret']
+
+        # Endpoint override in credentials file
+        self._endpoint = credentials.get('endpoint', self._ENDPOINT)
+
+        # Try to get CLI cached token. The refresh timestamp is cached
+        # separately to keep the token cache compatible with previous versions
+        refresh_name = f'token_refresh|{client_id}'
+        cached = get_cli_cache(client_id)
+        if cached:
+            token, expire = cached[:2]
             try:
-                self._token, self._token_expire = get_cli_cache(client_id)
-
-            # Try to get token from web service
-            except TypeError:
-                response = self._request(
-                    'post', f'{self._endpoint}/o/token/',
-                    data={"grant_type": "client_credentials"},
-                    auth=(client_id, client_secret),
-                    timeout=self._TIMEOUT)
-
-                if response.status_code >= 300:
-                    raise _AuthenticationException(
-                        'Unable to authenticate client ID starting by '
-                        f'"{client_id[:10]}": '
-                        f'{self._get_error_message(response)}')
-
-                access = response.json()
-                self._token = access['access_token']
-                self._token_expire = int(_time()) + access['expires_in'] - 1
-
-                # Cache token value for future CLI usage
-                set_cli_cache(client_id, [self._token, self._token_expire],
-                              self._token_expire)
+                cached_expire, refresh_timestamp = get_cli_cache(refresh_name)
+                if cached_expire != expire:
+                    # Token cached by a previous version
+                    raise ValueError
+            except (TypeError, ValueError):
+                refresh_timestamp = expire
+            if not refresh or refresh_timestamp >= _time():
+                return token, expire, refresh_timestamp
+
+        # Get token from web service
+        response = self._request(
+            'post', f'{self._endpoint}/o/token/',
+            data={"grant_type": "client_credentials"},
+            auth=(client_id, client_secret),
+            timeout=self._TIMEOUT)
+
+        if response.status_code >= 300:
+            raise _AuthenticationException(
+                'Unable to authenticate client ID starting by '
+                f'"{client_id[:10]}": '
+                f'{self._get_error_message(response)}')
+
+        access = response.json()
+        timestamp = int(_time())
+        token = (access['access_token'],
+                 timestamp + access['expires_in'] - 1,
+                 timestamp + int(access['expires_in'] * self._REFRESH_RATIO))
+
+        # Cache token value for future CLI usage
+        set_cli_cache(client_id, list(token[:2]), token[1])
+        set_cli_cache(refresh_name, list(token[1:]), token[1])
+        return token
 
 
 accelize_ws_session = _AccelizeWSSession()
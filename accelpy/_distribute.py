@@ -0,0 +1,499 @@
+# coding=utf-8
+"""Files distribution to hosts"""
+from os import environ
+from os.path import basename
+from posixpath import dirname as remote_dirname, join as remote_join
+from shlex import quote
+from threading import Lock
+
+from accelpy._ssh import SSH_OPTIONS, select_hosts, ssh_command
+from accelpy._tracing import span
+from accelpy.exceptions import ConfigurationException, RuntimeException
+
+#: SSH client executable on relay hosts
+RELAY_SSH_EXECUTABLE = 'ssh'
+
+#: SSH agent executable
+SSH_AGENT_EXECUTABLE = 'ssh-agent'
+
+#: SSH agent keys management executable
+SSH_ADD_EXECUTABLE = 'ssh-add'
+
+#: Default number of hosts the controller sends files to concurrently
+SEEDS = 2
+
+#: Default number of hosts each host forwards files to concurrently
+FANOUT = 2
+
+#: Default number of retries of a failed transfer to an host
+RETRIES = 2
+
+# Suffix of partially transferred files
+_PART = '.part'
+
+# Read size to compute checksums
+_CHUNK_SIZE = 1048576
+
+
+def _sha256(path):
+    """
+    Compute the SHA256 checksum of a file.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        str: Hexadecimal checksum.
+    """
+    # Lazy import: Only required to distribute files
+    from hashlib import sha256
+
+    checksum = sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def _prepare_command(file):
+    """
+    Return the shell command that prints "done" if the file is already on the
+    host, else the size of its partially transferred file.
+
+    Args:
+        file (dict): File.
+
+    Returns:
+        str: Shell command.
+    """
+    dest = quote(file['dest'])
+    part = quote(file['dest'] + _PART)
+    return (f'if [ -f {dest} ] && [ "$(sha256sum < {dest} | cut -d" " -f1)" '
+            f'= {file["sha256"]} ]; then echo done; else '
+            f'mkdir -p {quote(remote_dirname(file["dest"]) or ".")} && '
+            f'if [ -f {part} ]; then wc -c < {part}; else echo 0; fi; fi')
+
+
+def _write_command(file, offset):
+    """
+    Return the shell command that writes stdin to the partially transferred
+    file.
+
+    Args:
+        file (dict): File.
+        offset (int): Offset to resume from.
+
+    Returns:
+        str: Shell command.
+    """
+    return f'cat {">>" if offset else ">"} {quote(file["dest"] + _PART)}'
+
+
+def _finalize_command(file):
+    """
+    Return the shell command that verifies the checksum of the transferred file
+    and moves it to its destination. The partially transferred file is removed
+    if corrupted.
+
+    Args:
+        file (dict): File.
+
+    Returns:
+        str: Shell command.
+    """
+    dest = quote(file['dest'])
+    part = quote(file['dest'] + _PART)
+    return (f'if [ "$(sha256sum < {part} | cut -d" " -f1)" = '
+            f'{file["sha256"]} ]; then mv -f {part} {dest}; else '
+            f'rm -f {part}; echo "Checksum mismatch: {file["name"]}" >&2; '
+            f'exit 1; fi')
+
+
+class _Agents:
+    """
+    SSH agents holding hosts private keys, forwarded to relay hosts to let them
+    connect to others hosts. There is one agent per key to not exceed the
+    authentication attempts limit of SSH servers when hosts use distinct keys.
+    """
+
+    def __init__(self):
+        self._envs = dict()
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Lazy import: Only required to distribute files
+        from accelpy._common import call
+
+        for env in self._envs.values():
+            call([SSH_AGENT_EXECUTABLE, '-k'], env=env, check=False,
+                 pipe_stdout=True)
+
+    def env(self, key):
+        """
+        Return the environment to use the agent holding a key.
+
+        Args:
+            key (str): Private key path.
+
+        Returns:
+            dict: Environment variables.
+        """
+        # Lazy import: Only required to distribute files
+        from re import findall
+        from accelpy._common import call
+
+        with self._lock:
+            try:
+                return self._envs[key]
+            except KeyError:
+                pass
+
+            env = environ.copy()
+            env.update(findall(r'(SSH_\w+)=([^;\s]+);', call(
+                [SSH_AGENT_EXECUTABLE, '-s'], pipe_stdout=True).stdout))
+            self._envs[key] = env
+            call([SSH_ADD_EXECUTABLE, '-q', key], env=env, pipe_stdout=True)
+            return env
+
+
+def _target_command(target, source, command):
+    """
+    Return the SSH client command to run a shell command on the target host,
+    from the controller or from a relay host.
+
+    Args:
+        target (dict): Target host.
+        source (dict): Relay host. None for the controller.
+        command (str): Shell command to run on the target host, or on the
+            relay host if a callable that takes the SSH client command to
+            connect the target host from the relay.
+
+    Returns:
+        list of str: Command.
+    """
+    if source is None:
+        return ssh_command(target['public'], (command,))
+
+    # Relays connect to the target private IP with the forwarded agent
+    private = target['private']
+    relay = ' '.join(
+        [RELAY_SSH_EXECUTABLE] +
+        [f'-o {quote(option)}' for option in SSH_OPTIONS] +
+        ['--', quote(f'{private["user"]}@{private["address"]}')])
+    command = command(relay) if callable(command) else \
+        f'{relay} {quote(command)}'
+    return ssh_command(source['public'], (command,), args=('-A',),
+                       master=False)
+
+
+def _error_message(exception):
+    """
+    Return the short error message of a failed call.
+
+    Args:
+        exception (Exception): Exception.
+
+    Returns:
+        str: Last line of the error message.
+    """
+    lines = [line for line in str(exception).splitlines() if line.strip()]
+    return lines[-1].strip() if lines else exception.__class__.__name__
+
+
+def _transfer(target, source, files, agents, output):
+    """
+    Send files to an host, from the controller or from a relay host.
+
+    Transfers resume from partially transferred files, and files already on the
+    host with the same checksum are skipped.
+
+    Args:
+        target (dict): Target host.
+        source (dict): Relay host. None for the controller.
+        files (list of dict): Files.
+        agents (accelpy._distribute._Agents): SSH agents.
+        output (accelpy._ssh._Output): Output.
+
+    Returns:
+        dict: Result.
+    """
+    # Lazy import: Only required to distribute files
+    from subprocess import DEVNULL
+    from time import perf_counter
+    from accelpy._common import call
+
+    name = target['name']
+    source_name = source['name'] if source else None
+    result = dict(host=name, source=source_name, sent=0, duration=0.0,
+                  error=None)
+
+    with span('push_files.transfer', host=name, source=source_name or ''):
+        start = perf_counter()
+        try:
+            kwargs = dict(env=agents.env(target['private']['key'])) if \
+                source else dict()
+
+            for file in files:
+                prepared = call(_target_command(
+                    target, source, _prepare_command(file)),
+                    stdin=DEVNULL, pipe_stdout=True, **kwargs).stdout.strip()
+                if prepared == 'done':
+                    continue
+
+                offset = int(prepared)
+                if offset > file['size']:
+                    # Not the same file, overwrite it
+                    offset = 0
+
+                write = _write_command(file, offset)
+                if source is None:
+                    with open(file['path'], 'rb') as stdin:
+                        stdin.seek(offset)
+                        call(_target_command(target, None, write), stdin=stdin,
+                             pipe_stdout=True)
+                else:
+                    call(_target_command(target, source, lambda relay: (
+                        f'tail -c +{offset + 1} {quote(file["dest"])} | '
+                        f'{relay} {quote(write)}')), stdin=DEVNULL,
+                        pipe_stdout=True, **kwargs)
+
+                call(_target_command(target, source, _finalize_command(file)),
+                     stdin=DEVNULL, pipe_stdout=True, **kwargs)
+                result['sent'] += file['size'] - offset
+
+        except (RuntimeException, OSError, ValueError) as exception:
+            result['error'] = _error_message(exception)
+
+        result['duration'] = perf_counter() - start
+
+    output.write(name, (
+        f'{"failed" if result["error"] else "done"} from '
+        f'{source_name or "controller"}: {_format_size(result["sent"])} in '
+        f'{result["duration"]:.3f}s'
+        f'{": " + result["error"] if result["error"] else ""}').encode())
+    return result
+
+
+def _format_size(size):
+    """
+    Format a size in bytes.
+
+    Args:
+        size (int): Size in bytes.
+
+    Returns:
+        str: Human readable size.
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            break
+        size /= 1024
+    return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+
+
+def _get_hosts(names, relay=True):
+    """
+    Get connection information of hosts.
+
+    Args:
+        names (list of str): Hosts names.
+        relay (bool): If True, also get information required to relay files
+            between hosts.
+
+    Returns:
+        tuple: list of dict of hosts, list of dict of results of hosts that
+            cannot be connected.
+    """
+    # Lazy import: Only required to distribute files
+    from accelpy._host import get_user_parameters
+    from accelpy._ssh import get_connection
+
+    hosts = []
+    errors = []
+    for name in names:
+        try:
+            host = dict(name=name, public=get_connection(name), private=None,
+                        provider=None)
+        except ConfigurationException as exception:
+            errors.append(dict(host=name, source=None, sent=0, duration=0.0,
+                               error=str(exception)))
+            continue
+
+        if relay:
+            # Relays are only used between hosts of the same provider, that
+            # are likely in the same private network
+            host['provider'] = get_user_parameters(name).get('provider')
+            try:
+                host['private'] = get_connection(name, private_ip=True)
+            except ConfigurationException:
+                # No private IP, only the controller can send files
+                pass
+
+        hosts.append(host)
+    return hosts, errors
+
+
+def push_files(files, destination='.', hosts='all', seeds=None, fanout=None,
+               retries=None, file=None):
+    """
+    Distribute files to many hosts over SSH.
+
+    The controller sends files to a few hosts, that then forward them to others
+    hosts over their private IP address. Each host that received files becomes
+    a source for the remaining hosts, so the distribution time grows
+    logarithmically with the number of hosts instead of linearly.
+
+    Files checksums are verified on each host, and transfers resume from
+    partially transferred files. Files already on the host are skipped.
+
+    Hosts connection information are read from their Terraform state, and
+    relays forward files only to hosts of the same provider. Hosts without
+    provider or private IP address only receive files from the controller.
+
+    Args:
+        files (iterable of str): Local files paths.
+        destination (str): Destination directory on hosts. Relative paths are
+            relative to the user home directory. Default to the user home
+            directory.
+        hosts (str or iterable of str): "all", or hosts names glob patterns.
+        seeds (int): Maximum number of hosts the controller sends files to
+            concurrently. Default to 2.
+        fanout (int): Maximum number of hosts each host forwards files to
+            concurrently. "0" disables relays. Default to 2.
+        retries (int): Number of retries of a failed transfer to an host.
+            Default to 2.
+        file (file-like object): Progress outputs file. Default to
+            "sys.stdout".
+
+    Returns:
+        list of dict: Results of each host, sorted by host name, with "host",
+            "source" (Host that sent files, "None" for the controller), "sent"
+            (Bytes sent), "duration" of the last transfer in seconds, and
+            "error" (Error message or "None").
+    """
+    # Lazy import: Only required to distribute files
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    from os.path import abspath, getsize, isfile
+    from accelpy._common import propagate_context
+    from accelpy._ssh import _Output
+
+    seeds = SEEDS if seeds is None else seeds
+    fanout = FANOUT if fanout is None else fanout
+    retries = RETRIES if retries is None else retries
+    if seeds < 1 or fanout < 0 or retries < 0:
+        raise ConfigurationException(
+            'Seeds must be positive, fanout and retries must not be negative.')
+
+    paths = [abspath(path) for path in files]
+    if not paths:
+        raise ConfigurationException('A file is required.')
+    names = [basename(path) for path in paths]
+    for path in paths:
+        if not isfile(path):
+            raise ConfigurationException(f'No such file: {path}')
+    if len(set(names)) != len(names):
+        raise ConfigurationException('Files names must be unique.')
+
+    if file is None:
+        from sys import stdout
+        file = stdout
+
+    host_names = select_hosts(hosts)
+    output = _Output(file, host_names)
+
+    with span('push_files', hosts=len(host_names), files=len(paths)):
+        files = [dict(path=path, name=name, size=getsize(path),
+                      dest=remote_join(destination, name),
+                      sha256=_sha256(path))
+                 for path, name in zip(paths, names)]
+
+        targets, errors = _get_hosts(host_names, relay=bool(fanout))
+        results = {result['host']: result for result in errors}
+        pending = deque(targets)
+
+        # Free concurrent transfers slots of each source, "None" is the
+        # controller
+        slots = {None: seeds}
+        sources = dict()
+        attempts = dict()
+        failed_sources = dict()
+        running = dict()
+
+        def select_source(target):
+            """Select an available source for the target, or False"""
+            candidates = [
+                name for name, free in slots.items()
+                if free and name is not None and target['private'] and
+                target['provider'] is not None and
+                sources[name]['provider'] == target['provider'] and
+                name not in failed_sources.get(target['name'], ())]
+            if candidates:
+                # Relays first to save the controller uplink
+                return max(candidates, key=slots.get)
+            return None if slots[None] else False
+
+        with _Agents() as agents, ThreadPoolExecutor(
+                max_workers=seeds + fanout * len(targets) or 1) as executor:
+            while pending or running:
+                for target in tuple(pending):
+                    source_name = select_source(target)
+                    if source_name is False:
+                        continue
+                    pending.remove(target)
+                    slots[source_name] -= 1
+                    attempts[target['name']] = attempts.get(
+                        target['name'], 0) + 1
+                    future = executor.submit(
+                        propagate_context(_transfer), target,
+                        sources.get(source_name), files, agents, output)
+                    running[future] = source_name, target
+
+                done = wait(running, return_when=FIRST_COMPLETED)[0]
+                for future in done:
+                    source_name, target = running.pop(future)
+                    slots[source_name] += 1
+                    result = results[target['name']] = future.result()
+
+                    if not result['error']:
+                        # The target can now forward files to others hosts
+                        # of its provider
+                        if fanout and target['provider'] is not None:
+                            sources[target['name']] = target
+                            slots[target['name']] = fanout
+
+                    elif attempts[target['name']] <= retries:
+                        if source_name is not None:
+                            failed_sources.setdefault(
+                                target['name'], set()).add(source_name)
+                        pending.append(target)
+
+        return [results[name] for name in host_names]
+
+
+def format_summary(results):
+    """
+    Format results of "push_files".
+
+    Args:
+        results (list of dict): Results.
+
+    Returns:
+        str: Summary, one line per host.
+    """
+    width = max(len(result['host']) for result in results)
+    source_width = max(len(result['source'] or 'controller')
+                       for result in results)
+    lines = []
+    for result in results:
+        line = (f'{result["host"]:<{width}}  '
+                f'{result["source"] or "controller":<{source_width}}  '
+                f'{_format_size(result["sent"]):>8}  '
+                f'{result["duration"]:>8.3f}s')
+        if result['error']:
+            line += f'  {result["error"]}'
+        lines.append(line)
+    return '\n'.join(lines)
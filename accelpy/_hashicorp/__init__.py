@@ -1,11 +1,11 @@
 # coding=utf-8
 """HashiCorp utilities common functions"""
-from os import chmod, stat, makedirs, fsdecode, scandir
+from os import chmod, stat, fsdecode, scandir
 from os.path import join, isfile, dirname
 
 from accelpy._common import (
     HOME_DIR, call, get_sources_dirs, get_sources_filters, get_cli_cache,
-    set_cli_cache)
+    set_cli_cache, ensure_home_dir)
 from accelpy.exceptions import RuntimeException
 
 
@@ -89,7 +89,7 @@ class Utility:
                 checksum_raw, compressed, last_release['archive_name'])
 
             # Ensure directories exists
-            makedirs(cls._install_dir(), exist_ok=True)
+            ensure_home_dir(cls._install_dir())
 
             # Lazy import package that are required only on install
             from io import BytesIO
@@ -1,8 +1,13 @@
 """Manage hosts life-cycle"""
-from os import chmod, fsdecode, makedirs, scandir, symlink
+from contextlib import contextmanager
+from os import chmod, fsdecode, scandir, symlink
 from os.path import isabs, isdir, isfile, join, realpath
 
-from accelpy._common import HOME_DIR, get_accelize_cred, json_read, json_write
+from accelpy._common import (
+    HOME_DIR, get_accelize_cred, json_read, json_write, ensure_home_dir,
+    propagate_context)
+from accelpy._metrics import observe_operation
+from accelpy._tracing import span
 from accelpy.exceptions import ConfigurationException, AccelizeException
 
 CONFIG_DIR = join(HOME_DIR, 'hosts')
@@ -36,6 +41,41 @@ def iter_hosts():
         yield Host(name=name)
 
 
+def get_state_outputs(name):
+    """
+    Read outputs of an host from its Terraform state file, without running
+    Terraform.
+
+    Args:
+        name (str): Host name.
+
+    Returns:
+        dict: Outputs values. Empty if the configuration is not applied.
+    """
+    try:
+        outputs = json_read(
+            join(CONFIG_DIR, name, 'terraform.tfstate'))['outputs']
+    except (OSError, KeyError, TypeError, AccelizeException):
+        return dict()
+    return {key: output['value'] for key, output in outputs.items()}
+
+
+def get_user_parameters(name):
+    """
+    Read parameters of an host that were specified on its creation.
+
+    Args:
+        name (str): Host name.
+
+    Returns:
+        dict: Parameters, like "provider". Empty if not available.
+    """
+    try:
+        return json_read(join(CONFIG_DIR, name, 'user_parameters.json'))
+    except (OSError, AccelizeException):
+        return dict()
+
+
 class Host:
     """Host configuration.
 
@@ -91,7 +131,9 @@ class Host:
         # Create a new configuration
 
         if not config_exists and application:
-            self._create_config(application, provider, user_config)
+            with span('host.create_config', host=name, provider=provider), \
+                    observe_operation('init', provider):
+                self._create_config(application, provider, user_config)
 
         # Unable to create configuration
         elif not config_exists:
@@ -132,7 +174,7 @@ class Host:
         # Create target configuration directory and remove access to other
         # users since Terraform state files may content sensible data and
         # directory may contain SSH private key
-        makedirs(self._config_dir, exist_ok=True)
+        ensure_home_dir(self._config_dir)
         chmod(self._config_dir, 0o700)
 
         # Save user parameters
@@ -141,7 +183,8 @@ class Host:
                    self._user_parameters_json)
 
         # Get application and its definition
-        self._init_application_definition(application)
+        with span('host.application_definition'):
+            self._init_application_definition(application)
         app = self._application[provider]
         fpga_count = app['fpga']['count']
         application_type = app['application']['type']
@@ -158,7 +201,7 @@ class Host:
         from accelpy._ansible import Ansible
 
         # Set Ansible variables
-        ansible_env = Ansible.environment()
+        ansible_env = Ansible.environment(self._config_dir)
         ansible_exec = Ansible.playbook_exec()
         ansible_variables = dict(
             fpga_image=app['fpga']['image'],
@@ -206,7 +249,7 @@ class Host:
                     (self._packer, packer_variables)):
 
                 futures.append(executor.submit(
-                    getattr(utility, 'create_configuration'),
+                    propagate_context(self._create_utility_config), utility,
                     provider=provider, application_type=application_type,
                     variables=variables, user_config=user_config))
 
@@ -216,6 +259,44 @@ class Host:
         # Restore keep config flag once configuration si completed
         self._keep_config = keep_config
 
+    @contextmanager
+    def _operation(self, operation):
+        """
+        Trace and measure an host operation.
+
+        Args:
+            operation (str): Operation name.
+        """
+        with span(f'host.{operation}', host=self._name), \
+                observe_operation(operation, self._provider):
+            yield
+
+    @property
+    def _provider(self):
+        """
+        Host provider.
+
+        Returns:
+            str: Provider, None if not available.
+        """
+        try:
+            return json_read(self._user_parameters_json)['provider']
+        except (OSError, KeyError, AccelizeException):
+            return None
+
+    @staticmethod
+    def _create_utility_config(utility, **kwargs):
+        """
+        Create an utility configuration.
+
+        Args:
+            utility (object): Utility.
+            kwargs: Utility "create_configuration" keyword arguments.
+        """
+        with span(f'{utility.__class__.__name__.lower()}.'
+                  'create_configuration'):
+            utility.create_configuration(**kwargs)
+
     def _init_accelize_cred(self, user_config):
         """
         Initialize Accelize Credentials.
@@ -295,7 +376,8 @@ class Host:
         Returns:
             str: Show planned infrastructure detail.
         """
-        return self._terraform.plan()
+        with self._operation('plan'):
+            return self._terraform.plan()
 
     def apply(self, quiet=False):
         """
@@ -308,7 +390,8 @@ class Host:
         self._terraform_output = None
 
         # Apply
-        self._terraform.apply(quiet=quiet)
+        with self._operation('apply'):
+            self._terraform.apply(quiet=quiet)
 
     def build(self, update_application=False, quiet=False):
         """
@@ -317,18 +400,23 @@ class Host:
         Args:
             update_application (bool): If applicable, update the application
                 definition Yaml file to use this image as host base for the
-                selected provider. Warning, this will reset any yaml file
-                formatting and comments.
+                selected provider. Yaml file formatting and comments are
+                preserved only if "ruamel.yaml" is installed.
             quiet (bool): If True, hide outputs.
 
         Returns:
             str: Image ID or path (Depending provider)
         """
-        manifest = self._packer.build(quiet=quiet)
-        image = self._packer.get_artifact(manifest)
+        provider = self._provider
+        if update_application and provider is None:
+            raise ConfigurationException(
+                'Require a provider to update the application definition.')
+
+        with self._operation('build'):
+            manifest = self._packer.build(quiet=quiet)
+            image = self._packer.get_artifact(manifest)
 
         if update_application:
-            provider = json_read(self._user_parameters_json)['provider']
             try:
                 section = self._application['package'][0][provider]
             except KeyError:
@@ -336,7 +424,7 @@ class Host:
 
             section['type'] = 'vm_image'
             section['name'] = image
-            self._application.save()
+            self._application.save(round_trip=None)
 
         return image
 
@@ -351,7 +439,13 @@ class Host:
         """
         if delete is not None:
             self._keep_config = not delete
-        self._terraform.destroy(quiet=quiet)
+
+        # Lazy import: Only required on destroy
+        from accelpy._ssh import close_master
+
+        with self._operation('destroy'):
+            close_master(self._name)
+            self._terraform.destroy(quiet=quiet)
         self._terraform_output = None
 
     @property
@@ -0,0 +1,184 @@
+# coding=utf-8
+"""Ansible dynamic inventory of hosts"""
+from os.path import join, realpath
+from re import compile as _compile
+
+from accelpy._tracing import span
+from accelpy.exceptions import AccelizeException, ConfigurationException
+
+# Characters not allowed in Ansible groups names
+_GROUP_INVALID_CHARS = _compile(r'\W')
+
+
+def _group_name(prefix, value):
+    """
+    Return a valid Ansible group name.
+
+    Args:
+        prefix (str): Group prefix.
+        value (str): Group value.
+
+    Returns:
+        str: Group name.
+    """
+    return f'{prefix}_{_GROUP_INVALID_CHARS.sub("_", value.lower())}'
+
+
+def _get_application(config_dir, provider, cache):
+    """
+    Get the "application" section of an host application definition.
+
+    Args:
+        config_dir (str): Host configuration directory.
+        provider (str): Provider name.
+        cache (dict): Application definitions by path, hosts often share the
+            same definition file.
+
+    Returns:
+        dict: Application section. Empty if not available.
+    """
+    # Lazy import: Only required with an application definition
+    from accelpy._application import Application
+
+    path = realpath(join(config_dir, 'application.yml'))
+    try:
+        try:
+            application = cache[path]
+        except KeyError:
+            application = cache[path] = Application(path)
+        return application[provider]['application']
+    except (OSError, KeyError, AccelizeException):
+        return dict()
+
+
+def _get_playbook_variables(config_dir):
+    """
+    Get variables of an host generated Ansible playbook. Theses are the
+    variables passed to roles on provisioning, from the application definition.
+
+    Args:
+        config_dir (str): Host configuration directory.
+
+    Returns:
+        dict: Variables. Empty if not available.
+    """
+    # Lazy import: Only required with a playbook
+    from accelpy._yaml import yaml_read
+
+    try:
+        return dict(yaml_read(join(config_dir, 'playbook.yml'))[0]['vars'])
+    except (OSError, LookupError, TypeError, ValueError):
+        return dict()
+
+
+def get_inventory(hosts='all', private_ip=False):
+    """
+    Get the Ansible dynamic inventory of hosts.
+
+    Hosts are grouped by provider ("provider_*" groups, nested by provider
+    parameters), application ("application_*" groups) and application type
+    ("type_*" groups). Hosts that are not applied are not in the inventory.
+
+    Hosts variables are connection information from the Terraform state, with
+    the SSH master connection of the host, host parameters from
+    "user_parameters.json" and application definition ("accelpy_*" variables)
+    and variables of the host generated Ansible playbook.
+
+    Args:
+        hosts (str or iterable of str): "all", or hosts names glob patterns.
+        private_ip (bool): If True, use the private IP address instead of the
+            public IP address.
+
+    Returns:
+        dict: Inventory in the Ansible inventory script format. Hosts variables
+            are in "_meta", so Ansible does not need to call the script for
+            each host.
+    """
+    # Lazy import: Only required to generate the inventory
+    from accelpy._host import get_user_parameters
+    from accelpy._ssh import (
+        SSH_OPTIONS, get_connection, master_options, select_hosts)
+
+    inventory = dict(_meta=dict(hostvars=dict()))
+    hostvars = inventory['_meta']['hostvars']
+    applications = dict()
+
+    def add(group, host=None, child=None):
+        """Add an host or a child group to a group"""
+        node = inventory.setdefault(group, dict(hosts=[], children=[]))
+        if host and host not in node['hosts']:
+            node['hosts'].append(host)
+        if child and child not in node['children']:
+            node['children'].append(child)
+
+    try:
+        names = select_hosts(hosts)
+    except ConfigurationException:
+        # No host: Empty inventory
+        names = []
+
+    with span('inventory', hosts=len(names)):
+        for name in names:
+            try:
+                connection = get_connection(name, private_ip)
+            except ConfigurationException:
+                # Not applied
+                continue
+            config_dir = connection['config_dir']
+            parameters = get_user_parameters(name)
+            provider = parameters.get('provider')
+            application = _get_application(config_dir, provider, applications)
+
+            variables = _get_playbook_variables(config_dir)
+            variables.update({f'accelpy_{key}': value
+                              for key, value in parameters.items()})
+            variables.update(
+                accelpy_application=application.get('product_id'),
+                accelpy_application_version=application.get('version'),
+                accelpy_application_type=application.get('type'),
+                ansible_host=connection['address'],
+                ansible_user=connection['user'],
+                ansible_ssh_private_key_file=connection['key'],
+                ansible_ssh_common_args=' '.join(
+                    f'-o {option}' for option in
+                    SSH_OPTIONS + tuple(master_options(config_dir))))
+            hostvars[name] = variables
+
+            # Provider groups: "provider_aws" > "provider_aws_eu_west_1"...
+            if provider:
+                parts = provider.split(',')
+                parent = None
+                for index in range(len(parts)):
+                    group = _group_name('provider', '_'.join(
+                        parts[:index + 1]))
+                    if parent:
+                        add(parent, child=group)
+                    parent = group
+                add(parent, host=name)
+
+            if application.get('product_id'):
+                add(_group_name('application', application['product_id']),
+                    host=name)
+            if application.get('type'):
+                add(_group_name('type', application['type']), host=name)
+
+    return inventory
+
+
+def get_host_variables(name, private_ip=False):
+    """
+    Get the Ansible variables of an host.
+
+    Args:
+        name (str): Host name.
+        private_ip (bool): If True, use the private IP address instead of the
+            public IP address.
+
+    Returns:
+        dict: Variables. Empty if the host does not exists or is not applied.
+    """
+    # Lazy import: Only required to generate the inventory
+    from glob import escape
+
+    return get_inventory(escape(name), private_ip)['_meta']['hostvars'].get(
+        name, dict())
@@ -0,0 +1,608 @@
+# coding=utf-8
+"""Persistent host actions jobs queue"""
+from contextlib import contextmanager
+from json import dumps, loads
+from os import getpid, kill, remove
+from os.path import dirname, isdir, isfile, join
+from socket import gethostname
+from threading import Condition, Event, Thread, get_ident
+from time import time
+
+from accelpy._common import (
+    HOME_DIR, ensure_home_dir, redirect_call_output)
+from accelpy._host import Host, CONFIG_DIR
+from accelpy.exceptions import ConfigurationException, RuntimeException
+
+#: Default jobs database
+JOBS_DB = join(HOME_DIR, 'jobs.sqlite')
+
+#: Host actions running as jobs
+JOB_ACTIONS = ('init', 'plan', 'apply', 'build', 'destroy')
+
+#: Supported keyword arguments of each host action
+JOB_KWARGS = dict(
+    init=('application', 'provider', 'user_config'),
+    plan=('quiet',),
+    apply=('quiet',),
+    build=('update_application', 'quiet'),
+    destroy=('delete', 'quiet'))
+
+#: Jobs status
+JOB_STATUS = ('pending', 'running', 'succeeded', 'failed')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    action TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expiry REAL,
+    result TEXT,
+    error TEXT,
+    error_type TEXT,
+    output TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    ended REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, name);
+"""
+
+_COLUMNS = ('id', 'action', 'name', 'kwargs', 'status', 'attempts', 'worker',
+            'lease_expiry', 'result', 'error', 'error_type', 'output',
+            'created', 'started', 'ended')
+
+
+def _to_dict(row):
+    """
+    Convert a database row to a job dictionary.
+
+    Args:
+        row (tuple): Row with "_COLUMNS" values.
+
+    Returns:
+        dict: Job.
+    """
+    job = dict(zip(_COLUMNS, row))
+    job['kwargs'] = loads(job['kwargs'])
+    if job['result'] is not None:
+        job['result'] = loads(job['result'])
+    return job
+
+
+def _worker_alive(worker):
+    """
+    Check if the process of a worker is still running.
+
+    Args:
+        worker (str): Worker ID.
+
+    Returns:
+        bool: False if the worker is known as not running.
+    """
+    try:
+        hostname, pid, _ = worker.rsplit(':', 2)
+    except ValueError:
+        return True
+    if hostname != gethostname() or not pid.isdigit():
+        # Unable to check workers running on other machines
+        return True
+
+    try:
+        kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # pragma: no cover
+        pass
+    return True
+
+
+def run_host_action(job, hosts=None, quiet=True):
+    """
+    Run the host action of a job.
+
+    Args:
+        job (dict): Job.
+        hosts (dict): Hosts already loaded, by name. Updated with hosts loaded
+            or created by the action.
+        quiet (bool): Default value for the action "quiet" argument.
+
+    Returns:
+        object: Action result.
+    """
+    if hosts is None:
+        hosts = dict()
+    action = job['action']
+    name = job['name']
+    kwargs = dict(job['kwargs'])
+
+    if action == 'init':
+        if job['attempts'] > 1:
+            _clean_partial_config(name)
+        host = hosts[name] = Host(name=name, **kwargs)
+        return host.name
+
+    try:
+        host = hosts[name]
+    except KeyError:
+        host = hosts[name] = Host(name=name)
+    kwargs.setdefault('quiet', quiet)
+
+    if action == 'plan':
+        return host.plan()
+
+    elif action == 'apply':
+        return host.apply(**kwargs)
+
+    elif action == 'build':
+        return host.build(**kwargs)
+
+    # Destroy
+    host.destroy(**kwargs)
+    if kwargs.get('delete'):
+        del hosts[name]
+        host._clean_up()
+
+
+def _clean_partial_config(name):
+    """
+    Remove a host configuration that was partially created by an interrupted
+    job. The configuration is kept if it has a Terraform state.
+
+    Args:
+        name (str): Host name.
+    """
+    config_dir = join(CONFIG_DIR, name)
+    if isdir(config_dir) and not isfile(join(config_dir, 'terraform.tfstate')):
+        # Lazy import: Only used on remove
+        from shutil import rmtree
+
+        rmtree(config_dir, ignore_errors=True)
+
+
+class JobQueue:
+    """
+    Persistent host actions jobs queue.
+
+    Jobs are stored in a SQLite database and can be shared between many
+    processes. Workers claim jobs with a lease that they renew while the job is
+    running. If a worker stops without completing its job, the job is retried
+    once its lease expired. Jobs on the same host run sequentially, in
+    submission order.
+
+    Outputs of commands run by jobs are written in a log file next to the
+    database.
+
+    Args:
+        path (path-like object): Database path. Default to "jobs.sqlite" in the
+            user configuration directory.
+        lease (float): Jobs lease duration in seconds.
+        max_attempts (int): Maximum number of time a job is run if its worker
+            stopped before completing it.
+    """
+
+    def __init__(self, path=None, lease=60.0, max_attempts=3):
+        self._path = str(path or JOBS_DB)
+        self._logs_dir = join(dirname(self._path), 'jobs')
+        self._lease = lease
+        self._max_attempts = max_attempts
+        self._initialized = False
+        self._changed = Condition()
+
+    @property
+    def path(self):
+        """
+        Database path.
+
+        Returns:
+            str: Path.
+        """
+        return self._path
+
+    @contextmanager
+    def _transaction(self, immediate=False):
+        """
+        Database transaction.
+
+        Args:
+            immediate (bool): If True, lock the database for writing on
+                transaction start.
+
+        Yields:
+            sqlite3.Connection: Database connection.
+        """
+        # Lazy import: Only required to use the queue
+        from sqlite3 import connect
+
+        if not self._initialized:
+            if self._path == JOBS_DB:
+                ensure_home_dir()
+            ensure_home_dir(self._logs_dir)
+            connection = connect(self._path, timeout=30, isolation_level=None)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.executescript(_SCHEMA)
+            finally:
+                connection.close()
+            self._initialized = True
+
+        connection = connect(self._path, timeout=30, isolation_level=None)
+        try:
+            connection.execute(
+                'BEGIN IMMEDIATE' if immediate else 'BEGIN DEFERRED')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        finally:
+            connection.close()
+
+    def _notify(self):
+        """
+        Notify threads waiting for a job change.
+        """
+        with self._changed:
+            self._changed.notify_all()
+
+    def submit(self, action, name=None, **kwargs):
+        """
+        Submit a host action job.
+
+        Args:
+            action (str): Host action, one of "JOB_ACTIONS".
+            name (str): Host name. If not specified with "init", a random name
+                is generated.
+            kwargs: Host action keyword arguments.
+
+        Returns:
+            dict: Job.
+        """
+        # Lazy import: Only required when creating jobs
+        from uuid import uuid1, uuid4
+
+        if action not in JOB_ACTIONS:
+            raise ConfigurationException(f'Unsupported action "{action}".')
+
+        unsupported = set(kwargs) - set(JOB_KWARGS[action])
+        if unsupported:
+            raise ConfigurationException(
+                f'Unsupported "{action}" arguments: '
+                f'{", ".join(sorted(unsupported))}.')
+
+        if not name and action == 'init':
+            name = str(uuid1()).replace('-', '')
+
+        elif not name:
+            raise ConfigurationException('A host name is required.')
+
+        job_id = uuid4().hex
+        row = (job_id, action, name, dumps(kwargs), 'pending', 0, None, None,
+               None, None, None, join(self._logs_dir, f'{job_id}.log'),
+               time(), None, None)
+
+        with self._transaction() as db:
+            db.execute(f'INSERT INTO jobs VALUES ({",".join("?" * len(row))})',
+                       row)
+        self._notify()
+        return _to_dict(row)
+
+    def get(self, job_id):
+        """
+        Get a job.
+
+        Args:
+            job_id (str): Job ID.
+
+        Returns:
+            dict: Job.
+
+        Raises:
+            KeyError: Job not found.
+        """
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f'No job "{job_id}".')
+        return _to_dict(row)
+
+    def list(self, status=None, name=None, limit=1000):
+        """
+        List jobs, from the most recent.
+
+        Args:
+            status (str): If specified, returns only jobs with this status.
+            name (str): If specified, returns only jobs of this host.
+            limit (int): Maximum number of jobs to return.
+
+        Returns:
+            list of dict: Jobs.
+        """
+        where = []
+        args = []
+        for column, value in (('status', status), ('name', name)):
+            if value is not None:
+                where.append(f'{column} = ?')
+                args.append(value)
+        query = 'SELECT * FROM jobs'
+        if where:
+            query += f' WHERE {" AND ".join(where)}'
+        query += ' ORDER BY rowid DESC LIMIT ?'
+
+        with self._transaction() as db:
+            rows = db.execute(query, args + [limit]).fetchall()
+        return [_to_dict(row) for row in rows]
+
+    def wait(self, job_id, timeout=None, poll=1.0):
+        """
+        Wait for a job completion.
+
+        Args:
+            job_id (str): Job ID.
+            timeout (float): Maximum time to wait in seconds. Wait forever if
+                not specified.
+            poll (float): Database polling interval in seconds. Jobs completed
+                in this process are notified immediately.
+
+        Returns:
+            dict: Job.
+        """
+        end = None if timeout is None else time() + timeout
+        with self._changed:
+            while True:
+                job = self.get(job_id)
+                if job['status'] not in ('pending', 'running'):
+                    return job
+
+                remaining = poll if end is None else min(end - time(), poll)
+                if remaining <= 0:
+                    return job
+                self._changed.wait(remaining)
+
+    def claim(self, worker):
+        """
+        Claim the oldest pending job that can run.
+
+        Jobs of hosts that already have a running job are not claimed.
+
+        Args:
+            worker (str): Worker ID.
+
+        Returns:
+            dict or None: Claimed job, None if no job available.
+        """
+        now = time()
+        with self._transaction(immediate=True) as db:
+            self._expire(db, now)
+            row = db.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' AND name NOT IN "
+                "(SELECT name FROM jobs WHERE status = 'running') "
+                "ORDER BY rowid LIMIT 1").fetchone()
+            if row is None:
+                return None
+
+            db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                "worker = ?, lease_expiry = ?, started = ? WHERE id = ?",
+                (worker, now + self._lease, now, row[0]))
+            row = db.execute(
+                'SELECT * FROM jobs WHERE id = ?', (row[0],)).fetchone()
+
+        return _to_dict(row)
+
+    def renew(self, job_id, worker):
+        """
+        Renew the lease of a running job.
+
+        Args:
+            job_id (str): Job ID.
+            worker (str): Worker ID.
+
+        Returns:
+            bool: False if the job is not owned by this worker anymore.
+        """
+        with self._transaction() as db:
+            return bool(db.execute(
+                "UPDATE jobs SET lease_expiry = ? WHERE id = ? AND "
+                "worker = ? AND status = 'running'",
+                (time() + self._lease, job_id, worker)).rowcount)
+
+    def complete(self, job_id, worker, result=None):
+        """
+        Mark a running job as succeeded.
+
+        Args:
+            job_id (str): Job ID.
+            worker (str): Worker ID.
+            result (object): Job result. Must be JSON serializable.
+
+        Returns:
+            bool: False if the job is not owned by this worker anymore.
+        """
+        return self._end(job_id, worker, 'succeeded', result=dumps(
+            result, default=str))
+
+    def fail(self, job_id, worker, exception):
+        """
+        Mark a running job as failed.
+
+        Args:
+            job_id (str): Job ID.
+            worker (str): Worker ID.
+            exception (Exception): Job error.
+
+        Returns:
+            bool: False if the job is not owned by this worker anymore.
+        """
+        return self._end(job_id, worker, 'failed', error=str(exception),
+                         error_type=exception.__class__.__name__)
+
+    def _end(self, job_id, worker, status, result=None, error=None,
+             error_type=None):
+        """
+        Mark a running job as ended.
+
+        Args:
+            job_id (str): Job ID.
+            worker (str): Worker ID.
+            status (str): Final status.
+            result (str): JSON serialized job result.
+            error (str): Error message.
+            error_type (str): Error exception class name.
+
+        Returns:
+            bool: False if the job is not owned by this worker anymore.
+        """
+        with self._transaction() as db:
+            updated = db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, "
+                "error_type = ?, lease_expiry = NULL, ended = ? WHERE id = ? "
+                "AND worker = ? AND status = 'running'",
+                (status, result, error, error_type, time(), job_id,
+                 worker)).rowcount
+        self._notify()
+        return bool(updated)
+
+    def _expire(self, db, now, workers=None):
+        """
+        Release running jobs with an expired lease.
+
+        Released jobs are retried if they have remaining attempts, else they are
+        marked as failed.
+
+        Args:
+            db (sqlite3.Connection): Database connection in a transaction.
+            now (float): Current time.
+            workers (iterable of str): Also releases running jobs of these
+                workers.
+
+        Returns:
+            int: Number of jobs released.
+        """
+        query = "WHERE status = 'running' AND (lease_expiry < ?"
+        args = [now]
+        if workers:
+            query += f' OR worker IN ({",".join("?" * len(workers))})'
+            args += workers
+        query += ')'
+
+        error = 'Job interrupted: Worker stopped before completing it.'
+        failed = db.execute(
+            f"UPDATE jobs SET status = 'failed', error = ?, error_type = ?, "
+            f"lease_expiry = NULL, ended = ? {query} AND attempts >= ?",
+            [error, RuntimeException.__name__, now] + args +
+            [self._max_attempts]).rowcount
+        retried = db.execute(
+            f"UPDATE jobs SET status = 'pending', worker = NULL, "
+            f"lease_expiry = NULL, error = ? {query}",
+            [error] + args).rowcount
+        return failed + retried
+
+    def recover(self):
+        """
+        Release jobs of workers that stopped before completing them.
+
+        Jobs with an expired lease and jobs of workers known as not running
+        anymore are retried (Or marked as failed if they have no remaining
+        attempts). This is also done automatically for expired leases when
+        claiming jobs.
+
+        Returns:
+            int: Number of jobs released.
+        """
+        with self._transaction(immediate=True) as db:
+            workers = [worker for (worker,) in db.execute(
+                "SELECT DISTINCT worker FROM jobs WHERE status = 'running'")
+                if not _worker_alive(worker)]
+            released = self._expire(db, time(), workers)
+        self._notify()
+        return released
+
+    def prune(self, keep=1000):
+        """
+        Remove oldest completed jobs and their outputs.
+
+        Args:
+            keep (int): Number of completed jobs to keep.
+
+        Returns:
+            int: Number of jobs removed.
+        """
+        with self._transaction(immediate=True) as db:
+            rows = db.execute(
+                "SELECT id, output FROM jobs WHERE status IN "
+                "('succeeded', 'failed') ORDER BY rowid DESC LIMIT -1 "
+                "OFFSET ?", (keep,)).fetchall()
+            db.executemany('DELETE FROM jobs WHERE id = ?',
+                           ((job_id,) for job_id, _ in rows))
+
+        for _, output in rows:
+            try:
+                remove(output)
+            except (FileNotFoundError, TypeError):
+                continue
+        return len(rows)
+
+    def run_job(self, job, worker, run=None):
+        """
+        Run a claimed job and store its result.
+
+        The job lease is renewed while the job is running. Outputs of commands
+        run by the job are written to the job output file.
+
+        Args:
+            job (dict): Job.
+            worker (str): Worker ID.
+            run (callable): Function that take the job as argument and returns
+                its result. Default to "run_host_action".
+
+        Returns:
+            bool: False if the job is not owned by this worker anymore.
+        """
+        done = Event()
+
+        def heartbeat():
+            """Renew the lease until the job is done"""
+            while not done.wait(self._lease / 3):
+                if not self.renew(job['id'], worker):
+                    return
+
+        Thread(target=heartbeat, daemon=True).start()
+        try:
+            with open(job['output'], 'at') as output, \
+                    redirect_call_output(output):
+                result = (run or run_host_action)(job)
+
+        except Exception as exception:
+            return self.fail(job['id'], worker, exception)
+
+        finally:
+            done.set()
+
+        return self.complete(job['id'], worker, result)
+
+    def work(self, run=None, stop=None, poll=1.0):
+        """
+        Claim and run jobs until stopped.
+
+        Args:
+            run (callable): Function that take the job as argument and returns
+                its result. Default to "run_host_action".
+            stop (threading.Event): Stop working once set.
+            poll (float): Database polling interval in seconds. Jobs submitted
+                in this process are notified immediately.
+        """
+        stop = stop or Event()
+        worker = f'{gethostname()}:{getpid()}:{get_ident()}'
+        while not stop.is_set():
+            with self._changed:
+                job = self.claim(worker)
+                if job is None:
+                    self._changed.wait(poll)
+                    continue
+            self.run_job(job, worker, run)
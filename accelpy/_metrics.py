@@ -0,0 +1,402 @@
+# coding=utf-8
+"""Prometheus metrics"""
+from contextlib import contextmanager
+from os import environ
+from os.path import basename
+from threading import Lock
+from time import perf_counter
+
+#: Environment variable containing the path of the node exporter textfile to
+#: update on exit
+TEXTFILE_ENV = 'ACCELPY_METRICS_TEXTFILE'
+
+#: Prometheus text format content type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+#: Histograms buckets in seconds
+BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Metrics values lock
+_lock = Lock()
+
+# Exit textfile update status
+_textfile_registered = False
+
+
+class _Family:
+    """
+    Metric family.
+
+    Args:
+        name (str): Metric name.
+        kind (str): "counter" or "histogram".
+        help_text (str): Metric description.
+        labels (tuple of str): Labels names.
+    """
+    __slots__ = ('name', 'kind', 'help', 'labels', '_values')
+
+    def __init__(self, name, kind, help_text, labels):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = labels
+        self._values = dict()
+
+    def inc(self, labels, amount=1):
+        """
+        Increment a counter.
+
+        Args:
+            labels (tuple of str): Labels values.
+            amount (float): Amount.
+        """
+        _register_textfile()
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def observe(self, labels, value):
+        """
+        Observe a value in an histogram.
+
+        Args:
+            labels (tuple of str): Labels values.
+            value (float): Value.
+        """
+        _register_textfile()
+        with _lock:
+            try:
+                buckets = self._values[labels]
+            except KeyError:
+                # Buckets counts, sum, count
+                buckets = self._values[labels] = [0] * (len(BUCKETS) + 2)
+            for index, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    buckets[index] += 1
+            buckets[-2] += value
+            buckets[-1] += 1
+
+    def samples(self):
+        """
+        Return samples. Must be called with "_lock".
+
+        Returns:
+            list of tuple: (sample, value).
+        """
+        samples = []
+        for labels, value in self._values.items():
+            pairs = [f'{key}="{_escape(item)}"'
+                     for key, item in zip(self.labels, labels)]
+            if self.kind == 'counter':
+                samples.append((f'{self.name}{{{",".join(pairs)}}}', value))
+                continue
+
+            for bound, count in zip(BUCKETS + ('+Inf',),
+                                    value[:-2] + [value[-1]]):
+                bucket = ','.join(pairs + [f'le="{bound}"'])
+                samples.append((f'{self.name}_bucket{{{bucket}}}', count))
+            label_set = f'{{{",".join(pairs)}}}'
+            samples.append((f'{self.name}_sum{label_set}', value[-2]))
+            samples.append((f'{self.name}_count{label_set}', value[-1]))
+        return samples
+
+    def clear(self):
+        """
+        Clear values. Must be called with "_lock".
+        """
+        self._values.clear()
+
+
+#: Host operations durations
+HOST_OPERATION_DURATION = _Family(
+    'accelpy_host_operation_duration_seconds', 'histogram',
+    'Host operations duration in seconds.',
+    ('operation', 'provider', 'status'))
+
+#: Host operations failures
+HOST_OPERATION_ERRORS = _Family(
+    'accelpy_host_operation_errors_total', 'counter',
+    'Host operations failures by error class.',
+    ('operation', 'provider', 'error'))
+
+#: Utilities subprocesses wall time
+CALL_DURATION = _Family(
+    'accelpy_call_duration_seconds', 'histogram',
+    'Utilities subprocesses wall time in seconds.', ('tool', 'status'))
+
+#: Utilities subprocesses retries
+CALL_RETRIES = _Family(
+    'accelpy_call_retries_total', 'counter',
+    'Utilities subprocesses retries on error.', ('tool',))
+
+#: Caches lookups
+CACHE_REQUESTS = _Family(
+    'accelpy_cache_requests_total', 'counter', 'Caches lookups by result.',
+    ('cache', 'result'))
+
+_FAMILIES = (HOST_OPERATION_DURATION, HOST_OPERATION_ERRORS, CALL_DURATION,
+             CALL_RETRIES, CACHE_REQUESTS)
+
+
+def _escape(value):
+    """
+    Escape a label value.
+
+    Args:
+        value (object): Label value.
+
+    Returns:
+        str: Escaped value.
+    """
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n')
+
+
+def _format(value):
+    """
+    Format a sample value.
+
+    Args:
+        value (int or float): Value.
+
+    Returns:
+        str: Formatted value.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _register_textfile():
+    """
+    Update the textfile on exit if "ACCELPY_METRICS_TEXTFILE" is set.
+    """
+    global _textfile_registered
+    if _textfile_registered:
+        return
+    _textfile_registered = True
+
+    path = environ.get(TEXTFILE_ENV)
+    if path:
+        # Lazy import: Only required with textfile
+        from atexit import register
+        register(write_textfile, path)
+
+
+@contextmanager
+def observe_operation(operation, provider=None):
+    """
+    Measure a host operation duration and failures.
+
+    Args:
+        operation (str): Operation name.
+        provider (str): Host provider.
+    """
+    provider = provider or ''
+    start = perf_counter()
+    try:
+        yield
+
+    except Exception as exception:
+        HOST_OPERATION_ERRORS.inc(
+            (operation, provider, exception.__class__.__name__))
+        HOST_OPERATION_DURATION.observe(
+            (operation, provider, 'failure'), perf_counter() - start)
+        raise
+
+    HOST_OPERATION_DURATION.observe(
+        (operation, provider, 'success'), perf_counter() - start)
+
+
+def observe_call(command, duration, retries, returncode):
+    """
+    Observe an utility subprocess call.
+
+    Args:
+        command (iterable of str): Command.
+        duration (float): Wall time in seconds.
+        retries (int): Number of retries.
+        returncode (int): Command return code.
+    """
+    tool = basename(command[0]) if command else ''
+    if tool.startswith('python') and len(command) > 1:
+        # Python entry point
+        tool = basename(command[1])
+
+    CALL_DURATION.observe(
+        (tool, 'failure' if returncode else 'success'), duration)
+    if retries:
+        CALL_RETRIES.inc((tool,), retries)
+
+
+def count_cache(cache, result):
+    """
+    Count a cache lookup.
+
+    Args:
+        cache (str): Cache name.
+        result (str): Lookup result, like "hit" or "miss".
+    """
+    CACHE_REQUESTS.inc((cache, result))
+
+
+def generate_latest(clear=False):
+    """
+    Return metrics in the Prometheus text format.
+
+    Args:
+        clear (bool): If True, clear values once returned.
+
+    Returns:
+        str: Metrics.
+    """
+    with _lock:
+        families = [(family, family.samples()) for family in _FAMILIES]
+        if clear:
+            for family in _FAMILIES:
+                family.clear()
+    return _render((family.name, family.kind, family.help, samples)
+                   for family, samples in families)
+
+
+def _render(families):
+    """
+    Render metrics in the Prometheus text format.
+
+    Args:
+        families (iterable of tuple): (name, kind, help, samples).
+
+    Returns:
+        str: Metrics.
+    """
+    lines = []
+    for name, kind, help_text, samples in families:
+        if not samples:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(f'{sample} {_format(value)}' for sample, value in samples)
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _parse(text):
+    """
+    Parse metrics in the Prometheus text format.
+
+    Args:
+        text (str): Metrics.
+
+    Returns:
+        dict: name: [kind, help, {sample: value}].
+    """
+    families = dict()
+    family = None
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            name, _, help_text = line[7:].partition(' ')
+            family = families.setdefault(name, [None, help_text, dict()])
+        elif line.startswith('# TYPE ') and family is not None:
+            family[0] = line[7:].partition(' ')[2]
+        elif line and not line.startswith('#') and family is not None:
+            sample, _, value = line.rpartition(' ')
+            try:
+                family[2][sample] = float(value)
+            except ValueError:
+                continue
+    return families
+
+
+def write_textfile(path):
+    """
+    Add metrics to a node exporter textfile, then clear them.
+
+    Counters and histograms of the file are updated with metrics values, so
+    the file can be updated by many short-lived processes. The file is written
+    atomically.
+
+    Args:
+        path (path-like object): Textfile path.
+    """
+    # Lazy import: Only required to write file
+    from accelpy._common import write_atomic
+
+    path = str(path)
+    with _file_lock(path):
+        try:
+            with open(path, 'rt') as file:
+                families = _parse(file.read())
+        except FileNotFoundError:
+            families = dict()
+
+        with _lock:
+            for family in _FAMILIES:
+                stored = families.setdefault(
+                    family.name, [family.kind, family.help, dict()])[2]
+                for sample, value in family.samples():
+                    stored[sample] = stored.get(sample, 0) + value
+                family.clear()
+
+        write_atomic(path, _render(
+            (name, kind, help_text, list(samples.items()))
+            for name, (kind, help_text, samples) in families.items()).encode(),
+            mode=0o644)
+
+
+@contextmanager
+def _file_lock(path):
+    """
+    Lock a file between processes.
+
+    Args:
+        path (str): Path of the file to lock.
+    """
+    try:
+        # Lazy import: Only required to write file, not available on Windows
+        from fcntl import flock, LOCK_EX, LOCK_UN
+    except ImportError:  # pragma: no cover
+        yield
+        return
+
+    with open(f'{path}.lock', 'wb') as lock_file:
+        flock(lock_file, LOCK_EX)
+        try:
+            yield
+        finally:
+            flock(lock_file, LOCK_UN)
+
+
+def start_http_server(address='127.0.0.1:9100'):
+    """
+    Expose metrics over HTTP on "/metrics", in a background thread.
+
+    Args:
+        address (str): "host:port" TCP address.
+
+    Returns:
+        http.server.HTTPServer: Server, use "shutdown" to stop it.
+    """
+    # Lazy import: Only required with HTTP endpoint
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from threading import Thread
+
+    class Handler(BaseHTTPRequestHandler):
+        """Metrics handler"""
+
+        def do_GET(self):
+            """GET request"""
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = generate_latest().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            """Do not log requests"""
+
+    host, _, port = address.rpartition(':')
+    server = HTTPServer((host or '127.0.0.1', int(port)), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
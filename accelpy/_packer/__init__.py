@@ -4,6 +4,7 @@ from os.path import join
 
 from accelpy._common import recursive_update, no_color, json_read, json_write
 from accelpy._hashicorp import Utility
+from accelpy._tracing import span
 
 
 class Packer(Utility):
@@ -56,21 +57,23 @@ class Packer(Utility):
         for key in sorted(sources):
             recursive_update(template, sources[key])
 
-        # Evaluate variables that contain Jinja templates
-        variables = template['variables']
-        env = Environment(extensions=['jinja2.ext.loopcontrols'])
-        to_clean = set()
-        for key in sorted(variables):
-            value = variables[key]
-            if isinstance(value, str) and '{' in value:
-                variables[key] = env.from_string(value).render(variables)
-
-            # Mark for deletion, Packer does not accept non string as variables
-            elif not isinstance(value, str):
-                to_clean.add(key)
-
-        for key in to_clean:
-            del variables[key]
+        with span('packer.template'):
+            # Evaluate variables that contain Jinja templates
+            variables = template['variables']
+            env = Environment(extensions=['jinja2.ext.loopcontrols'])
+            to_clean = set()
+            for key in sorted(variables):
+                value = variables[key]
+                if isinstance(value, str) and '{' in value:
+                    variables[key] = env.from_string(value).render(variables)
+
+                # Mark for deletion, Packer does not accept non string as
+                # variables
+                elif not isinstance(value, str):
+                    to_clean.add(key)
+
+            for key in to_clean:
+                del variables[key]
 
         # Save template
         json_write(template, self._template)
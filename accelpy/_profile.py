@@ -0,0 +1,222 @@
+# coding=utf-8
+"""Command profiling"""
+from time import perf_counter
+
+from accelpy._tracing import _time_ns, get_exporters, set_exporters
+
+#: Number of functions and subprocesses shown in the summary
+SUMMARY_SIZE = 10
+
+
+class Profiler:
+    """
+    Profile Python functions and utilities subprocesses.
+
+    Python functions of all threads are profiled with "cProfile", and the wall
+    time of every "accelpy._common.call" subprocess is recorded with its
+    arguments.
+
+    On exit, write "<path>.pstats" (Python profile, to be read with "pstats"
+    or any compatible viewer) and "<path>.json" (Timeline of host operations
+    phases and subprocesses), and print a summary.
+
+    Args:
+        path (str): Reports path without extension.
+        command (str): Profiled command.
+        file (file-like object): Summary output. Default to "sys.stderr".
+    """
+
+    def __init__(self, path, command=None, file=None):
+        self._path = path
+        self._command = command
+        self._file = file
+        self._profiles = []
+        self._spans = []
+        self._exporters = None
+        self._start = None
+        self._start_ns = None
+        self._wall_time = None
+
+    def __enter__(self):
+        # Lazy import: Only required with profiling
+        from cProfile import Profile
+        from threading import setprofile
+
+        # Record spans, including subprocesses calls
+        self._exporters = get_exporters()
+        set_exporters(*self._exporters, self)
+
+        def profile_thread(*_):
+            """Profile threads started from now"""
+            from sys import setprofile as set_thread_profile
+            set_thread_profile(None)
+            thread_profile = Profile()
+            try:
+                thread_profile.enable()
+            except ValueError:
+                # Python >= 3.12: Threads are profiled by the main profiler
+                return
+            self._profiles.append(thread_profile)
+
+        setprofile(profile_thread)
+        profile = Profile()
+        self._profiles.append(profile)
+        self._start_ns = _time_ns()
+        self._start = perf_counter()
+        profile.enable()
+        return self
+
+    def __exit__(self, *_):
+        # Lazy import: Only required with profiling
+        from threading import setprofile
+
+        self._profiles[0].disable()
+        self._wall_time = perf_counter() - self._start
+        setprofile(None)
+        set_exporters(*self._exporters)
+        self.write()
+
+    def export(self, spans):
+        """
+        Record spans. Called by "accelpy._tracing".
+
+        Args:
+            spans (list of accelpy._tracing.Span): Spans of a trace.
+        """
+        self._spans.extend(spans)
+
+    def _stats(self):
+        """
+        Combine profiles of all threads.
+
+        Returns:
+            pstats.Stats: Profile statistics.
+        """
+        # Lazy import: Only required with profiling
+        from io import StringIO
+        from pstats import Stats
+
+        stats = Stats(self._profiles[0], stream=StringIO())
+        for profile in self._profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # Thread without any profiled function
+                continue
+        return stats
+
+    def _timeline(self):
+        """
+        Return the timeline of spans, sorted by start time.
+
+        Returns:
+            list of dict: Spans, with "start" relative to the profile start,
+                in seconds.
+        """
+        timeline = []
+        for span in sorted(self._spans, key=lambda item: item.start):
+            item = span.to_dict()
+            item['start'] = (span.start - self._start_ns) / 1e9
+            del item['end']
+            timeline.append(item)
+        return timeline
+
+    def _subprocesses_time(self):
+        """
+        Return the wall time spent with at least one subprocess running.
+
+        Returns:
+            float: Time in seconds.
+        """
+        intervals = sorted((span.start, span.end) for span in self._spans
+                           if span.name == 'call')
+        total = 0
+        current_start = current_end = None
+        for start, end in intervals:
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            total += current_end - current_start
+        return total / 1e9
+
+    def write(self):
+        """
+        Write reports and print summary.
+        """
+        # Lazy import: Only required with profiling
+        from json import dump
+
+        stats = self._stats()
+        stats.dump_stats(f'{self._path}.pstats')
+
+        timeline = self._timeline()
+        subprocesses = [dict(
+            argv=item['attributes'].get('argv'), start=item['start'],
+            duration=item['duration'],
+            returncode=item['attributes'].get('returncode'))
+            for item in timeline if item['name'] == 'call']
+        subprocesses_time = self._subprocesses_time()
+
+        functions = []
+        for (filename, line, name), (_, calls, self_time, cumulative, _) in \
+                sorted(stats.stats.items(), key=lambda item: item[1][3],
+                       reverse=True):
+            functions.append(dict(
+                function=f'{filename}:{line}({name})', calls=calls,
+                self_time=self_time, cumulative_time=cumulative))
+
+        with open(f'{self._path}.json', 'wt') as file:
+            dump(dict(
+                command=self._command, wall_time=self._wall_time,
+                subprocesses_time=subprocesses_time,
+                python_time=self._wall_time - subprocesses_time,
+                subprocesses=subprocesses, timeline=timeline,
+                functions=functions[:100]), file, indent=1, default=str)
+
+        self._print_summary(subprocesses, subprocesses_time, functions)
+
+    def _print_summary(self, subprocesses, subprocesses_time, functions):
+        """
+        Print profiling summary.
+
+        Args:
+            subprocesses (list of dict): Subprocesses.
+            subprocesses_time (float): Wall time with subprocesses running.
+            functions (list of dict): Functions, sorted by cumulative time.
+        """
+        lines = [
+            f'Profile of "{self._command}": {self._wall_time:.3f}s wall time',
+            f'  Subprocesses: {subprocesses_time:.3f}s '
+            f'({len(subprocesses)} calls)',
+            f'  Python: {self._wall_time - subprocesses_time:.3f}s']
+
+        if subprocesses:
+            lines.append('Slowest subprocesses:')
+            for item in sorted(subprocesses, key=lambda sub: sub['duration'],
+                               reverse=True)[:SUMMARY_SIZE]:
+                argv = ' '.join(item['argv'] or ())
+                if len(argv) > 60:
+                    argv = argv[:57] + '...'
+                lines.append(f'  {item["duration"]:>9.3f}s {argv}')
+
+        lines.append('Python functions by cumulative time:')
+        for item in functions[:SUMMARY_SIZE]:
+            function = item['function']
+            if len(function) > 60:
+                function = '...' + function[-57:]
+            lines.append(f'  {item["cumulative_time"]:>9.3f}s {function}')
+
+        lines.append(f'Reports: "{self._path}.pstats", "{self._path}.json"')
+
+        if self._file is None:
+            # Lazy import: Only required if no file specified
+            from sys import stderr
+            file = stderr
+        else:
+            file = self._file
+        file.write('\n'.join(lines) + '\n')
+        file.flush()
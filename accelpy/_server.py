@@ -0,0 +1,686 @@
+# coding=utf-8
+"""Provisioning server"""
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from json import dumps, loads
+from os import chmod, remove
+from os.path import expanduser, exists, join
+from socketserver import ThreadingMixIn, UnixStreamServer
+from threading import Event, Lock, Thread
+from urllib.parse import parse_qs, quote, urlparse
+
+from accelpy._common import HOME_DIR, ensure_home_dir
+from accelpy._host import Host, _iter_hosts_names
+from accelpy._jobs import JobQueue, run_host_action
+from accelpy._metrics import CONTENT_TYPE, generate_latest
+from accelpy.exceptions import (
+    AccelizeException, ConfigurationException, RuntimeException)
+
+#: Default server address
+DEFAULT_ADDRESS = join(HOME_DIR, 'server.sock')
+
+#: Host outputs
+HOST_OUTPUTS = ('ssh_private_key', 'ssh_user', 'private_ip', 'public_ip')
+
+#: Maximum number of completed jobs to keep in the queue
+_JOBS_HISTORY = 1000
+
+# Accepted "Host" headers values, without port. Others values are rejected to
+# prevent DNS rebinding attacks from web browsers
+_LOCAL_HOSTS = ('localhost', '127.0.0.1', '[::1]')
+
+
+class _NotFoundException(RuntimeException):
+    """Requested resource not found"""
+
+
+def _token_path():
+    """
+    Return the path of the file containing the TCP server API token.
+
+    Returns:
+        str: Path.
+    """
+    # Lazy import: The configuration directory may be changed at runtime
+    from accelpy._common import HOME_DIR as home_dir
+    return join(home_dir, 'server.token')
+
+
+def _get_token(create=False):
+    """
+    Get the TCP server API token.
+
+    The token is in a file only readable by the user. Clients using a TCP
+    address must send it in the "Authorization" header.
+
+    Args:
+        create (bool): If True, create the token if not exists.
+
+    Returns:
+        str: Token. None if not exists.
+    """
+    path = _token_path()
+    try:
+        with open(path, 'rt') as file:
+            return file.read().strip()
+    except OSError:
+        if not create:
+            return None
+
+    # Lazy import: Only required on token creation
+    from secrets import token_urlsafe
+    from accelpy._common import write_atomic
+
+    token = token_urlsafe(32)
+    ensure_home_dir()
+    write_atomic(path, token.encode(), mode=0o600)
+    return token
+
+
+def _parse_address(address):
+    """
+    Parse server address.
+
+    Args:
+        address (str): Unix socket path, or "host:port" TCP address.
+
+    Returns:
+        tuple: (host, port) for TCP, or (path, None) for Unix socket.
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return host or '127.0.0.1', int(port)
+    return expanduser(address), None
+
+
+def _is_loopback(host):
+    """
+    Return True if the host is a loopback address.
+
+    Args:
+        host (str): Host name or IP address.
+
+    Returns:
+        bool: True if loopback.
+    """
+    # Lazy import: Only required with TCP addresses
+    from ipaddress import ip_address
+
+    if host.lower() == 'localhost':
+        return True
+    try:
+        return ip_address(host).is_loopback
+    except ValueError:
+        # Others host names may resolve to any address
+        return False
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """Threading TCP HTTP server"""
+    daemon_threads = True
+
+
+class _ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """Threading Unix socket HTTP server"""
+    daemon_threads = True
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    """
+    HTTP connection over Unix socket.
+
+    Args:
+        path (str): Unix socket path.
+        timeout (float): Connection timeout.
+    """
+
+    def __init__(self, path, timeout=None):
+        HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        """Connect to the Unix socket"""
+        # Lazy import: Only required with Unix sockets
+        from socket import socket, AF_UNIX, SOCK_STREAM
+
+        self.sock = socket(AF_UNIX, SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def _connection(address, timeout=None):
+    """
+    Return an HTTP connection to the server.
+
+    Args:
+        address (str): Unix socket path, or "host:port" TCP address.
+        timeout (float): Connection timeout.
+
+    Returns:
+        http.client.HTTPConnection: Connection.
+    """
+    host, port = _parse_address(address)
+    if port is None:
+        return _UnixHTTPConnection(host, timeout=timeout)
+    return HTTPConnection(host, port, timeout=timeout)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Provisioning server HTTP API"""
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        """
+        Client address.
+
+        Returns:
+            str: Address.
+        """
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def log_message(self, *args):
+        """
+        Log only if requested by the server.
+
+        Args:
+            args: "log_message" arguments.
+        """
+        if self.server.api.verbose:
+            BaseHTTPRequestHandler.log_message(self, *args)
+
+    def _send(self, status, content):
+        """
+        Send a JSON response.
+
+        Args:
+            status (int): HTTP status code.
+            content (object): Response content.
+        """
+        self._send_body(status, dumps(content).encode(), 'application/json')
+
+    def _send_body(self, status, body, content_type):
+        """
+        Send a response.
+
+        Args:
+            status (int): HTTP status code.
+            body (bytes): Response body.
+            content_type (str): Response content type.
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check_request(self, method, path):
+        """
+        Check the request is from a local client allowed to use the API.
+
+        Requests from web browsers are rejected: Their "Host" header is not a
+        loopback address with DNS rebinding, and they cannot send JSON content
+        or the token to another origin without a CORS preflight request, that
+        is never accepted.
+
+        Args:
+            method (str): Request method.
+            path (list of str): URL path.
+
+        Returns:
+            tuple: HTTP status code, error message. None if allowed.
+        """
+        # Lazy import: Only required to check requests
+        from hmac import compare_digest
+
+        host = self.headers.get('Host', '').strip().lower()
+        host = host[:host.find(']') + 1] if host.startswith('[') else \
+            host.split(':', 1)[0]
+        if host not in _LOCAL_HOSTS:
+            return 403, f'Host "{host}" not allowed.'
+
+        if method == 'POST' and self.headers.get(
+                'Content-Type', '').split(';', 1)[0].strip().lower() != \
+                'application/json':
+            return 415, 'Content-Type must be "application/json".'
+
+        token = self.server.api.token
+        if token and path != ['metrics'] and not compare_digest(
+                self.headers.get('Authorization', ''), f'Bearer {token}'):
+            return 401, 'Invalid or missing token.'
+
+    def _handle(self, method):
+        """
+        Handle request.
+
+        Args:
+            method (str): Request method.
+        """
+        url = urlparse(self.path)
+        path = [part for part in url.path.split('/') if part]
+        params = {key: value[-1] for key, value in parse_qs(url.query).items()}
+        api = self.server.api
+
+        error = self._check_request(method, path)
+        if error:
+            # Do not reuse the connection, the request body is not read
+            self.close_connection = True
+            return self._send(error[0], dict(
+                error=error[1], type='AuthenticationException'))
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = loads(self.rfile.read(length)) if length else dict()
+            if not isinstance(body, dict):
+                raise ValueError('Request content must be a JSON object.')
+            kwargs = body.get('kwargs') or dict()
+            if not isinstance(kwargs, dict):
+                raise ValueError('"kwargs" must be a JSON object.')
+
+            if method == 'GET' and path == ['hosts']:
+                return self._send(200, api.list_hosts())
+
+            elif method == 'GET' and len(path) == 2 and path[0] == 'hosts':
+                return self._send(200, api.get_outputs(path[1]))
+
+            elif method == 'GET' and path == ['jobs']:
+                return self._send(200, api.list_jobs())
+
+            elif method == 'GET' and len(path) == 2 and path[0] == 'jobs':
+                return self._send(200, api.get_job(
+                    path[1], wait=float(params.get('wait', 0))))
+
+            elif method == 'GET' and path == ['metrics']:
+                return self._send_body(
+                    200, generate_latest().encode(), CONTENT_TYPE)
+
+            elif method == 'POST' and path == ['jobs']:
+                return self._send(202, api.submit(
+                    body.get('action'), body.get('name'), **kwargs))
+
+            self._send(404, dict(
+                error=f'No route for "{method} {url.path}".',
+                type='RuntimeException'))
+
+        except _NotFoundException as exception:
+            self._send(404, dict(error=str(exception),
+                                 type='RuntimeException'))
+
+        except (AccelizeException, ValueError, TypeError) as exception:
+            self._send(400, dict(error=str(exception),
+                                 type=exception.__class__.__name__))
+
+    def do_GET(self):
+        """GET request"""
+        self._handle('GET')
+
+    def do_POST(self):
+        """POST request"""
+        self._handle('POST')
+
+
+class Server:
+    """
+    Provisioning server.
+
+    Provides the host life-cycle over a local HTTP API. Hosts, application
+    definitions, utilities executables paths and the Accelize web service
+    session are kept in memory between requests.
+
+    Host actions run as jobs in a persistent jobs queue. Jobs on the same host
+    run sequentially. Jobs interrupted by a previous server stop are resumed on
+    start.
+
+    Args:
+        address (str): Unix socket path, or "host:port" TCP address. Default to
+            a Unix socket in the user configuration directory. The API is not
+            authenticated, so TCP addresses must be loopback addresses.
+        max_jobs (int): Maximum number of jobs running concurrently.
+        verbose (bool): If True, log requests and show actions outputs.
+        queue (accelpy._jobs.JobQueue): Jobs queue. Default to the queue in the
+            user configuration directory.
+    """
+
+    def __init__(self, address=None, max_jobs=4, verbose=False, queue=None):
+        self._address = address or DEFAULT_ADDRESS
+        host, port = _parse_address(self._address)
+        if port is not None and not _is_loopback(host):
+            raise ConfigurationException(
+                f'The server API is not authenticated and must only listen on '
+                f'a loopback address, got "{host}". Use a Unix socket or a '
+                f'loopback address like "127.0.0.1:{port}".')
+        self._max_jobs = max_jobs
+        self._queue = queue or JobQueue()
+        self._stop = Event()
+        self._hosts = dict()
+        self._hosts_locks = dict()
+        self._lock = Lock()
+        self._http_server = None
+        self.verbose = verbose
+        self.token = None
+
+    @property
+    def address(self):
+        """
+        Server address.
+
+        Returns:
+            str: Address.
+        """
+        return self._address
+
+    def serve_forever(self):
+        """
+        Serve requests until "shutdown" is called.
+        """
+        host, port = _parse_address(self._address)
+        if port is None:
+            ensure_home_dir()
+            self._remove_stale_socket(host)
+            self._http_server = _ThreadingUnixHTTPServer(host, _RequestHandler)
+            chmod(host, 0o600)
+        else:
+            self.token = _get_token(create=True)
+            self._http_server = _ThreadingHTTPServer(
+                (host, port), _RequestHandler)
+            self._address = f'{host}:{self._http_server.server_port}'
+
+        self._http_server.api = self
+        self._stop.clear()
+        self._queue.recover()
+        self._queue.prune(_JOBS_HISTORY)
+        for _ in range(self._max_jobs):
+            Thread(target=self._queue.work, daemon=True, kwargs=dict(
+                run=self._run_action, stop=self._stop)).start()
+        try:
+            self._http_server.serve_forever()
+
+        finally:
+            self._stop.set()
+            self._http_server.server_close()
+            if port is None:
+                remove(host)
+
+    def shutdown(self):
+        """
+        Stop the server.
+        """
+        if self._http_server is not None:
+            self._http_server.shutdown()
+
+    @staticmethod
+    def _remove_stale_socket(path):
+        """
+        Remove the socket file of a previous server that is not running.
+
+        Args:
+            path (str): Unix socket path.
+
+        Raises:
+            accelpy.exceptions.RuntimeException: A server is already running.
+        """
+        if not exists(path):
+            return
+
+        try:
+            connection = _UnixHTTPConnection(path, timeout=1)
+            connection.connect()
+            connection.close()
+        except OSError:
+            remove(path)
+        else:
+            raise RuntimeException(f'A server is already running on "{path}"')
+
+    def submit(self, action, name=None, **kwargs):
+        """
+        Submit a host action job.
+
+        Args:
+            action (str): Host action, one of "JOB_ACTIONS".
+            name (str): Host name. If not specified with "init", a random name
+                is generated.
+            kwargs: Host action keyword arguments.
+
+        Returns:
+            dict: Job.
+        """
+        return self._queue.submit(action, name, **kwargs)
+
+    def get_job(self, job_id, wait=0):
+        """
+        Get a job.
+
+        Args:
+            job_id (str): Job ID.
+            wait (float): Wait for job completion up to this number of seconds.
+
+        Returns:
+            dict: Job.
+        """
+        try:
+            if wait:
+                return self._queue.wait(job_id, timeout=wait)
+            return self._queue.get(job_id)
+        except KeyError:
+            raise _NotFoundException(f'No job "{job_id}".')
+
+    def list_jobs(self):
+        """
+        List jobs.
+
+        Returns:
+            list of dict: Jobs.
+        """
+        return self._queue.list(limit=_JOBS_HISTORY)
+
+    @staticmethod
+    def list_hosts():
+        """
+        List hosts.
+
+        Returns:
+            list of str: Hosts names.
+        """
+        return list(_iter_hosts_names())
+
+    def get_outputs(self, name):
+        """
+        Get host outputs.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            dict: Outputs, None for outputs not available.
+        """
+        with self._host_lock(name):
+            host = self._get_host(name)
+            outputs = dict()
+            for key in HOST_OUTPUTS:
+                try:
+                    outputs[key] = getattr(host, key)
+                except ConfigurationException:
+                    # Configuration not applied
+                    outputs[key] = None
+            return outputs
+
+    def _host_lock(self, name):
+        """
+        Return the lock of a host.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            threading.Lock: Lock.
+        """
+        with self._lock:
+            try:
+                return self._hosts_locks[name]
+            except KeyError:
+                lock = self._hosts_locks[name] = Lock()
+                return lock
+
+    def _get_host(self, name):
+        """
+        Return a host, from memory if already loaded.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            accelpy._host.Host: Host.
+        """
+        try:
+            return self._hosts[name]
+        except KeyError:
+            host = self._hosts[name] = Host(name=name)
+            return host
+
+    def _run_action(self, job):
+        """
+        Run the host action of a job.
+
+        Args:
+            job (dict): Job.
+
+        Returns:
+            object: Action result.
+        """
+        with self._host_lock(job['name']):
+            return run_host_action(job, self._hosts, quiet=not self.verbose)
+
+
+class Client:
+    """
+    Provisioning server client.
+
+    Args:
+        address (str): Server address. Unix socket path, or "host:port" TCP
+            address. Default to a Unix socket in the user configuration
+            directory.
+        timeout (float): Connection timeout in seconds.
+    """
+    _WAIT = 30
+
+    def __init__(self, address=None, timeout=None):
+        self._address = address or DEFAULT_ADDRESS
+        self._timeout = timeout
+
+    def request(self, method, path, content=None):
+        """
+        Perform a request to the server.
+
+        Args:
+            method (str): Request method.
+            path (str): URL path.
+            content (object): Request JSON content.
+
+        Returns:
+            object: Response content.
+        """
+        body = dumps(content).encode() if content is not None else None
+        headers = {'Content-Type': 'application/json'}
+        if _parse_address(self._address)[1] is not None:
+            token = _get_token()
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+
+        connection = _connection(self._address, self._timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            result = loads(response.read())
+
+        except OSError as exception:
+            raise RuntimeException(
+                f'Unable to connect to the server "{self._address}": '
+                f'{exception}')
+
+        finally:
+            connection.close()
+
+        if response.status >= 300:
+            self._raise(result['error'], result['type'])
+        return result
+
+    @staticmethod
+    def _raise(error, error_type):
+        """
+        Raise an exception from the server.
+
+        Args:
+            error (str): Error message.
+            error_type (str): Exception class name.
+
+        Raises:
+            accelpy.exceptions.AccelizeException: Exception.
+        """
+        # Lazy import: Only required on error
+        import accelpy.exceptions as exceptions
+
+        exception_type = getattr(exceptions, error_type, None)
+        if not (isinstance(exception_type, type) and
+                issubclass(exception_type, AccelizeException)):
+            exception_type = RuntimeException
+        raise exception_type(error)
+
+    def run(self, action, name=None, wait=True, **kwargs):
+        """
+        Run a host action job.
+
+        Args:
+            action (str): Host action, one of "JOB_ACTIONS".
+            name (str): Host name.
+            wait (bool): If True, wait for the job completion and returns its
+                result.
+            kwargs: Host action keyword arguments.
+
+        Returns:
+            object or dict: Job result if "wait", else job.
+        """
+        job = self.request('POST', '/jobs', dict(
+            action=action, name=name, kwargs=kwargs))
+        if not wait:
+            return job
+
+        while job['status'] in ('pending', 'running'):
+            job = self.get_job(job['id'], wait=self._WAIT)
+
+        if job['status'] == 'failed':
+            self._raise(job['error'], job['error_type'])
+        return job['result']
+
+    def get_job(self, job_id, wait=0):
+        """
+        Get a job.
+
+        Args:
+            job_id (str): Job ID.
+            wait (float): Wait for job completion up to this number of seconds.
+
+        Returns:
+            dict: Job.
+        """
+        return self.request('GET', f'/jobs/{quote(job_id)}?wait={wait}')
+
+    def list_hosts(self):
+        """
+        List hosts.
+
+        Returns:
+            list of str: Hosts names.
+        """
+        return self.request('GET', '/hosts')
+
+    def get_outputs(self, name):
+        """
+        Get host outputs.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            dict: Outputs, None for outputs not available.
+        """
+        return self.request('GET', f'/hosts/{quote(name)}')
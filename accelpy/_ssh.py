@@ -0,0 +1,417 @@
+# coding=utf-8
+"""SSH connections to hosts"""
+from os import environ
+from os.path import isabs, join
+from threading import Lock
+
+from accelpy._tracing import span
+from accelpy.exceptions import ConfigurationException
+
+#: SSH client executable
+SSH_EXECUTABLE = 'ssh'
+
+#: SSH client options
+SSH_OPTIONS = (
+    # Never prompt, hosts are provisioned with a key pair
+    'BatchMode=yes',
+
+    # Cloud providers reuse IP addresses for new hosts
+    'StrictHostKeyChecking=no', 'UserKnownHostsFile=/dev/null',
+    'LogLevel=ERROR')
+
+#: Environment variable that defines the lifetime of SSH master connections
+PERSIST_ENV = 'ACCELPY_SSH_PERSIST'
+
+#: Default lifetime of idle SSH master connections
+PERSIST = '30m'
+
+# Maximum length of an Unix socket path on Linux
+_SOCKET_PATH_MAX = 107
+
+# Maximum length of a socket name once expanded by the SSH client, including
+# the temporary suffix added by the SSH client on creation
+_SOCKET_NAME_MAX = 40
+
+#: Default maximum number of hosts commands running concurrently
+MAX_WORKERS = 16
+
+
+def select_hosts(patterns='all'):
+    """
+    Select existing hosts configurations names.
+
+    Args:
+        patterns (str or iterable of str): "all", or hosts names glob patterns.
+            Patterns can also be comma separated.
+
+    Returns:
+        list of str: Sorted hosts names.
+    """
+    # Lazy import: Only required to filter hosts
+    from fnmatch import fnmatchcase
+    from accelpy._host import _iter_hosts_names
+
+    if isinstance(patterns, str):
+        patterns = (patterns,)
+    patterns = [pattern.strip() for value in patterns
+                for pattern in value.split(',') if pattern.strip()]
+    if not patterns or 'all' in patterns:
+        patterns = ['*']
+
+    names = sorted(name for name in _iter_hosts_names() if any(
+        fnmatchcase(name, pattern) for pattern in patterns))
+    if not names:
+        raise ConfigurationException(
+            f'No host configuration matching "{",".join(patterns)}".')
+    return names
+
+
+def get_connection(name, private_ip=False):
+    """
+    Get SSH connection information of an host from its Terraform state.
+
+    Args:
+        name (str): Host name.
+        private_ip (bool): If True, use the private IP address instead of the
+            public IP address.
+
+    Returns:
+        dict: "name", "user", "address", "key" (Private key path) and
+            "config_dir".
+    """
+    # Lazy import: Only required to connect to hosts
+    from accelpy._host import CONFIG_DIR, get_state_outputs
+
+    config_dir = join(CONFIG_DIR, name)
+    outputs = get_state_outputs(name)
+    try:
+        address = outputs['host_private_ip' if private_ip else
+                          'host_public_ip']
+        user = outputs['remote_user']
+        key = outputs['host_ssh_private_key']
+    except KeyError:
+        raise ConfigurationException(
+            f'Host "{name}" configuration not applied.')
+
+    return dict(name=name, user=user, address=address, config_dir=config_dir,
+                # Terraform returns relative path as "./file"
+                key=key if isabs(key) else join(config_dir, key.lstrip('./')))
+
+
+def control_path(config_dir):
+    """
+    Return the SSH master connections sockets path of an host.
+
+    Sockets are in the host configuration directory, or in the temporary
+    directory if the path is too long for an Unix socket.
+
+    Args:
+        config_dir (str): Host configuration directory.
+
+    Returns:
+        str: Path, with SSH client tokens.
+    """
+    if len(config_dir) + 1 + _SOCKET_NAME_MAX <= _SOCKET_PATH_MAX:
+        return join(config_dir, 'ssh-%h')
+
+    # Lazy import: Only required with long paths
+    from tempfile import gettempdir
+    from accelpy._common import hash_cli_name
+
+    return join(gettempdir(), f'accelpy-{hash_cli_name(config_dir)[:16]}-%h')
+
+
+def master_options(config_dir, persist=None):
+    """
+    Return SSH client options to use the SSH master connection of an host.
+
+    The first client connecting to the host starts the master connection,
+    that stays in background once idle until its lifetime expires. Others
+    clients reuse it and skip the TCP and SSH handshakes.
+
+    Args:
+        config_dir (str): Host configuration directory.
+        persist (str): Lifetime of the idle master connection, in the SSH
+            "ControlPersist" format (Like "30m", "1h", "no"). Default to
+            "ACCELPY_SSH_PERSIST" environment variable value, or "30m".
+
+    Returns:
+        list of str: SSH client options.
+    """
+    persist = persist or environ.get(PERSIST_ENV) or PERSIST
+    return ['ControlMaster=auto', f'ControlPath={control_path(config_dir)}',
+            f'ControlPersist={persist}']
+
+
+def ssh_command(connection, command=(), options=(), args=(), persist=None,
+                master=True):
+    """
+    Return the SSH client command to run a command on an host.
+
+    Args:
+        connection (dict): Connection information from "get_connection".
+        command (iterable of str): Command to run on the host. If not specified,
+            start an interactive shell.
+        options (iterable of str): Extra SSH client options.
+        args (iterable of str): Extra SSH client arguments.
+        persist (str): Lifetime of the idle master connection.
+        master (bool): If False, do not use the SSH master connection. Required
+            to forward the SSH agent of the client.
+
+    Returns:
+        list of str: SSH client command.
+    """
+    argv = [SSH_EXECUTABLE, '-i', connection['key']]
+    argv.extend(args)
+    if master:
+        options = tuple(master_options(
+            connection['config_dir'], persist)) + tuple(options)
+    for option in SSH_OPTIONS + tuple(options):
+        argv += ['-o', option]
+    argv += ['--', f'{connection["user"]}@{connection["address"]}']
+    argv.extend(command)
+    return argv
+
+
+def _master_exists(connection):
+    """
+    Return True if the SSH master connection socket exists.
+
+    Args:
+        connection (dict): Connection information from "get_connection".
+
+    Returns:
+        bool: True if exists.
+    """
+    # Lazy import: Only required to connect to hosts
+    from os.path import exists
+
+    return exists(control_path(connection['config_dir']).replace(
+        '%h', connection['address']))
+
+
+def open_master(name, private_ip=False, persist=None):
+    """
+    Start the SSH master connection of an host in background, if not already
+    running.
+
+    Args:
+        name (str): Host name.
+        private_ip (bool): If True, use the private IP address.
+        persist (str): Lifetime of the idle master connection.
+
+    Returns:
+        bool: True if started, False if already running.
+    """
+    # Lazy import: Only required to connect to hosts
+    from accelpy._common import call
+
+    connection = get_connection(name, private_ip)
+    if _master_exists(connection) and not call(
+            ssh_command(connection, args=('-O', 'check')), check=False,
+            pipe_stdout=True).returncode:
+        return False
+
+    call(ssh_command(connection, args=('-f', '-N'), persist=persist),
+         pipe_stdout=True)
+    return True
+
+
+def close_master(name):
+    """
+    Close SSH master connections of an host.
+
+    Args:
+        name (str): Host name.
+
+    Returns:
+        int: Number of closed master connections.
+    """
+    # Lazy import: Only required to connect to hosts
+    from accelpy._common import call
+
+    closed = 0
+    for private_ip in (False, True):
+        try:
+            connection = get_connection(name, private_ip)
+        except ConfigurationException:
+            # Not applied
+            break
+        if _master_exists(connection) and not call(
+                ssh_command(connection, args=('-O', 'exit')), check=False,
+                pipe_stdout=True).returncode:
+            closed += 1
+    return closed
+
+
+def _run_host(name, command, private_ip, output, timeout):
+    """
+    Run a command on an host and stream its prefixed outputs.
+
+    Args:
+        name (str): Host name.
+        command (iterable of str): Command.
+        private_ip (bool): If True, use the private IP address.
+        output (accelpy._ssh._Output): Output.
+        timeout (float): Timeout in seconds.
+
+    Returns:
+        dict: Result.
+    """
+    # Lazy import: Only required to run commands
+    from os import killpg
+    from signal import SIGKILL
+    from subprocess import DEVNULL, PIPE, STDOUT, Popen
+    from threading import Event, Timer
+    from time import perf_counter
+    from accelpy._metrics import observe_call
+
+    result = dict(host=name, returncode=None, duration=0.0, error=None)
+    try:
+        argv = ssh_command(get_connection(name, private_ip), command)
+    except ConfigurationException as exception:
+        result['error'] = str(exception)
+        return result
+
+    with span('call', command=' '.join(argv), argv=argv, host=name) as \
+            current:
+        start = perf_counter()
+        timed_out = Event()
+        try:
+            # Run in its own session to kill all its processes on timeout
+            process = Popen(argv, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT,
+                            start_new_session=True)
+        except OSError as exception:
+            result['error'] = str(exception)
+            return result
+
+        def kill():
+            """Kill the command on timeout"""
+            timed_out.set()
+            try:
+                killpg(process.pid, SIGKILL)
+            except OSError:  # pragma: no cover
+                # Already exited
+                pass
+
+        timer = Timer(timeout, kill) if timeout else None
+        try:
+            if timer:
+                timer.start()
+            with process:
+                for line in process.stdout:
+                    output.write(name, line)
+        finally:
+            if timer:
+                timer.cancel()
+
+        result['duration'] = perf_counter() - start
+        result['returncode'] = process.returncode
+        if timed_out.is_set():
+            result['error'] = f'Timed out after {timeout}s.'
+
+        observe_call(argv, result['duration'], 0, process.returncode)
+        current.set_attribute('returncode', process.returncode)
+
+    return result
+
+
+class _Output:
+    """
+    Thread-safe output of lines prefixed by the host name.
+
+    Args:
+        file (file-like object): Text file.
+        names (iterable of str): Hosts names, used to align prefixes.
+    """
+
+    def __init__(self, file, names):
+        self._file = file
+        self._width = max(len(name) for name in names)
+        self._lock = Lock()
+
+    def write(self, name, line):
+        """
+        Write a line.
+
+        Args:
+            name (str): Host name.
+            line (bytes): Line.
+        """
+        line = line.decode(errors='replace').rstrip('\r\n')
+        with self._lock:
+            self._file.write(f'{name:<{self._width}} | {line}\n')
+            self._file.flush()
+
+
+def execute(command, hosts='all', max_workers=None, private_ip=False,
+            timeout=None, file=None):
+    """
+    Run a command on many hosts concurrently over SSH.
+
+    Hosts connection information are read from their Terraform state. Outputs
+    are streamed line by line, prefixed by the host name.
+
+    Args:
+        command (str or iterable of str): Command to run on hosts. Arguments
+            are joined with spaces by the SSH client, like with "ssh".
+        hosts (str or iterable of str): "all", or hosts names glob patterns.
+        max_workers (int): Maximum number of commands running concurrently.
+            Default to 16.
+        private_ip (bool): If True, use the private IP address instead of the
+            public IP address.
+        timeout (float): Timeout in seconds of the command on each host.
+        file (file-like object): Outputs file. Default to "sys.stdout".
+
+    Returns:
+        list of dict: Results of each host, sorted by host name, with "host",
+            "returncode" ("None" if not run), "duration" in seconds and
+            "error" (Error message or "None").
+    """
+    # Lazy import: Only required to run commands
+    from concurrent.futures import ThreadPoolExecutor
+    from accelpy._common import propagate_context
+
+    if isinstance(command, str):
+        command = (command,)
+    command = tuple(command)
+    if not command:
+        raise ConfigurationException('A command is required.')
+
+    if file is None:
+        from sys import stdout
+        file = stdout
+
+    names = select_hosts(hosts)
+    output = _Output(file, names)
+
+    with span('ssh.execute', hosts=len(names)):
+        with ThreadPoolExecutor(max_workers=min(
+                max_workers or MAX_WORKERS, len(names))) as executor:
+            futures = [executor.submit(
+                propagate_context(_run_host), name, command, private_ip,
+                output, timeout) for name in names]
+        return [future.result() for future in futures]
+
+
+def format_summary(results):
+    """
+    Format results of "execute".
+
+    Args:
+        results (list of dict): Results.
+
+    Returns:
+        str: Summary, one line per host.
+    """
+    width = max(len(result['host']) for result in results)
+    lines = []
+    for result in results:
+        returncode = result['returncode']
+        line = (f'{result["host"]:<{width}}  '
+                f'{"-" if returncode is None else returncode:>4}  '
+                f'{result["duration"]:>8.3f}s')
+        if result['error']:
+            line += f'  {result["error"]}'
+        lines.append(line)
+    return '\n'.join(lines)
@@ -0,0 +1,414 @@
+# coding=utf-8
+"""Host life-cycle tracing"""
+from contextlib import contextmanager
+from os import environ, urandom
+from os.path import expanduser
+from threading import Lock, local
+import time as _time
+
+from accelpy.exceptions import ConfigurationException
+
+# Epoch time in nanoseconds ("time.time_ns" requires Python >= 3.7)
+_time_ns = getattr(_time, 'time_ns', None) or (
+    lambda: int(_time.time() * 1e9))
+
+#: Environment variable used to configure exporters
+TRACE_ENV = 'ACCELPY_TRACE'
+
+# Configured exporters, None if not configured yet
+_exporters = None
+
+# Current span, by thread
+_current = local()
+
+# Files write lock
+_write_lock = Lock()
+
+
+class Span:
+    """
+    Traced operation.
+
+    Args:
+        name (str): Span name.
+        parent (Span): Parent span.
+        attributes (dict): Span attributes.
+    """
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'end',
+                 'attributes', 'error', '_spans')
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.span_id = urandom(8).hex()
+        if parent is None:
+            self.trace_id = urandom(16).hex()
+            self.parent_id = None
+            self._spans = []
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self._spans = parent._spans
+        self.attributes = attributes or dict()
+        self.error = None
+        self.start = _time_ns()
+        self.end = None
+
+    def set_attribute(self, key, value):
+        """
+        Set a span attribute.
+
+        Args:
+            key (str): Attribute key.
+            value (object): Attribute value.
+        """
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        """
+        Span duration.
+
+        Returns:
+            float: Duration in seconds.
+        """
+        return ((self.end or _time_ns()) - self.start) / 1e9
+
+    def to_dict(self):
+        """
+        Return span as a dictionary.
+
+        Returns:
+            dict: Span.
+        """
+        return dict(
+            name=self.name, trace_id=self.trace_id, span_id=self.span_id,
+            parent_id=self.parent_id, start=self.start, end=self.end,
+            duration=self.duration, attributes=self.attributes,
+            status='error' if self.error else 'ok', error=self.error)
+
+
+class _NoSpan:
+    """Span used when tracing is disabled"""
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        """
+        Does nothing.
+
+        Args:
+            key (str): Attribute key.
+            value (object): Attribute value.
+        """
+
+
+_NO_SPAN = _NoSpan()
+
+
+class JsonLinesExporter:
+    """
+    Export spans to a JSON lines file, one span per line.
+
+    Args:
+        path (path-like object): File path.
+    """
+
+    def __init__(self, path):
+        self._path = path
+
+    def export(self, spans):
+        """
+        Export spans.
+
+        Args:
+            spans (list of Span): Spans of a trace.
+        """
+        # Lazy import: Only required to export
+        from json import dumps
+
+        lines = ''.join(
+            dumps(span.to_dict(), default=str) + '\n' for span in spans)
+        with _write_lock, open(self._path, 'at') as file:
+            file.write(lines)
+
+
+class OtlpJsonExporter:
+    """
+    Export spans to a file using the OpenTelemetry protocol JSON encoding.
+
+    Each trace is written as an "ExportTraceServiceRequest" on a single line,
+    like the OpenTelemetry collector file exporter.
+
+    Args:
+        path (path-like object): File path.
+    """
+
+    def __init__(self, path):
+        self._path = path
+
+    @classmethod
+    def _attributes(cls, attributes):
+        """
+        Convert attributes to OTLP "KeyValue" list.
+
+        Args:
+            attributes (dict): Attributes.
+
+        Returns:
+            list of dict: Attributes.
+        """
+        return [dict(key=key, value=cls._value(value))
+                for key, value in attributes.items()]
+
+    @classmethod
+    def _value(cls, value):
+        """
+        Convert a value to OTLP "AnyValue".
+
+        Args:
+            value (object): Value.
+
+        Returns:
+            dict: Value.
+        """
+        if isinstance(value, bool):
+            return dict(boolValue=value)
+        elif isinstance(value, int):
+            return dict(intValue=str(value))
+        elif isinstance(value, float):
+            return dict(doubleValue=value)
+        elif isinstance(value, (list, tuple)):
+            return dict(arrayValue=dict(
+                values=[cls._value(item) for item in value]))
+        return dict(stringValue=str(value))
+
+    def export(self, spans):
+        """
+        Export spans.
+
+        Args:
+            spans (list of Span): Spans of a trace.
+        """
+        # Lazy import: Only required to export
+        from json import dumps
+        from accelpy import __version__
+
+        otlp_spans = []
+        for span in spans:
+            otlp_span = dict(
+                traceId=span.trace_id, spanId=span.span_id, name=span.name,
+                kind=1, startTimeUnixNano=str(span.start),
+                endTimeUnixNano=str(span.end),
+                attributes=self._attributes(span.attributes),
+                status=dict(code=2, message=span.error) if span.error else
+                dict(code=1))
+            if span.parent_id:
+                otlp_span['parentSpanId'] = span.parent_id
+            otlp_spans.append(otlp_span)
+
+        line = dumps(dict(resourceSpans=[dict(
+            resource=dict(attributes=self._attributes({
+                'service.name': 'accelpy'})),
+            scopeSpans=[dict(
+                scope=dict(name='accelpy', version=__version__),
+                spans=otlp_spans)])]))
+
+        with _write_lock, open(self._path, 'at') as file:
+            file.write(line + '\n')
+
+
+class ConsoleExporter:
+    """
+    Print a summary of spans durations.
+
+    Args:
+        file (file-like object): Output file. Default to "sys.stderr".
+    """
+
+    def __init__(self, file=None):
+        self._file = file
+
+    def export(self, spans):
+        """
+        Export spans.
+
+        Args:
+            spans (list of Span): Spans of a trace.
+        """
+        children = dict()
+        for span in sorted(spans, key=lambda item: item.start):
+            children.setdefault(span.parent_id, []).append(span)
+
+        lines = []
+
+        def add_lines(parent_id, depth):
+            """Add children spans lines"""
+            for child in children.get(parent_id, ()):
+                label = child.name
+                command = child.attributes.get('command')
+                if command:
+                    label += f' {command}'
+                label = f'{"  " * depth}{label}'
+                if len(label) > 60:
+                    label = label[:57] + '...'
+                lines.append(f'{label:<60} {child.duration:>9.3f}s'
+                             f'{" (error)" if child.error else ""}')
+                add_lines(child.span_id, depth + 1)
+
+        add_lines(None, 0)
+
+        if self._file is None:
+            # Lazy import: Only required if no file specified
+            from sys import stderr
+            file = stderr
+        else:
+            file = self._file
+        file.write('\n'.join(lines) + '\n')
+        file.flush()
+
+
+_EXPORTERS = dict(
+    console=ConsoleExporter, jsonl=JsonLinesExporter, otlp=OtlpJsonExporter)
+
+
+def set_exporters(*exporters):
+    """
+    Set spans exporters. Tracing is disabled if no exporter is set.
+
+    Args:
+        exporters: Exporters. Objects with an "export" method that take a list
+            of "Span" of a trace as argument.
+    """
+    global _exporters
+    _exporters = list(exporters)
+
+
+def get_exporters():
+    """
+    Get spans exporters.
+
+    If not set, exporters are configured on first call from the
+    "ACCELPY_TRACE" environment variable. This variable contains comma
+    separated exporters: "console" (Summary printed on stderr),
+    "jsonl:<path>" (JSON lines file) and "otlp:<path>" (OpenTelemetry protocol
+    JSON file).
+
+    Returns:
+        list: Exporters.
+    """
+    if _exporters is None:
+        exporters = []
+        for value in environ.get(TRACE_ENV, '').split(','):
+            kind, _, path = value.strip().partition(':')
+            if not kind:
+                continue
+            try:
+                exporter_type = _EXPORTERS[kind]
+            except KeyError:
+                raise ConfigurationException(
+                    f'Unsupported trace exporter "{kind}" in "{TRACE_ENV}", '
+                    f'valid exporters are: {", ".join(_EXPORTERS)}.')
+            if kind != 'console' and not path:
+                raise ConfigurationException(
+                    f'A file path is required for the "{kind}" trace exporter'
+                    f' in "{TRACE_ENV}".')
+            exporters.append(
+                exporter_type(expanduser(path)) if path else exporter_type())
+        set_exporters(*exporters)
+    return _exporters
+
+
+def current_span():
+    """
+    Return the current span of this thread.
+
+    Returns:
+        Span or None: Current span.
+    """
+    return getattr(_current, 'span', None)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Trace an operation.
+
+    Spans started inside the context are children of this span. The trace
+    spans are exported once the root span ends.
+
+    Args:
+        name (str): Span name.
+        attributes: Span attributes.
+
+    Yields:
+        Span: Span. Its "set_attribute" method does nothing if tracing is
+            disabled.
+    """
+    exporters = get_exporters()
+    if not exporters:
+        yield _NO_SPAN
+        return
+
+    parent = getattr(_current, 'span', None)
+    current = _current.span = Span(name, parent, attributes)
+    try:
+        yield current
+
+    except BaseException as exception:
+        current.error = f'{exception.__class__.__name__}: {exception}'
+        raise
+
+    finally:
+        current.end = _time_ns()
+        _current.span = parent
+        current._spans.append(current)
+        if parent is None:
+            _export(exporters, current._spans)
+
+
+def _export(exporters, spans):
+    """
+    Export spans of a trace.
+
+    Exporters errors are shown as warnings and never interrupt the traced
+    operation.
+
+    Args:
+        exporters (list): Exporters.
+        spans (list of Span): Spans of a trace.
+    """
+    for exporter in exporters:
+        try:
+            exporter.export(spans)
+        except Exception as exception:
+            # Lazy import: Only required on error
+            from warnings import warn
+            warn(f'Unable to export trace with '
+                 f'"{exporter.__class__.__name__}": {exception}',
+                 RuntimeWarning)
+
+
+def propagate_span(func):
+    """
+    Wrap a function to run it as a child of the current span of this thread.
+    Used to run the function in another thread.
+
+    Args:
+        func (callable): Function.
+
+    Returns:
+        callable: Wrapped function.
+    """
+    parent = getattr(_current, 'span', None)
+    if parent is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        """Run with parent span"""
+        previous = getattr(_current, 'span', None)
+        _current.span = parent
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.span = previous
+
+    return wrapper
@@ -1,37 +1,148 @@
 """YAML serializer"""
-from os import fsdecode as _fsdecode
+from os import fsdecode as _fsdecode, stat as _stat
 from os.path import realpath as _realpath
+from threading import Lock as _Lock
 
-try:
-    # Use LibYAML if available
-    from yaml import CSafeLoader as _Loader, CDumper as _Dumper
-except ImportError:
-    # Else use pure-Python library
-    from yaml import SafeLoader as _Loader, Dumper as _Dumper
+from accelpy._metrics import count_cache as _count_cache
+from accelpy.exceptions import (
+    ConfigurationException as _ConfigurationException,
+    RuntimeException as _RuntimeException)
 
-from yaml import dump as _yaml_dump, load as _yaml_load, YAMLError as _YAMLError
+#: Maximum number of files in the parse cache
+_CACHE_SIZE = 256
 
-from accelpy.exceptions import ConfigurationException as _ConfigurationException
+# Parsed files cache: path: (mtime, size, cached value, is marshal)
+_cache = dict()
+_cache_lock = _Lock()
 
+# PyYAML functions, imported on first use
+_pyyaml = None
 
-def yaml_read(path):
+
+def _get_pyyaml():
+    """
+    Return PyYAML functions and classes, using LibYAML if available.
+
+    Warn once if LibYAML is not available.
+
+    Returns:
+        tuple: load, dump, Loader, Dumper, YAMLError.
+    """
+    global _pyyaml
+    if _pyyaml is not None:
+        return _pyyaml
+
+    from yaml import dump, load, YAMLError
+    try:
+        # Use LibYAML if available
+        from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+
+    except ImportError:
+        # Else use pure-Python library
+        from yaml import SafeLoader as Loader, SafeDumper as Dumper
+
+        from warnings import warn
+        warn('LibYAML is not available, YAML files are processed with the '
+             'slower pure-Python PyYAML implementation. Install LibYAML and '
+             'reinstall PyYAML to improve performance.', RuntimeWarning)
+
+    _pyyaml = load, dump, Loader, Dumper, YAMLError
+    return _pyyaml
+
+
+def _from_cache(path, stat):
+    """
+    Get a copy of a parsed file from cache.
+
+    Args:
+        path (str): Absolute path.
+        stat (os.stat_result): Current file status.
+
+    Returns:
+        object: Cached content copy, or None if not cached.
+    """
+    try:
+        mtime, size, value, is_marshal = _cache[path]
+    except KeyError:
+        return None
+
+    if mtime != stat.st_mtime_ns or size != stat.st_size:
+        return None
+
+    if is_marshal:
+        # Lazy import: Only required with cached values
+        from marshal import loads
+        return loads(value)
+
+    # Values that cannot be marshaled (like dates)
+    from copy import deepcopy
+    return deepcopy(value)
+
+
+def _to_cache(path, stat, data):
+    """
+    Add a parsed file to cache.
+
+    Args:
+        path (str): Absolute path.
+        stat (os.stat_result): File status.
+        data (object): Parsed content, a copy is cached.
+    """
+    # Lazy import: Only required with cached values
+    from marshal import dumps
+    try:
+        value = dumps(data), True
+    except ValueError:
+        from copy import deepcopy
+        value = deepcopy(data), False
+
+    with _cache_lock:
+        _cache.pop(path, None)
+        while len(_cache) >= _CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+        _cache[path] = (stat.st_mtime_ns, stat.st_size) + value
+
+
+def yaml_read(path, content=None):
     """
     Read a YAML file.
 
+    Files read from "path" only are cached based on their modification time
+    and size. The result is always a copy that can be modified.
+
     Args:
         path (path-like object): Path to file to load.
+        content (bytes): File content, if already read.
 
     Returns:
         dict or list: Un-serialized content
     """
     path = _realpath(_fsdecode(path))
-    with open(path, 'rt') as file:
-        try:
-            return _yaml_load(file, Loader=_Loader)
+    if content is None:
+        stat = _stat(path)
+        data = _from_cache(path, stat)
+        if data is not None:
+            _count_cache('yaml', 'hit')
+            return data
+        _count_cache('yaml', 'miss')
 
-        except _YAMLError as exception:
-            raise _ConfigurationException(
-                f'Unable to read "{path}": {str(exception)}')
+        with open(path, 'rb') as file:
+            content = file.read()
+    else:
+        stat = None
+
+    load, _, loader, _, yaml_error = _get_pyyaml()
+    try:
+        data = load(content, Loader=loader)
+
+    except yaml_error as exception:
+        raise _ConfigurationException(
+            f'Unable to read "{path}": {str(exception)}')
+
+    if stat is not None:
+        _to_cache(path, stat, data)
+
+    return data
 
 
 def yaml_write(data, path, **kwargs):
@@ -43,5 +154,72 @@ def yaml_write(data, path, **kwargs):
         path (path-like object): Path where save file.
         kwargs: "yaml.dump" kwargs.
     """
-    with open(_fsdecode(path), 'wt') as file:
-        _yaml_dump(data, file, Dumper=_Dumper, **kwargs)
\ No newline at end of file
+    _, dump, _, dumper, _ = _get_pyyaml()
+    path = _fsdecode(path)
+    _cache.pop(_realpath(path), None)
+    with open(path, 'wt') as file:
+        dump(data, file, Dumper=dumper, **kwargs)
+
+
+def _round_trip_yaml():
+    """
+    Return a round-trip YAML serializer.
+
+    Returns:
+        ruamel.yaml.YAML: Serializer.
+
+    Raises:
+        accelpy.exceptions.RuntimeException: "ruamel.yaml" not installed.
+    """
+    try:
+        # Lazy import: Optional dependency, only used in round-trip mode
+        from ruamel.yaml import YAML
+    except ImportError:
+        raise _RuntimeException(
+            'The YAML round-trip mode requires the "ruamel.yaml" package.')
+    return YAML()
+
+
+def yaml_read_round_trip(path):
+    """
+    Read a YAML file in round-trip mode.
+
+    The result keep formatting and comments of the file to allow writing it
+    back with "yaml_write_round_trip". Requires "ruamel.yaml".
+
+    Args:
+        path (path-like object): Path to file to load.
+
+    Returns:
+        ruamel.yaml.comments.CommentedMap or ruamel.yaml.comments.CommentedSeq:
+            Un-serialized content
+    """
+    yaml = _round_trip_yaml()
+    from ruamel.yaml.error import YAMLError
+
+    path = _realpath(_fsdecode(path))
+    with open(path, 'rt') as file:
+        try:
+            return yaml.load(file)
+
+        except YAMLError as exception:
+            raise _ConfigurationException(
+                f'Unable to read "{path}": {str(exception)}')
+
+
+def yaml_write_round_trip(data, path):
+    """
+    Write a YAML file in round-trip mode.
+
+    Requires "ruamel.yaml".
+
+    Args:
+        data (ruamel.yaml.comments.CommentedBase or dict or list): data to
+            serialize.
+        path (path-like object): Path where save file.
+    """
+    yaml = _round_trip_yaml()
+    path = _fsdecode(path)
+    _cache.pop(_realpath(path), None)
+    with open(path, 'wt') as file:
+        yaml.dump(data, file)
@@ -0,0 +1,197 @@
+# coding=utf-8
+"""Benchmarks configuration
+
+Benchmarks run offline: Terraform, Packer and Ansible executables are replaced
+by stubs scripts that only fake outputs and state files, so only the accelpy
+overhead is measured.
+"""
+from os import chmod
+from types import SimpleNamespace
+
+import pytest
+
+#: Stub Terraform: Fake outputs and state files
+TERRAFORM_STUB = """#!/bin/sh
+case "$1" in
+    version) echo "Terraform v0.12.20" ;;
+    init|validate|refresh) ;;
+    plan) echo "Plan: 1 to add, 0 to change, 0 to destroy."; : > tfplan ;;
+    apply) echo '{"version": 4, "resources": [{"type": "null_resource"}]}' \
+> terraform.tfstate; rm -f tfplan ;;
+    destroy) rm -f terraform.tfstate ;;
+    output)
+        if [ -f terraform.tfstate ]; then
+            echo '{"host_public_ip": {"value": "127.0.0.1"},' \
+'"host_private_ip": {"value": "127.0.0.1"},' \
+'"remote_user": {"value": "user"},' \
+'"host_ssh_private_key": {"value": "./ssh_private.pem"}}'
+        else
+            echo '{}'
+        fi ;;
+    state) [ -f terraform.tfstate ] || exit 1; echo "null_resource.host" ;;
+    *) echo "Unsupported command: $1" >&2; exit 1 ;;
+esac
+"""
+
+#: Stub Packer: Fake build manifest
+PACKER_STUB = """#!/bin/sh
+case "$1" in
+    version) echo "Packer v1.5.1" ;;
+    validate) ;;
+    build) echo '{"last_run_uuid": "uuid", "builds": [{' \
+'"packer_run_uuid": "uuid", "builder_type": "file",' \
+'"files": [{"name": "artifact.json"}]}]}' > packer-manifest.json ;;
+    *) echo "Unsupported command: $1" >&2; exit 1 ;;
+esac
+"""
+
+#: Stub "ansible-galaxy": Fake roles installation. Ansible entry points are
+#: called with the Python interpreter.
+ANSIBLE_GALAXY_STUB = """from os import makedirs
+from os.path import join
+from sys import argv
+
+args = argv[1:]
+roles_path = [arg for arg in args if arg.startswith('--roles-path=')][0]
+for role in (arg for arg in args[1:] if not arg.startswith('-')):
+    makedirs(join(roles_path.split('=', 1)[1], role.split(',', 1)[0], 'meta'),
+             exist_ok=True)
+"""
+
+#: Stub "ansible-playbook": Do nothing
+ANSIBLE_PLAYBOOK_STUB = ''
+
+
+def _write_stub(path, content):
+    """
+    Write an executable stub script.
+
+    Args:
+        path (py.path.local): Path.
+        content (str): Script content.
+
+    Returns:
+        str: Path.
+    """
+    path.write(content)
+    chmod(path, 0o755)
+    return str(path)
+
+
+@pytest.fixture
+def accelpy_home(tmpdir, monkeypatch):
+    """
+    Mock the "~/.accelize" directory and run from an empty working directory.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+        monkeypatch (_pytest.monkeypatch.MonkeyPatch): monkeypatch fixture
+
+    Returns:
+        py.path.local: Home directory.
+    """
+    import accelpy._application as application
+    import accelpy._common as common
+    import accelpy._hashicorp as hashicorp
+    import accelpy._host as host
+
+    home_dir = tmpdir.join('home').ensure(dir=True)
+    monkeypatch.setattr(common, 'HOME_DIR', str(home_dir))
+    monkeypatch.setattr(common, 'CACHE_DIR', str(home_dir.join('.cache')))
+    monkeypatch.setattr(hashicorp, 'HOME_DIR', str(home_dir))
+    monkeypatch.setattr(host, 'CONFIG_DIR', str(home_dir.join('hosts')))
+    monkeypatch.setattr(application, 'DEFINITION_CACHE_DIR',
+                        str(home_dir.join('.cache_definitions')))
+    monkeypatch.setattr(application, 'DEFINITION_STORE_DIR',
+                        str(home_dir.join('.cache_applications')))
+    monkeypatch.chdir(tmpdir.join('cwd').ensure(dir=True))
+    return home_dir
+
+
+@pytest.fixture
+def stub_utilities(tmpdir, monkeypatch):
+    """
+    Replace Terraform, Packer and Ansible executables by stubs.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+        monkeypatch (_pytest.monkeypatch.MonkeyPatch): monkeypatch fixture
+
+    Returns:
+        py.path.local: Stubs directory.
+    """
+    from accelpy._ansible import Ansible
+    from accelpy._packer import Packer
+    from accelpy._terraform import Terraform
+
+    bin_dir = tmpdir.join('bin').ensure(dir=True)
+    monkeypatch.setattr(Terraform, '_executable', _write_stub(
+        bin_dir.join('terraform'), TERRAFORM_STUB))
+    monkeypatch.setattr(Packer, '_executable', _write_stub(
+        bin_dir.join('packer'), PACKER_STUB))
+    _write_stub(bin_dir.join('ansible-galaxy'), ANSIBLE_GALAXY_STUB)
+    _write_stub(bin_dir.join('ansible-playbook'), ANSIBLE_PLAYBOOK_STUB)
+    monkeypatch.setattr(Ansible, '_ANSIBLE_EXECUTABLE',
+                        str(bin_dir.join('ansible')))
+    return bin_dir
+
+
+@pytest.fixture
+def user_config(tmpdir):
+    """
+    Mock an user configuration directory with an application definition and
+    "testing" provider configurations.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+
+    Returns:
+        types.SimpleNamespace: "path" (User configuration directory),
+            "application" (Application definition path) and "provider".
+    """
+    from accelpy._common import json_write
+    from accelpy._yaml import yaml_write
+
+    source_dir = tmpdir.join('user_config').ensure(dir=True)
+    source_dir.ensure('cred.json')
+
+    application = source_dir.join('application.yml')
+    yaml_write({
+        'application': {
+            'product_id': 'my_product_id',
+            'version': '1.0.0'
+        },
+        'package': [{
+            'type': 'container_image',
+            'name': 'my_image'
+        }],
+        'fpga': {
+            'image': 'image',
+            'testing': {
+                'image': 'image_testing'
+            }
+        },
+        'accelize_drm': {
+            'conf': {
+                'drm': {}
+            }
+        }
+    }, application)
+
+    json_write({'locals': {
+        "host_public_ip": "127.0.0.1",
+        "host_private_ip": "127.0.0.1",
+        "remote_user": 'user',
+        "remote_os": "os",
+        "provider_required_driver": "driver",
+        "require_ask_pass": "false"
+    }}, source_dir.join('common.testing.tf.json'))
+
+    json_write({'builders': [{
+        "type": "file",
+        "content": "",
+        "target": "artifact.json"
+    }]}, source_dir.join('testing.json'))
+
+    return SimpleNamespace(
+        path=source_dir, application=str(application), provider='testing')
@@ -0,0 +1,26 @@
+# coding=utf-8
+"""Ansible roles benchmarks"""
+
+
+def test_container_service_ports_filters(benchmark):
+    """
+    Benchmark "container_service" role ports filters with large ports ranges.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+    """
+    from importlib.util import spec_from_file_location, module_from_spec
+    from os.path import dirname, join
+    from accelpy._ansible import __file__ as ansible_py_file
+
+    spec = spec_from_file_location('container_service_main', join(
+        dirname(ansible_py_file), 'roles', 'container_service',
+        'filter_plugins', 'main.py'))
+    filters = module_from_spec(spec)
+    spec.loader.exec_module(filters)
+
+    rules = [dict(start_port=port, end_port=port + 999, protocol='tcp',
+                  direction='ingress') for port in range(1000, 65000, 2000)]
+
+    ports = benchmark(filters.rules_ports, rules, redirect=True)
+    assert len(ports) == len(rules) + 24
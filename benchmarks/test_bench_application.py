@@ -0,0 +1,130 @@
+# coding=utf-8
+"""Application definition and sources benchmarks"""
+
+
+def test_application_validate(benchmark, accelpy_home, user_config):
+    """
+    Benchmark application definition validation, without cache.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        user_config (types.SimpleNamespace): user_config fixture
+    """
+    from shutil import rmtree
+    import accelpy._application as application
+    import accelpy._yaml as yaml
+    from accelpy._application import Application
+
+    def setup():
+        """Clear caches"""
+        rmtree(application.DEFINITION_CACHE_DIR, ignore_errors=True)
+        yaml._cache.clear()
+
+    app = benchmark.pedantic(Application, args=(user_config.application,),
+                             setup=setup, rounds=100)
+    assert app.providers == {'testing'}
+
+
+def test_application_validate_cached(benchmark, accelpy_home, user_config):
+    """
+    Benchmark application definition validation, with cache.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        user_config (types.SimpleNamespace): user_config fixture
+    """
+    from accelpy._application import Application
+
+    Application(user_config.application)
+    app = benchmark(Application, user_config.application)
+    assert app.providers == {'testing'}
+
+
+def test_application_provider(benchmark, accelpy_home, user_config):
+    """
+    Benchmark provider specific definition generation.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        user_config (types.SimpleNamespace): user_config fixture
+    """
+    from accelpy._application import Application
+
+    def get_provider_definition():
+        """Get definition from a new application"""
+        return Application(user_config.application)[user_config.provider]
+
+    definition = benchmark(get_provider_definition)
+    assert definition['fpga']['image'] == ['image_testing']
+
+
+def test_sources_discovery(benchmark, accelpy_home, user_config, tmpdir):
+    """
+    Benchmark utilities sources discovery.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        user_config (types.SimpleNamespace): user_config fixture
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from accelpy._packer import Packer
+    from accelpy._terraform import Terraform
+
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    utilities = Terraform(config_dir), Packer(config_dir)
+
+    def list_sources():
+        """List sources of all utilities"""
+        return [source for utility in utilities
+                for source in utility._list_sources(
+                    user_config.provider, 'container_image',
+                    user_config.path)]
+
+    names = {name for name, _ in benchmark(list_sources)}
+    assert 'common.testing.tf.json' in names
+    assert 'testing.json' in names
+
+
+def test_application_validate_large(benchmark):
+    """
+    Benchmark validation of a large definition: 300 packages, 300 firewall
+    rules and 5 providers overriding each node.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+    """
+    from copy import deepcopy
+    from accelpy._application import _VALIDATOR
+
+    names = [f'provider_{index}' for index in range(5)]
+    definition = {
+        'application': {
+            'product_id': 'my_product_id',
+            'version': '1.0.0'
+        },
+        'package': [dict(
+            {'type': 'container_image', 'name': f'image_{index}'},
+            **{name: {'name': f'image_{index}_{name}'} for name in names})
+            for index in range(300)],
+        'firewall_rules': [dict(
+            {'start_port': index, 'end_port': index + 10, 'protocol': 'tcp'},
+            **{name: {'direction': 'egress'} for name in names})
+            for index in range(300)],
+        'fpga': dict(
+            {'image': 'image'},
+            **{name: {'image': ['image_0', 'image_1']} for name in names})
+    }
+
+    def validate(definition):
+        """Validate a definition"""
+        providers = set()
+        _VALIDATOR(definition, providers)
+        return providers
+
+    providers = benchmark.pedantic(
+        validate, setup=lambda: ((deepcopy(definition),), {}), rounds=100)
+    assert len(providers) == 5
@@ -0,0 +1,69 @@
+# coding=utf-8
+"""Command line interface benchmarks"""
+import pytest
+
+
+@pytest.mark.parametrize('recursive', (False, True), ids=('exact', 'prefix'))
+def test_cli_cache(benchmark, accelpy_home, monkeypatch, recursive):
+    """
+    Benchmark CLI cache lookups.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        monkeypatch (_pytest.monkeypatch.MonkeyPatch): monkeypatch fixture
+        recursive (bool): Recursive lookup.
+    """
+    from accelpy._common import get_cli_cache, set_cli_cache
+
+    monkeypatch.setenv('ACCELPY_CLI', 'True')
+    for index in range(100):
+        set_cli_cache(f'product_ids|product{index}', [f'product{index}'],
+                      expiry_seconds=3600)
+
+    name = 'product_ids|product99_version' if recursive else \
+        'product_ids|product99'
+    assert benchmark(get_cli_cache, name, recursive=recursive) == [
+        'product99']
+
+
+@pytest.mark.parametrize('line', (
+    'accelpy plan --name ', 'accelpy init --application {application} '
+                            '--provider '), ids=('name', 'provider'))
+def test_completion(benchmark, tmpdir, user_config, line):
+    """
+    Benchmark shell completion latency of the "accelpy" command.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        tmpdir (py.path.local) tmpdir pytest fixture
+        user_config (types.SimpleNamespace): user_config fixture
+        line (str): Command line to complete.
+    """
+    from os import environ
+    from os.path import dirname
+    from subprocess import run
+    from sys import executable
+    import accelpy
+
+    home = tmpdir.join('home').ensure(dir=True)
+    for index in range(100):
+        home.join(f'.accelize/hosts/host{index}').ensure(dir=True)
+    output = tmpdir.join('completion')
+
+    line = line.format(application=user_config.application)
+    env = environ.copy()
+    env.update(dict(
+        HOME=str(home), _ARGCOMPLETE='1', _ARGCOMPLETE_IFS='\n',
+        _ARGCOMPLETE_STDOUT_FILENAME=str(output), COMP_LINE=line,
+        COMP_POINT=str(len(line)),
+        PYTHONPATH=dirname(dirname(accelpy.__file__))))
+
+    def complete():
+        """Run completion"""
+        run([executable, '-m', 'accelpy'], env=env, cwd=str(tmpdir),
+            check=True)
+        return [value.strip() for value in output.read().split('\n')]
+
+    completions = benchmark.pedantic(complete, rounds=10, warmup_rounds=1)
+    assert ('host99' if '--name' in line else 'testing') in completions
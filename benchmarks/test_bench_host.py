@@ -0,0 +1,72 @@
+# coding=utf-8
+"""Host configuration benchmarks"""
+import pytest
+
+
+def test_host_create(benchmark, accelpy_home, stub_utilities, user_config):
+    """
+    Benchmark a new host configuration creation.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        stub_utilities (py.path.local): stub_utilities fixture
+        user_config (types.SimpleNamespace): user_config fixture
+    """
+    from accelpy._host import Host
+
+    host = benchmark(
+        Host, application=user_config.application,
+        provider=user_config.provider, user_config=user_config.path)
+    assert accelpy_home.join(f'hosts/{host.name}/playbook.yml').isfile()
+
+
+def test_host_create_config(benchmark, accelpy_home, stub_utilities,
+                            user_config):
+    """
+    Benchmark "Host._create_config".
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        stub_utilities (py.path.local): stub_utilities fixture
+        user_config (types.SimpleNamespace): user_config fixture
+    """
+    from itertools import count
+    from accelpy._host import Host
+
+    names = count()
+
+    def setup():
+        """Load an empty host configuration"""
+        name = f'host{next(names)}'
+        accelpy_home.join('hosts', name).ensure(dir=True)
+        return (Host(name=name), user_config.application,
+                user_config.provider, str(user_config.path)), dict()
+
+    benchmark.pedantic(Host._create_config, setup=setup, rounds=20)
+    assert accelpy_home.join('hosts/host0/common.tf').isfile()
+
+
+@pytest.mark.parametrize('count', (10, 1000, 10000))
+def test_iter_hosts(benchmark, accelpy_home, stub_utilities, count):
+    """
+    Benchmark existing hosts configurations iteration.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        accelpy_home (py.path.local): accelpy_home fixture
+        stub_utilities (py.path.local): stub_utilities fixture
+        count (int): Number of hosts.
+    """
+    from accelpy._host import iter_hosts
+
+    hosts_dir = accelpy_home.join('hosts')
+    for index in range(count):
+        hosts_dir.join(f'host{index}').ensure(dir=True)
+
+    def list_hosts():
+        """List hosts names"""
+        return [host.name for host in iter_hosts()]
+
+    assert len(benchmark.pedantic(list_hosts, rounds=3)) == count
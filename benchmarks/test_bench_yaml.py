@@ -0,0 +1,60 @@
+# coding=utf-8
+"""YAML backends and cache benchmarks"""
+import pytest
+
+
+@pytest.fixture
+def yaml_file(tmpdir):
+    """
+    Large YAML file.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+
+    Returns:
+        py.path.local: YAML file.
+    """
+    from accelpy._yaml import yaml_write
+
+    path = tmpdir.join('file.yml')
+    yaml_write({f'key{index}': {'values': list(range(10)), 'name': 'value'}
+                for index in range(500)}, path)
+    return path
+
+
+@pytest.mark.parametrize('loader', ('SafeLoader', 'CSafeLoader'))
+def test_yaml_parse(benchmark, yaml_file, loader):
+    """
+    Benchmark YAML parsing with PyYAML and LibYAML backends.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        yaml_file (py.path.local): yaml_file fixture
+        loader (str): PyYAML loader.
+    """
+    import yaml
+
+    if not hasattr(yaml, loader):
+        pytest.skip('LibYAML not available')
+
+    data = benchmark(yaml.load, yaml_file.read_binary(),
+                     Loader=getattr(yaml, loader))
+    assert len(data) == 500
+
+
+def test_yaml_read_cached(benchmark, yaml_file):
+    """
+    Benchmark YAML file read from cache.
+
+    Args:
+        benchmark (pytest_benchmark.fixture.BenchmarkFixture): benchmark fixture
+        yaml_file (py.path.local): yaml_file fixture
+    """
+    import accelpy._yaml as accelpy_yaml
+    from accelpy._yaml import yaml_read
+
+    try:
+        yaml_read(yaml_file)
+        assert len(benchmark(yaml_read, yaml_file)) == 500
+    finally:
+        accelpy_yaml._cache.clear()
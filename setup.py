@@ -48,8 +48,11 @@ PACKAGE_INFO = dict(
         'argcomplete>=1.10',
         'awscli>=1.16'  # To remove once Terraform support spot instance tagging
     ],
+    extras_require={
+        'yaml_round_trip': ['ruamel.yaml>=0.15'],
+        'fast_json': ['orjson>=3']},
     setup_requires=['setuptools'],
-    tests_require=['pytest', 'molecule[docker]'],
+    tests_require=['pytest', 'pytest-benchmark', 'molecule[docker]'],
     packages=find_packages(exclude=['docs', 'tests']),
     include_package_data=True,
     zip_safe=False,
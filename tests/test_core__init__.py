@@ -38,3 +38,68 @@ def test_python_version():
     finally:
         sys.version_info = sys_version_info
         unimport()
+
+
+def test_import(tmpdir):
+    """
+    Test "import accelpy" speed and side effects.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from json import loads
+    from os import environ
+    from os.path import dirname
+    from subprocess import run, PIPE
+    import sys
+    import accelpy
+
+    # Run in a clean environment without existing user configuration
+    env = environ.copy()
+    env['HOME'] = str(tmpdir)
+    env['PYTHONPATH'] = dirname(dirname(accelpy.__file__))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env.pop('ACCELPY_CLI', None)
+    home_dir = tmpdir.join('.accelize')
+
+    script = '\n'.join((
+        'import sys, json',
+        'before = set(sys.modules)',
+        'import accelpy',
+        'print(json.dumps(sorted(set(sys.modules) - before)))'))
+
+    # First run may also compile the package
+    for _ in range(2):
+        result = run([sys.executable, '-X', 'importtime', '-c', script],
+                     env=env, stdout=PIPE, stderr=PIPE,
+                     universal_newlines=True, check=True)
+
+    # Test: No third party modules imported
+    imported = {name.split('.', 1)[0] for name in loads(result.stdout)}
+    assert 'accelpy' in imported
+    stdlib = getattr(sys, 'stdlib_module_names', None)
+    if stdlib:
+        assert not imported - set(stdlib) - {'accelpy'}
+
+    # Test: Import time budget
+    for line in result.stderr.splitlines():
+        if line.endswith('| accelpy'):
+            cumulative = int(line.split('|')[1])
+            break
+    else:
+        pytest.fail('"import accelpy" not found in "-X importtime" output')
+    assert cumulative < 20000, f'"import accelpy" took {cumulative}us'
+
+    # Test: No file system side effects
+    assert not home_dir.exists()
+    run([sys.executable, '-m', 'accelpy', '--help'], env=env, stdout=PIPE,
+        stderr=PIPE, check=True)
+    assert not home_dir.exists()
+
+    # Test: Public objects imported on access
+    assert accelpy.Host.__module__ == 'accelpy'
+    assert accelpy.iter_hosts.__module__ == 'accelpy'
+    assert accelpy.exceptions.AccelizeException
+    assert 'Host' in dir(accelpy)
+    with pytest.raises(AttributeError):
+        accelpy.not_exists
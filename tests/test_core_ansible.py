@@ -125,3 +125,156 @@ def test_ansible_lint():
 
     if message:
         pytest.fail("\n".join(message), pytrace=False)
+
+
+def import_role_module(role, path='filter_plugins/main.py'):
+    """
+    Import Python module of a role (Filter plugins, modules, ...).
+
+    Args:
+        role (str): Role name.
+        path (str): Module path relative to role directory.
+
+    Returns:
+        module: Python module.
+    """
+    from importlib.util import spec_from_file_location, module_from_spec
+    from os.path import dirname, join, splitext, basename
+    from accelpy._ansible import __file__ as ansible_py_file
+
+    spec = spec_from_file_location(
+        f'{role}_{splitext(basename(path))[0]}',
+        join(dirname(ansible_py_file), 'roles', role, path))
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_container_service_ports_filters():
+    """
+    Test "container_service" role ports filters.
+    """
+    filters = import_role_module('container_service')
+    rules_ports = filters.rules_ports
+    publish_ports = filters.publish_ports
+
+    def rule(start, end, protocol='tcp'):
+        """Firewall rule"""
+        return dict(start_port=start, end_port=end, protocol=protocol,
+                    direction='ingress')
+
+    # Test: Single port
+    assert rules_ports([rule(8080, 8080)]) == [
+        dict(port='8080', redirect='8080', protocol='tcp')]
+    assert publish_ports([rule(8080, 8080)]) == '-p 8080:8080/tcp'
+    assert publish_ports([rule(8080, 8080, 'all')]) == '-p 8080:8080'
+
+    # Test: Range is kept intact
+    assert publish_ports([rule(30000, 40000)]) == \
+        '-p 30000-40000:30000-40000/tcp'
+
+    # Test: Restricted ports redirection
+    assert publish_ports([rule(80, 80)], redirect=True) == '-p 60080:80/tcp'
+    assert publish_ports([rule(80, 80)]) == '-p 80:80/tcp'
+
+    # Test: Range across restricted ports limit is split, with one entry per
+    # redirected port
+    assert rules_ports([rule(1021, 1100)], redirect=True) == [
+        dict(port='1021', redirect='61021', protocol='tcp'),
+        dict(port='1022', redirect='61022', protocol='tcp'),
+        dict(port='1023', redirect='61023', protocol='tcp'),
+        dict(port='1024-1100', redirect='1024-1100', protocol='tcp')]
+    assert rules_ports(
+        [rule(1022, 1100), rule(8080, 8080)], only_restricted=True,
+        redirect=True) == [
+        dict(port='1022', redirect='61022', protocol='tcp'),
+        dict(port='1023', redirect='61023', protocol='tcp')]
+    assert rules_ports([rule(1000, 1100)]) == [
+        dict(port='1000-1023', redirect='1000-1023', protocol='tcp'),
+        dict(port='1024-1100', redirect='1024-1100', protocol='tcp')]
+
+    # Test: Overlapping and contiguous ranges are merged per protocol
+    assert rules_ports([
+        rule(2000, 3000), rule(1500, 2500), rule(3001, 3005),
+        rule(2000, 2000, 'udp')]) == [
+        dict(port='1500-3005', redirect='1500-3005', protocol='tcp'),
+        dict(port='2000', redirect='2000', protocol='udp')]
+
+    # Test: Large ranges are kept as ranges
+    rules = [rule(port, port + 999) for port in range(1024, 65000, 2000)]
+    assert rules_ports(rules) == [
+        dict(port=f'{port}-{port + 999}', redirect=f'{port}-{port + 999}',
+             protocol='tcp') for port in range(1024, 65000, 2000)]
+    assert len(publish_ports(rules).split(' -p ')) == len(rules)
+
+
+def test_container_service_fpga_devices(tmpdir):
+    """
+    Test "container_service" role "fpga_devices" module with a fake sysfs.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from grp import getgrgid
+    from os import getgid, symlink
+
+    fpga_devices = import_role_module(
+        'container_service', 'library/fpga_devices.py')
+    filters = import_role_module('container_service')
+
+    # Mock sysfs and devices: All files are owned by current user group
+    group = getgrgid(getgid()).gr_name
+    sysfs = tmpdir.join('sys')
+    dev = tmpdir.join('dev').ensure(dir=True)
+    pci_bus = sysfs.join('bus/pci/devices').ensure(dir=True)
+
+    def pci_device(slot, vendor, device):
+        """Mock PCI device"""
+        path = sysfs.join('devices/pci0000:00').join(slot).ensure(dir=True)
+        path.join('vendor').write(f'0x{vendor}\n')
+        path.join('device').write(f'0x{device}\n')
+        path.join('resource0').ensure()
+        symlink(str(path), str(pci_bus.join(slot)))
+        return path
+
+    fpga = pci_device('0000:00:1d.0', '1d0f', 'f000')
+    pci_device('0000:00:1e.0', '8086', '1234')
+    dev.join('xdma0_user').ensure()
+    dev.join('dri/renderD128').ensure()
+    dev.join('shm/ignored').ensure()
+
+    kwargs = dict(group=group, dev_root=str(dev), sysfs_root=str(sysfs))
+
+    # Test: Only FPGA vendors PCI devices are listed
+    devices, pci_devices = fpga_devices.list_devices(**kwargs)
+    assert pci_devices == [dict(
+        path=str(fpga), pci_slot='0000:00:1d.0', vendor='1d0f',
+        device='f000')]
+
+    paths = [device['path'] for device in devices]
+    assert str(fpga.join('resource0')) in paths
+    assert str(dev.join('xdma0_user')) in paths
+    assert str(dev.join('dri/renderD128')) in paths
+    assert str(dev.join('shm/ignored')) not in paths
+    assert not any('0000:00:1e.0' in path for path in paths)
+
+    # Test: Filter by vendor and device IDs
+    assert fpga_devices.list_pci_devices(['1d0f:f001'], str(sysfs)) == []
+    assert len(fpga_devices.list_pci_devices(['1D0F:F000'], str(sysfs))) == 1
+    assert len(fpga_devices.list_pci_devices(['8086'], str(sysfs))) == 1
+
+    # Test: Unknown group
+    devices, pci_devices = fpga_devices.list_devices(
+        **dict(kwargs, group='accelpy_not_exists'))
+    assert devices == []
+    assert pci_devices
+
+    # Test: Filter use structured devices directly
+    devices = [dict(path='/dev/xdma0_user'),
+               dict(path='/sys/devices/pci0000:00/0000:00:1d.0/resource0')]
+    args = filters.publish_devices(devices, device=True)
+    assert '--device=/dev/xdma0_user' in args
+    assert '--privileged' not in args
+    assert args == filters.publish_devices(
+        '\n'.join(device['path'] for device in devices), device=True)
+    assert '--privileged' in filters.publish_devices([])
@@ -44,9 +44,48 @@ def mock_application(source_dir, override=None):
     return application
 
 
-def test_application():
+def synthetic_definition(size=300, providers=5):
+    """
+    Generate a large application definition.
+
+    Args:
+        size (int): Number of packages and firewall rules.
+        providers (int): Number of providers overriding each node.
+
+    Returns:
+        dict: Definition.
+    """
+    names = [f'provider_{index}' for index in range(providers)]
+    return {
+        'application': {
+            'product_id': 'my_product_id',
+            'version': '1.0.0',
+            'variables': {'key': 'value'}
+        },
+        'package': [dict(
+            {'type': 'container_image', 'name': f'image_{index}',
+             'version': '1.0.0'},
+            **{name: {'name': f'image_{index}_{name}'} for name in names})
+            for index in range(size)],
+        'firewall_rules': [dict(
+            {'start_port': index, 'end_port': index + 10, 'protocol': 'tcp'},
+            **{name: {'direction': 'egress'} for name in names})
+            for index in range(size)],
+        'fpga': dict(
+            {'image': 'image', 'count': 1},
+            **{name: {'image': ['image_0', 'image_1']} for name in names}),
+        'accelize_drm': {
+            'use_service': False
+        }
+    }
+
+
+def test_application(tmpdir):
     """
     Test common Application features.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
     """
     from json import loads
     from copy import deepcopy
@@ -78,6 +117,15 @@ def test_application():
     # Test: __getitem__
     assert app['application']['product_id'] == 'my_product_id'
 
+    # Test: Provider definitions are created on first access
+    assert not app._provider_definition
+    assert app['provider']['package'][0]['name'] == 'my_container_image'
+    assert app['provider'] is app['another_provider']
+    assert list(app._provider_definition) == [None]
+
+    # Test: Sections without providers values are shared
+    assert app['provider']['package'] is app['package']
+
     # Test: As dict
     assert app.to_dict()['application']['product_id'] == 'my_product_id'
 
@@ -119,8 +167,17 @@ def test_application():
 
             raise ValueError(f'path={path}; method={method}')
 
+        @classmethod
+        def conditional_request(cls, path, *_, etag=None, **kwargs):
+            """Mocked server response"""
+            return cls.request(path, **kwargs), None
+
     accelpy_app.accelize_ws_session = Server
 
+    # Mock definition store
+    app_store_dir = accelpy_app.DEFINITION_STORE_DIR
+    accelpy_app.DEFINITION_STORE_DIR = str(tmpdir.join('store'))
+
     # Test basic mocked server flow
     try:
         # Test: push
@@ -141,6 +198,7 @@ def test_application():
 
     finally:
         accelpy_app.accelize_ws_session = accelpy_app_accelize_ws_session
+        accelpy_app.DEFINITION_STORE_DIR = app_store_dir
 
 
 def test_lint(tmpdir):
@@ -198,6 +256,9 @@ fpga:
     assert app['my_provider']['fpga']['image'] == ['my_fpga_image']
     assert app['package'][0]['type'] == 'container_image'
     assert app['my_provider']['package'][0]['type'] == 'vm_image'
+    assert 'my_provider' not in app['my_provider']['package'][0]
+    assert 'my_provider' not in app[None]['package'][0]
+    assert app['my_provider']['firewall_rules'] is app['firewall_rules']
 
     # Test: save and reload
     app['package'][0]['my_provider']['name'] = 'another_image'
@@ -530,6 +591,383 @@ fpga:
         Application(yml_file)
 
 
+def test_validator_large_definition():
+    """
+    Test validation of large definition.
+
+    Validation speed is measured in "benchmarks".
+    """
+    from copy import deepcopy
+    from accelpy._application import _VALIDATOR
+
+    definitions = [deepcopy(synthetic_definition()) for _ in range(10)]
+
+    for definition in definitions:
+        providers = set()
+        _VALIDATOR(definition, providers)
+
+    # Test: Values are validated and completed
+    assert len(providers) == 5
+    assert definition['fpga']['image'] == ['image']
+    assert definition['firewall_rules'][0]['direction'] == 'ingress'
+    assert definition['package'][0]['repository'] is None
+
+    # Test: Mutable default values are not shared between definitions
+    assert (definitions[0]['accelize_drm']['conf'] is not
+            definitions[1]['accelize_drm']['conf'])
+
+
+def test_to_dict_and_save(tmpdir):
+    """
+    Test definition serialization.
+    """
+    from accelpy._application import Application
+    from accelpy._yaml import yaml_read
+
+    app = Application(synthetic_definition(size=10))
+
+    # Test: Empty and None values are removed, other values are shared
+    definition = app.to_dict()
+    assert 'repository' not in definition['package'][0]
+    assert 'conf' not in definition['accelize_drm']
+    assert definition['accelize_drm']['use_service'] is False
+    assert (definition['application']['variables'] is
+            app['application']['variables'])
+
+    # Test: Empty sections are removed
+    app['accelize_drm']['use_service'] = None
+    assert 'accelize_drm' not in app.to_dict()
+
+    # Test: Save without original file
+    yml_file = tmpdir.join('application.yml')
+    app.save(yml_file, round_trip=None)
+    assert yaml_read(yml_file) == app.to_dict()
+
+
+def test_save_round_trip(tmpdir):
+    """
+    Test saving definition preserving file formatting and comments.
+    """
+    pytest.importorskip('ruamel.yaml')
+    from accelpy._application import Application
+
+    yml_file = tmpdir.join('application.yml')
+    yml_file.write("""# Application
+application:
+  product_id: my_product_id  # Product
+  version: 1.0.0
+
+# Packages
+package:
+  type: container_image
+  name: my_image
+  my_provider:
+    name: my_provider_image  # Provider image
+
+fpga:
+  image: image
+""")
+
+    app = Application(yml_file)
+    app['package'][0]['my_provider']['type'] = 'vm_image'
+    app['package'][0]['my_provider']['name'] = 'ami-123'
+    app['application']['version'] = '1.0.1'
+    app.save(round_trip=True)
+
+    # Test: Changed values are updated, formatting and comments are preserved
+    content = yml_file.read()
+    assert '# Application' in content
+    assert '# Product' in content
+    assert '# Packages' in content
+    assert '# Provider image' in content
+    assert '  image: image\n' in content
+    assert '- type' not in content
+
+    app = Application(yml_file)
+    assert app['my_provider']['package'][0]['name'] == 'ami-123'
+    assert app['my_provider']['package'][0]['type'] == 'vm_image'
+    assert app['package'][0]['name'] == 'my_image'
+    assert app['application']['version'] == '1.0.1'
+
+    # Test: Removed values are removed
+    app['fpga']['image'] = []
+    app.save(round_trip=True)
+    assert 'image: image' not in yml_file.read()
+    assert Application(yml_file)['fpga']['image'] == []
+
+
+def test_definition_cache(tmpdir):
+    """
+    Test validated definition cache.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from os import utime
+    from time import time
+    import accelpy._application as accelpy_app
+    from accelpy._application import Application
+    from accelpy.exceptions import ConfigurationException
+
+    # Mock cache directory
+    cache_dir = tmpdir.join('cache')
+    app_cache_dir = accelpy_app.DEFINITION_CACHE_DIR
+    accelpy_app.DEFINITION_CACHE_DIR = str(cache_dir)
+
+    # Mock validator
+    app_validator = accelpy_app._VALIDATOR
+    validated = []
+
+    def validator(*args):
+        """Count validations"""
+        validated.append(1)
+        return app_validator(*args)
+
+    accelpy_app._VALIDATOR = validator
+
+    source_dir = tmpdir.join('source').ensure(dir=True)
+    application = mock_application(source_dir, override={
+        'fpga': {'image': 'image', 'my_provider': {'image': 'image2'}}})
+
+    try:
+        # Test: First load validate and cache definition
+        app = Application(application)
+        assert len(validated) == 1
+        assert len(cache_dir.listdir()) == 1
+
+        # Test: Second load use cache
+        cached = Application(application)
+        assert len(validated) == 1
+        assert cached._definition == app._definition
+        assert cached.providers == {'my_provider'}
+        assert cached['my_provider']['fpga']['image'] == ['image2']
+
+        # Test: Content change invalidate cache
+        app['fpga']['count'] = 2
+        app.save()
+        assert Application(application)['fpga']['count'] == 2
+        assert len(validated) == 2
+
+        # Test: Invalid cache file is ignored
+        for path in cache_dir.listdir():
+            path.write('invalid')
+        assert Application(application)['fpga']['count'] == 2
+        assert len(validated) == 3
+
+        # Test: Invalid definition is not cached
+        application.write('application: [')
+        with pytest.raises(ConfigurationException):
+            Application(application)
+        assert len(cache_dir.listdir()) == 2
+
+        # Test: Unused entries are pruned when caching a new definition
+        old = cache_dir.listdir()
+        for path in old:
+            utime(path, (0, time() - accelpy_app._DEFINITION_CACHE_TTL - 1))
+        app['fpga']['count'] = 3
+        app.save()
+        assert Application(application)['fpga']['count'] == 3
+        assert len(cache_dir.listdir()) == 1
+        assert not any(path.exists() for path in old)
+
+    finally:
+        accelpy_app._VALIDATOR = app_validator
+        accelpy_app.DEFINITION_CACHE_DIR = app_cache_dir
+
+
+def test_definition_store(tmpdir):
+    """
+    Test definitions from web service local store.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from json import dumps
+    from threading import Thread
+    from urllib.parse import urlparse, parse_qs
+    import accelpy._application as accelpy_app
+    import accelpy._common as common
+    from accelpy._application import Application
+    from accelpy._common import _AccelizeWSSession, json_write
+
+    versions = {'1.0.0': 'image_1'}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        """Local Accelize web service stand-in"""
+
+        def log_message(self, *_):
+            """Disable logging"""
+
+        def _respond(self, status, content=None, headers=None):
+            """Send response"""
+            body = dumps(content).encode() if content is not None else b''
+            self.send_response(status)
+            for key, value in (headers or dict()).items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            """Authentication"""
+            self.rfile.read(int(self.headers['Content-Length']))
+            self._respond(200, dict(access_token='token', expires_in=9999))
+
+        def do_GET(self):
+            """Get definition"""
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            requests.append(self.path)
+            version = params.get('version', [max(versions)])[0]
+            etag = f'"{version}"'
+
+            if self.headers.get('If-None-Match') == etag:
+                return self._respond(304)
+
+            definition = synthetic_definition(size=1, providers=0)
+            definition['application'].update(dict(
+                product_id=params['product_id'][0], version=version,
+                configuration_id=1))
+            definition['fpga']['image'] = versions[version]
+            self._respond(200, dict(results=[definition]), {'ETag': etag})
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    # Mock credentials with endpoint override to local server
+    cred_json = str(tmpdir.join('cred.json'))
+    json_write(dict(client_id='client', client_secret='secret',
+                    endpoint=f'http://127.0.0.1:{server.server_port}'),
+               cred_json)
+    common_get_accelize_cred = common.get_accelize_cred
+    common.get_accelize_cred = lambda *_: cred_json
+
+    # Mock web service session and store
+    app_accelize_ws_session = accelpy_app.accelize_ws_session
+    accelpy_app.accelize_ws_session = _AccelizeWSSession()
+    app_store_dir = accelpy_app.DEFINITION_STORE_DIR
+    accelpy_app.DEFINITION_STORE_DIR = str(tmpdir.join('store'))
+    app_latest_ttl = accelpy_app._LATEST_TTL
+
+    try:
+        # Test: Versioned definition is requested once
+        for _ in range(3):
+            app = Application.from_id('product:1.0.0')
+            assert app['fpga']['image'] == ['image_1']
+            assert app._configuration_id == 1
+        assert len(requests) == 1
+
+        # Test: Latest definition is cached for a short time
+        for _ in range(3):
+            assert Application.from_id(
+                'product')['application']['version'] == '1.0.0'
+        assert len(requests) == 2
+
+        # Test: Latest definition is revalidated once expired
+        accelpy_app._LATEST_TTL = -1
+        assert Application.from_id(
+            'product')['application']['version'] == '1.0.0'
+        assert len(requests) == 3
+
+        # Test: Latest definition updated
+        versions['1.1.0'] = 'image_2'
+        assert Application.from_id('product')['fpga']['image'] == ['image_2']
+        assert len(requests) == 4
+
+        # Test: Latest definition also stored with its version
+        assert Application.from_id(
+            'product:1.1.0')['fpga']['image'] == ['image_2']
+        assert len(requests) == 4
+
+        # Test: Definitions are stored by client ID and endpoint
+        json_write(dict(client_id='other', client_secret='secret',
+                        endpoint=f'http://127.0.0.1:{server.server_port}'),
+                   cred_json)
+        assert Application.from_id(
+            'product:1.1.0')['fpga']['image'] == ['image_2']
+        assert len(requests) == 5
+        assert Application.from_id(
+            'product:1.1.0')['fpga']['image'] == ['image_2']
+        assert len(requests) == 5
+
+        # Test: Store write errors are cache misses
+        store_dir = tmpdir.join('store')
+        store_dir.remove()
+        store_dir.write('')
+        assert Application.from_id(
+            'product:1.1.0')['fpga']['image'] == ['image_2']
+        assert len(requests) == 6
+
+    finally:
+        server.shutdown()
+        server.server_close()
+        common.get_accelize_cred = common_get_accelize_cred
+        accelpy_app.accelize_ws_session = app_accelize_ws_session
+        accelpy_app.DEFINITION_STORE_DIR = app_store_dir
+        accelpy_app._LATEST_TTL = app_latest_ttl
+
+
+def test_list_pagination():
+    """
+    Test paginated listing from web service.
+    """
+    from time import sleep
+    import accelpy._application as accelpy_app
+    from accelpy._application import Application
+
+    pages = 5
+    page_size = 10
+    requested = []
+
+    class Server:
+        """Mocked server"""
+
+        @staticmethod
+        def request(path, params=None, **_):
+            """Mocked paginated server response"""
+            page = int(path.rsplit('=', 1)[1]) if '?page=' in path else 0
+            requested.append(page)
+            next_page = page + 1
+            return dict(
+                results=[f'product_{page * page_size + index}'
+                         for index in range(page_size)],
+                next=(f'https://server/list/?page={next_page}'
+                      if next_page < pages else None))
+
+    accelpy_app_accelize_ws_session = accelpy_app.accelize_ws_session
+    accelpy_app.accelize_ws_session = Server
+
+    try:
+        # Test: All pages are listed
+        products = Application.list()
+        assert len(products) == pages * page_size
+        assert products[-1] == f'product_{pages * page_size - 1}'
+        assert requested == list(range(pages))
+
+        # Test: Pages are requested lazily
+        requested.clear()
+        products = Application.iter_list()
+        assert next(products) == 'product_0'
+        assert requested == [0]
+        products.close()
+
+        # Test: Next page is prefetched
+        requested.clear()
+        versions = Application.iter_versions('product', prefetch=True)
+        assert next(versions) == 'product_0'
+        for _ in range(100):
+            if len(requested) == 2:
+                break
+            sleep(0.01)
+        assert requested == [0, 1]
+        assert len(list(versions)) == pages * page_size - 1
+
+    finally:
+        accelpy_app.accelize_ws_session = accelpy_app_accelize_ws_session
+
+
 @pytest.mark.require_csp
 def test_web_service_integration():
     """
@@ -22,6 +22,7 @@ def test_json_read_write(tmpdir):
     Args:
         tmpdir (py.path.local) tmpdir pytest fixture
     """
+    import accelpy._common as common
     from accelpy._common import json_write, json_read
     from accelpy.exceptions import ConfigurationException
 
@@ -37,6 +38,47 @@ def test_json_read_write(tmpdir):
     with pytest.raises(ConfigurationException):
         json_read(json_file)
 
+    # Test: Atomic write, file mode is preserved, no temporary file remaining
+    json_file.chmod(0o640)
+    json_write(data, json_file, fsync=True)
+    assert json_read(json_file) == data
+    assert json_file.stat().mode & 0o777 == 0o640
+    assert tmpdir.listdir() == [json_file]
+
+    # Test: Original file is unchanged on error
+    with pytest.raises(TypeError):
+        json_write({'key': object()}, json_file)
+    assert json_read(json_file) == data
+    assert tmpdir.listdir() == [json_file]
+
+    # Test: Symbolic link target is updated
+    link = tmpdir.join('link.json')
+    link.mksymlinkto(json_file)
+    json_write({'key': 'link'}, link)
+    assert link.islink()
+    assert json_read(json_file) == {'key': 'link'}
+
+    # Test: Same content with and without fast serializer
+    data = {'key': ['value', 1, 1.5, None, True, 'é/"'], 1: {'big': 2 ** 80}}
+    expected = {'key': ['value', 1, 1.5, None, True, 'é/"'],
+                '1': {'big': 2 ** 80}}
+    json_write(data, json_file)
+    assert json_read(json_file) == expected
+
+    common_json_backend = common._get_json_backend()
+    common._json_backend = (None, None) + common_json_backend[2:]
+    try:
+        assert json_read(json_file) == expected
+        json_write(data, json_file)
+        assert json_read(json_file) == expected
+    finally:
+        common._json_backend = common_json_backend
+
+    # Test: "json" keyword arguments
+    json_write(data, json_file, indent=4)
+    assert json_file.read().startswith('{\n    "key"')
+    assert json_read(json_file, parse_int=str)['key'][1] == '1'
+
 
 def test_yaml_read_write(tmpdir):
     """
@@ -45,6 +87,7 @@ def test_yaml_read_write(tmpdir):
     Args:
         tmpdir (py.path.local) tmpdir pytest fixture
     """
+    from yaml import YAMLError
     from accelpy._yaml import yaml_write, yaml_read
     from accelpy.exceptions import ConfigurationException
 
@@ -60,6 +103,217 @@ def test_yaml_read_write(tmpdir):
     with pytest.raises(ConfigurationException):
         yaml_read(yam_file)
 
+    # Test: Only safe types are written
+    with pytest.raises(YAMLError):
+        yaml_write({'key': object()}, tmpdir.join('unsafe.yml'))
+
+
+def test_yaml_cache(tmpdir):
+    """
+    Test yaml_read cache.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from datetime import date
+    from os import utime
+    import accelpy._yaml as accelpy_yaml
+    from accelpy._yaml import yaml_write, yaml_read
+
+    yaml_file = tmpdir.join('file.yml')
+    yaml_cache_size = accelpy_yaml._CACHE_SIZE
+
+    try:
+        # Test: Cached result is a copy
+        yaml_write({'key': ['value']}, yaml_file)
+        data = yaml_read(yaml_file)
+        assert str(yaml_file) in accelpy_yaml._cache
+        data['key'].append('other')
+        assert yaml_read(yaml_file) == {'key': ['value']}
+        assert yaml_read(yaml_file) is not yaml_read(yaml_file)
+
+        # Test: Modified file is read again
+        yaml_file.write('key: [value, other]')
+        assert yaml_read(yaml_file) == {'key': ['value', 'other']}
+
+        # Test: Same size, but modified time
+        yaml_file.write('key: [value, value]')
+        stat = yaml_file.stat()
+        utime(yaml_file, (stat.atime, stat.mtime + 1))
+        assert yaml_read(yaml_file) == {'key': ['value', 'value']}
+
+        # Test: Content with values that cannot be marshaled
+        yaml_file.write('key: 2020-01-01')
+        assert yaml_read(yaml_file) == {'key': date(2020, 1, 1)}
+        assert yaml_read(yaml_file) == {'key': date(2020, 1, 1)}
+
+        # Test: Cache size is limited
+        accelpy_yaml._CACHE_SIZE = 2
+        for index in range(3):
+            path = tmpdir.join(f'file{index}.yml')
+            path.write(f'key: {index}')
+            assert yaml_read(path) == {'key': index}
+        assert len(accelpy_yaml._cache) == 2
+        assert str(yaml_file) not in accelpy_yaml._cache
+
+    finally:
+        accelpy_yaml._CACHE_SIZE = yaml_cache_size
+        accelpy_yaml._cache.clear()
+
+
+def test_yaml_libyaml_warning(tmpdir):
+    """
+    Test warning if LibYAML is missing.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import yaml
+    import accelpy._yaml as accelpy_yaml
+    from accelpy._yaml import yaml_write
+
+    # Mock PyYAML without LibYAML
+    yaml_c_safe_loader = getattr(yaml, 'CSafeLoader', None)
+    if yaml_c_safe_loader:
+        del yaml.CSafeLoader
+    accelpy_yaml_pyyaml = accelpy_yaml._pyyaml
+    accelpy_yaml._pyyaml = None
+
+    try:
+        with pytest.warns(RuntimeWarning):
+            yaml_write({'key': 'value'}, tmpdir.join('file.yml'))
+        assert accelpy_yaml._pyyaml[2] is yaml.SafeLoader
+
+    finally:
+        if yaml_c_safe_loader:
+            yaml.CSafeLoader = yaml_c_safe_loader
+        accelpy_yaml._pyyaml = accelpy_yaml_pyyaml
+
+
+def test_yaml_backends(tmpdir):
+    """
+    Test YAML backends and cache results. Speed is measured in "benchmarks".
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import yaml
+    import accelpy._yaml as accelpy_yaml
+    from accelpy._yaml import yaml_write, yaml_read
+
+    yaml_file = tmpdir.join('file.yml')
+    yaml_write({f'key{index}': {'values': list(range(10)), 'name': 'value'}
+                for index in range(500)}, yaml_file)
+    content = yaml_file.read_binary()
+
+    backends = [yaml.SafeLoader]
+    if yaml.__with_libyaml__:
+        backends.append(yaml.CSafeLoader)
+
+    # Mock cache metrics
+    results = []
+    accelpy_yaml_count_cache = accelpy_yaml._count_cache
+    accelpy_yaml._count_cache = lambda _, result: results.append(result)
+
+    try:
+        # Test: All backends parse the same content
+        accelpy_yaml._cache.clear()
+        expected = yaml_read(yaml_file)
+        for loader in backends:
+            assert yaml.load(content, Loader=loader) == expected
+
+        # Test: Cached read returns the same content
+        assert yaml_read(yaml_file) == expected
+        assert results == ['miss', 'hit']
+
+        # Test: Cache is invalidated on write
+        expected['key0']['name'] = 'other'
+        yaml_write(expected, yaml_file)
+        assert yaml_read(yaml_file) == expected
+        assert results == ['miss', 'hit', 'miss']
+
+    finally:
+        accelpy_yaml._count_cache = accelpy_yaml_count_cache
+        accelpy_yaml._cache.clear()
+
+
+def test_yaml_libyaml_warning(tmpdir):
+    """
+    Test warning if LibYAML is missing.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import yaml
+    import accelpy._yaml as accelpy_yaml
+    from accelpy._yaml import yaml_write
+
+    # Mock PyYAML without LibYAML
+    yaml_c_safe_loader = getattr(yaml, 'CSafeLoader', None)
+    if yaml_c_safe_loader:
+        del yaml.CSafeLoader
+    accelpy_yaml_pyyaml = accelpy_yaml._pyyaml
+    accelpy_yaml._pyyaml = None
+
+    try:
+        with pytest.warns(RuntimeWarning):
+            yaml_write({'key': 'value'}, tmpdir.join('file.yml'))
+        assert accelpy_yaml._pyyaml[2] is yaml.SafeLoader
+
+    finally:
+        if yaml_c_safe_loader:
+            yaml.CSafeLoader = yaml_c_safe_loader
+        accelpy_yaml._pyyaml = accelpy_yaml_pyyaml
+
+
+def test_yaml_performance(tmpdir):
+    """
+    Benchmark YAML backends and cache.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from time import perf_counter
+    import yaml
+    import accelpy._yaml as accelpy_yaml
+    from accelpy._yaml import yaml_write, yaml_read
+
+    yaml_file = tmpdir.join('file.yml')
+    yaml_write({f'key{index}': {'values': list(range(10)), 'name': 'value'}
+                for index in range(500)}, yaml_file)
+    content = yaml_file.read_binary()
+
+    def benchmark(func, *args, **kwargs):
+        """Return best time of some runs"""
+        timings = []
+        for _ in range(3):
+            start = perf_counter()
+            func(*args, **kwargs)
+            timings.append(perf_counter() - start)
+        return min(timings)
+
+    backends = [yaml.SafeLoader]
+    if yaml.__with_libyaml__:
+        backends.append(yaml.CSafeLoader)
+
+    try:
+        # Test: All backends parse the same content
+        expected = yaml_read(yaml_file)
+        parse_timings = []
+        for loader in backends:
+            assert yaml.load(content, Loader=loader) == expected
+            parse_timings.append(benchmark(yaml.load, content, Loader=loader))
+
+        # Test: LibYAML is faster
+        if len(parse_timings) > 1:
+            assert parse_timings[1] < parse_timings[0]
+
+        # Test: Cached read is faster than parsing with any backend
+        assert benchmark(yaml_read, yaml_file) < min(parse_timings)
+
+    finally:
+        accelpy_yaml._cache.clear()
+
 
 def test_get_python_package_entry_point(tmpdir):
     """
@@ -301,6 +555,165 @@ def test_accelize_ws_session(tmpdir):
         del environ['ACCELPY_CLI']
 
 
+def test_accelize_ws_session_concurrency(tmpdir):
+    """
+    Test Accelize Web Service session shared between threads.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from json import dumps
+    from os import environ
+    from threading import Thread
+    from time import sleep, time
+    import accelpy._common as common
+    from accelpy._common import (
+        _AccelizeWSSession, json_write, get_cli_cache, set_cli_cache)
+    from accelpy.exceptions import WebServerException
+
+    tokens = []
+    paths = []
+
+    class Handler(BaseHTTPRequestHandler):
+        """Local Accelize web service stand-in"""
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *_):
+            """Disable logging"""
+
+        def _respond(self, status, content):
+            """Send response"""
+            body = dumps(content).encode()
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            """Authentication"""
+            self.rfile.read(int(self.headers['Content-Length']))
+            sleep(0.05)
+            tokens.append(f'token{len(tokens)}')
+            self._respond(200, dict(access_token=tokens[-1], expires_in=9999))
+
+        def do_GET(self):
+            """Get object"""
+            # First token is rejected
+            if self.headers['Authorization'] == 'Bearer token0':
+                return self._respond(401, dict(detail='Invalid token'))
+
+            paths.append(self.path)
+            self._respond(200, dict(path=self.path))
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    # Mock credentials with endpoint override to local server
+    cred_json = str(tmpdir.join('cred.json'))
+    json_write(dict(client_id='client', client_secret='secret',
+                    endpoint=f'http://127.0.0.1:{server.server_port}'),
+               cred_json)
+    common_get_accelize_cred = common.get_accelize_cred
+    common.get_accelize_cred = lambda *_: cred_json
+
+    # Mock cache
+    common_cache_dir = common.CACHE_DIR
+    cache_dir = tmpdir.join('cache').ensure(dir=True)
+    common.CACHE_DIR = str(cache_dir)
+
+    try:
+        session = _AccelizeWSSession(pool_size=4)
+        objects = [f'/auth/objects/object/{index}/' for index in range(20)]
+
+        # Test: Batch request returns responses in order
+        assert session.batch_request(objects) == [
+            dict(path=path) for path in objects]
+        assert sorted(paths) == sorted(objects)
+
+        # Test: Token is requested by a single thread, and rejected token is
+        # renewed only once
+        assert tokens == ['token0', 'token1']
+
+        # Test: Connection pool size
+        assert session._session.get_adapter(
+            'http://').poolmanager.connection_pool_kw['maxsize'] == 4
+
+        # Test: Small batches
+        assert session.batch_request([]) == []
+        assert session.batch_request(objects[:1]) == [dict(path=objects[0])]
+
+        # Test: Absolute URLs are only accepted on the web service endpoint
+        endpoint = f'http://127.0.0.1:{server.server_port}'
+        assert session.request(endpoint + objects[0]) == dict(path=objects[0])
+        count = len(paths)
+        for url in (f'http://127.0.0.2:{server.server_port}{objects[0]}',
+                    f'{endpoint}.example.com{objects[0]}',
+                    f'https://127.0.0.1:{server.server_port}{objects[0]}'):
+            with pytest.raises(WebServerException):
+                session.request(url)
+        assert len(paths) == count
+
+        # Test: Token is refreshed in background before expiry
+        assert session._token_refresh < session._token_expire
+        environ['ACCELPY_CLI'] = 'True'
+        session._token_refresh = time() - 1
+        assert session.request(objects[0]) == dict(path=objects[0])
+        for _ in range(100):
+            if session._token != 'token1':
+                break
+            sleep(0.05)
+        assert session._token == 'token2'
+        assert session._token_refresh > time()
+        assert not session._refreshing
+
+        # Test: Refreshed token is written back to CLI cache
+        # The token cache keeps the format of previous versions
+        cache_files = cache_dir.listdir()
+        assert len(cache_files) == 2
+        token, expire = get_cli_cache('client')
+        assert token == 'token2'
+        assert get_cli_cache('token_refresh|client') == [
+            expire, session._token_refresh]
+
+        # Test: Token from another accelpy instance CLI cache
+        expire = int(time()) + 99
+        set_cli_cache('client', ['token3', expire], expire)
+        set_cli_cache('token_refresh|client', [expire, expire - 49], expire)
+        session._token_refresh = time() - 1
+        session._authenticate()
+        for _ in range(100):
+            if session._token != 'token2':
+                break
+            sleep(0.05)
+        assert session._token == 'token3'
+        assert session._token_refresh == expire - 49
+        assert tokens == ['token0', 'token1', 'token2']
+
+        # Test: Refresh errors do not disable next refreshes
+        get_token = session._get_token
+
+        def _get_token(refresh=False):
+            """Simulate invalid credentials file"""
+            raise KeyError('client_id')
+
+        session._get_token = _get_token
+        try:
+            session._refresh_token()
+        finally:
+            session._get_token = get_token
+        assert not session._refreshing
+        assert session._token_refresh == session._token_expire
+
+    finally:
+        server.shutdown()
+        server.server_close()
+        common.get_accelize_cred = common_get_accelize_cred
+        common.CACHE_DIR = common_cache_dir
+        environ.pop('ACCELPY_CLI', None)
+
+
 def test_color_str():
     """
     Test color_str
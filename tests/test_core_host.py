@@ -163,6 +163,12 @@ def test_host(tmpdir):
             assert Application(
                 application_yaml)[provider]['package'][0]['name'] == artifact
 
+        # Test: Application update requires a provider
+        with Host(application=application, user_config=source_dir,
+                  keep_config=False) as host:
+            with pytest.raises(ConfigurationException):
+                host.build(quiet=True, update_application=True)
+
         # Test: Missing Accelize DRM configuration
         application = mock_application(
             source_dir, override={'accelize_drm': {'use_service': True}})
@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Ansible dynamic inventory tests"""
+
+
+def test_inventory(tmpdir):
+    """
+    Test Ansible dynamic inventory generation.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from argparse import Namespace
+    from json import loads
+    from os import symlink
+    from os.path import dirname, join, realpath
+    import accelpy._common as common
+    import accelpy._host as accelpy_host
+    from accelpy._common import json_write
+    from accelpy._yaml import yaml_write
+    from accelpy._inventory import get_host_variables, get_inventory
+    from accelpy.__main__ import _action_inventory
+    from tests.test_core_ssh import mock_applied_host
+
+    # Mock config dir
+    common_home_dir = common.HOME_DIR
+    common.HOME_DIR = str(tmpdir.join('home'))
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('home/hosts').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    application = join(dirname(realpath(__file__)), 'host_mock.yml')
+
+    for name, provider in (('host_1', 'aws,eu-west-1,f1'),
+                           ('host_2', 'aws,us-east-1,f1'),
+                           ('host_3', 'testing')):
+        mock_applied_host(config_dir, name)
+        host_dir = config_dir.join(name)
+        json_write(dict(provider=provider, user_config='user_config'),
+                   host_dir.join('user_parameters.json'))
+        symlink(application, host_dir.join('application.yml'))
+        yaml_write([dict(hosts='all', vars=dict(fpga_slots=[0]))],
+                   host_dir.join('playbook.yml'))
+    config_dir.join('not_applied').ensure(dir=True)
+
+    try:
+        # Test: Groups
+        inventory = get_inventory()
+        hostvars = inventory['_meta']['hostvars']
+        assert sorted(hostvars) == ['host_1', 'host_2', 'host_3']
+        assert inventory['provider_aws']['children'] == [
+            'provider_aws_eu_west_1', 'provider_aws_us_east_1']
+        assert inventory['provider_aws_eu_west_1']['children'] == [
+            'provider_aws_eu_west_1_f1']
+        assert inventory['provider_aws_eu_west_1_f1']['hosts'] == ['host_1']
+        assert inventory['provider_testing']['hosts'] == ['host_3']
+        assert inventory['application_existing_host_test']['hosts'] == [
+            'host_1', 'host_2', 'host_3']
+        assert inventory['type_container_service']['hosts'] == [
+            'host_1', 'host_2', 'host_3']
+
+        # Test: Hosts variables
+        variables = hostvars['host_1']
+        assert variables['ansible_host'] == '127.0.0.1'
+        assert variables['ansible_user'] == 'user'
+        assert variables['ansible_ssh_private_key_file'] == str(
+            config_dir.join('host_1/ssh_private.pem'))
+        assert f'-o ControlPath={config_dir}/host_1/ssh-%h' in \
+            variables['ansible_ssh_common_args']
+        assert variables['accelpy_provider'] == 'aws,eu-west-1,f1'
+        assert variables['accelpy_user_config'] == 'user_config'
+        assert variables['accelpy_application'] == 'existing_host_test'
+        assert variables['accelpy_application_version'] == '1.0.0'
+        assert variables['fpga_slots'] == [0]
+
+        # Test: Selected hosts, private IP and single host
+        inventory = get_inventory('host_2', private_ip=True)
+        assert list(inventory['_meta']['hostvars']) == ['host_2']
+        assert 'provider_testing' not in inventory
+        assert get_host_variables('host_3')['accelpy_provider'] == 'testing'
+        assert get_host_variables('not_applied') == dict()
+        assert get_inventory('not_exists*') == dict(_meta=dict(hostvars=dict()))
+
+        # Test: Command line
+        def cli_inventory(host=None, private_ip=False):
+            """Run "accelpy inventory" and return outputs"""
+            return loads(_action_inventory(Namespace(
+                list=host is None, host=host, hosts='all',
+                private_ip=private_ip)))
+
+        assert cli_inventory()['provider_testing']['hosts'] == ['host_3']
+        assert cli_inventory('host_1', True)['ansible_host'] == '10.0.0.1'
+
+    finally:
+        common.HOME_DIR = common_home_dir
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
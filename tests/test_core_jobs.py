@@ -0,0 +1,188 @@
+# coding=utf-8
+"""Persistent jobs queue tests"""
+import pytest
+
+
+def test_job_queue(tmpdir):
+    """
+    Test jobs queue.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from socket import gethostname
+    from subprocess import Popen
+    from sys import executable
+    from threading import Thread, Event
+    from time import sleep
+    from accelpy._common import call
+    from accelpy._jobs import JobQueue
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    path = tmpdir.join('jobs.sqlite')
+    queue = JobQueue(path, lease=0.2, max_attempts=2)
+
+    # Test: Submit jobs
+    with pytest.raises(ConfigurationException):
+        queue.submit('not_exists', 'host')
+    with pytest.raises(ConfigurationException):
+        queue.submit('plan')
+    with pytest.raises(ConfigurationException):
+        queue.submit('init', 'host', keep_config=False)
+    with pytest.raises(KeyError):
+        queue.get('not_exists')
+
+    init = queue.submit('init', application='app')
+    assert init['name'] and init['status'] == 'pending'
+    assert init['kwargs'] == dict(application='app')
+    plan = queue.submit('plan', 'host')
+    apply = queue.submit('apply', 'host', quiet=True)
+    assert queue.get(apply['id']) == apply
+    assert [job['id'] for job in queue.list()] == [
+        apply['id'], plan['id'], init['id']]
+    assert [job['id'] for job in queue.list(name='host', limit=1)] == [
+        apply['id']]
+
+    # Test: Jobs on the same host are claimed sequentially, in order
+    job = queue.claim('worker1')
+    assert job['id'] == init['id'] and job['status'] == 'running'
+    assert job['attempts'] == 1 and job['worker'] == 'worker1'
+    job = queue.claim('worker1')
+    assert job['id'] == plan['id']
+    assert queue.claim('worker2') is None
+
+    # Test: Complete jobs
+    assert queue.complete(init['id'], 'worker1', 'name')
+    assert queue.get(init['id'])['result'] == 'name'
+    assert queue.get(init['id'])['ended']
+    assert not queue.complete(init['id'], 'worker1', 'name')
+    assert not queue.renew(plan['id'], 'worker2')
+    assert queue.renew(plan['id'], 'worker1')
+
+    # Test: Expired lease: Job is retried, then failed
+    sleep(0.3)
+    job = queue.claim('worker2')
+    assert job['id'] == plan['id'] and job['attempts'] == 2
+    assert not queue.complete(plan['id'], 'worker1', 'plan')
+    sleep(0.3)
+    assert queue.claim('worker2')['id'] == apply['id']
+    job = queue.get(plan['id'])
+    assert job['status'] == 'failed'
+    assert job['error_type'] == 'RuntimeException'
+    assert queue.fail(apply['id'], 'worker2', RuntimeException('error'))
+    job = queue.get(apply['id'])
+    assert job['status'] == 'failed' and job['error'] == 'error'
+
+    # Test: Recover jobs of stopped workers
+    process = Popen([executable, '-c', 'pass'])
+    process.wait()
+    queue = JobQueue(path, lease=60, max_attempts=2)
+    job = queue.submit('destroy', 'host')
+    worker = f'{gethostname()}:{process.pid}:1'
+    assert queue.claim(worker)['id'] == job['id']
+    assert queue.recover() == 1
+    assert queue.get(job['id'])['status'] == 'pending'
+
+    # Test: Queue persistence
+    assert JobQueue(path).get(job['id'])['status'] == 'pending'
+
+    # Test: Workers, with outputs capture
+    def run(job_to_run):
+        """Run job"""
+        if job_to_run['action'] == 'build':
+            raise RuntimeException('Build error')
+        call([executable, '-c', 'print("stdout")'])
+        call([executable, '-c', 'print("piped")'], pipe_stdout=True)
+        return job_to_run['name']
+
+    stop = Event()
+    thread = Thread(target=queue.work, kwargs=dict(run=run, stop=stop))
+    thread.start()
+    try:
+        job = queue.wait(job['id'], timeout=10)
+        assert job['status'] == 'succeeded' and job['result'] == 'host'
+        assert job['worker'].startswith(f'{gethostname()}:')
+        assert job['output'] == str(tmpdir.join('jobs', f'{job["id"]}.log'))
+        output = tmpdir.join('jobs', f'{job["id"]}.log').read()
+        assert 'stdout\n' in output and 'piped\n' in output
+        assert output.startswith(f'$ {executable} -c')
+
+        job = queue.wait(queue.submit('build', 'host')['id'], timeout=10)
+        assert job['status'] == 'failed' and job['error'] == 'Build error'
+
+        job = queue.submit('plan', 'host')
+        assert queue.wait(job['id'], timeout=0.01)['status'] in (
+            'pending', 'running', 'succeeded')
+    finally:
+        stop.set()
+        thread.join()
+
+    # Test: Prune completed jobs
+    count = len(queue.list())
+    assert queue.prune(keep=1) == count - 1
+    assert len(queue.list()) == 1
+
+
+def test_run_host_action(tmpdir):
+    """
+    Test host actions run from jobs.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._jobs as accelpy_jobs
+    from accelpy._jobs import run_host_action
+
+    calls = []
+
+    class Host:
+        """Mocked Host"""
+
+        def __init__(self, name=None, **kwargs):
+            calls.append(('init', kwargs))
+            self.name = name
+
+        def apply(self, quiet=False):
+            """Apply"""
+            calls.append(('apply', quiet))
+
+        def destroy(self, quiet=False, delete=None):
+            """Destroy"""
+            calls.append(('destroy', delete))
+
+        def _clean_up(self):
+            """Clean up"""
+            calls.append(('clean_up', None))
+
+    def job(action, attempts=1, **kwargs):
+        """Job"""
+        return dict(action=action, name='host', attempts=attempts,
+                    kwargs=kwargs)
+
+    jobs_host = accelpy_jobs.Host
+    jobs_config_dir = accelpy_jobs.CONFIG_DIR
+    accelpy_jobs.Host = Host
+    accelpy_jobs.CONFIG_DIR = str(tmpdir)
+    try:
+        # Test: Hosts are kept in memory
+        hosts = dict()
+        assert run_host_action(job('init', application='app'), hosts) == 'host'
+        run_host_action(job('apply'), hosts)
+        assert calls == [('init', dict(application='app')), ('apply', True)]
+        run_host_action(job('destroy', delete=True), hosts)
+        assert not hosts
+        assert calls[-2:] == [('destroy', True), ('clean_up', None)]
+
+        # Test: Partial configuration removed on "init" retry
+        tmpdir.join('host').ensure(dir=True)
+        run_host_action(job('init', attempts=2))
+        assert not tmpdir.join('host').exists()
+
+        # Test: Configuration with a Terraform state is kept
+        tmpdir.join('host', 'terraform.tfstate').ensure()
+        run_host_action(job('init', attempts=2))
+        assert tmpdir.join('host').exists()
+
+    finally:
+        accelpy_jobs.Host = jobs_host
+        accelpy_jobs.CONFIG_DIR = jobs_config_dir
@@ -200,6 +200,7 @@ def test_command_line_autocomplete(tmpdir):
     import accelpy._common as common
     from accelpy.exceptions import AuthenticationException
     import accelpy._application as accelpy_app
+    import accelpy.__main__ as accelpy_main
     from accelpy.__main__ import (
         _completer_warn, _application_completer, _provider_completer,
         _yaml_completer)
@@ -219,7 +220,7 @@ def test_command_line_autocomplete(tmpdir):
         """Mocked Application"""
 
         @staticmethod
-        def list(prefix=''):
+        def iter_list(prefix='', **_):
             """
             List applications
 
@@ -227,14 +228,15 @@ def test_command_line_autocomplete(tmpdir):
                 prefix (str): prefix
 
             Returns:
-                list of str: applications
+                generator of str: applications
             """
             if server_raises:
                 raise AuthenticationException('Error')
-            return [value for value in server_apps if value.startswith(prefix)]
+            yield from (value for value in server_apps
+                        if value.startswith(prefix))
 
         @staticmethod
-        def list_versions(product_id, prefix=''):
+        def iter_versions(product_id, prefix='', **_):
             """
             List versions.
 
@@ -243,10 +245,10 @@ def test_command_line_autocomplete(tmpdir):
                 prefix (str): prefix
 
             Returns:
-                list of str: version
+                generator of str: version
             """
-            return [value for value in server_versions if
-                    value.startswith(prefix)]
+            yield from (value for value in server_versions if
+                        value.startswith(prefix))
 
     accelpy_application_application = accelpy_app.Application
     accelpy_app.Application = Application
@@ -315,6 +317,22 @@ def test_command_line_autocomplete(tmpdir):
             'accelize.com/accelpy/test:2.', Namespace())) == [
             'accelize.com/accelpy/test:2.0.0']
 
+        # Test Application completer stop once enough values
+        main_completion_limit = accelpy_main._COMPLETION_LIMIT
+        accelpy_main._COMPLETION_LIMIT = 1
+        try:
+            assert list(_application_completer(
+                'accelize.com/accelpy/ci:1', Namespace())) == [
+                'accelize.com/accelpy/ci:1.0.0']
+        finally:
+            accelpy_main._COMPLETION_LIMIT = main_completion_limit
+
+        # Test Application completer incomplete values are not cached
+        assert list(_application_completer(
+            'accelize.com/accelpy/ci:1', Namespace())) == [
+            'accelize.com/accelpy/ci:1.0.0',
+            'accelize.com/accelpy/ci:1.1.1']
+
         # Test application warning
         server_raises = True
         assert _application_completer('', Namespace()) is None
@@ -341,3 +359,77 @@ def test_command_line_autocomplete(tmpdir):
         common.CACHE_DIR = common_cache_dir
         chdir(cwd)
         del environ['ACCELPY_CLI']
+
+
+def test_command_line_lint(tmpdir, capsys):
+    """
+    Tests the command line lint of multiples files.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+        capsys (_pytest.capture.CaptureFixture) capsys pytest fixture
+    """
+    from argparse import Namespace
+    from json import loads
+    from xml.etree.ElementTree import fromstring
+    import pytest
+    from accelpy.__main__ import _action_lint
+    from accelpy.exceptions import ConfigurationException
+    from tests.test_core_application import mock_application
+
+    # Mock definitions
+    valid = []
+    for index in range(10):
+        valid.append(str(mock_application(
+            tmpdir.join(f'apps/app_{index}').ensure(dir=True))))
+    invalid = tmpdir.join('apps/invalid.yml')
+    invalid.write('application: [')
+    invalid = str(invalid)
+    tmpdir.join('apps/not_yaml.txt').write('not yaml')
+
+    def lint(*files, report_format='text', jobs=2):
+        """Lint and return output"""
+        _action_lint(Namespace(file=[str(file) for file in files],
+                               format=report_format, jobs=jobs))
+        return capsys.readouterr().out
+
+    # Test: Single valid file
+    assert not lint(valid[0])
+
+    # Test: Multiple valid files
+    assert not lint(*valid)
+
+    # Test: Glob pattern
+    assert not lint(tmpdir.join('apps/app_*/*.yml'))
+
+    # Test: Directory with invalid file
+    with pytest.raises(ConfigurationException):
+        lint(tmpdir.join('apps'))
+    output = capsys.readouterr().out
+    assert invalid in output
+    assert valid[0] not in output
+
+    # Test: JSON report
+    with pytest.raises(ConfigurationException):
+        lint(tmpdir.join('apps'), report_format='json')
+    report = {item['file']: item for item in loads(capsys.readouterr().out)}
+    assert len(report) == len(valid) + 1
+    assert report[valid[0]]['valid']
+    assert not report[invalid]['valid']
+    assert report[invalid]['error']
+
+    # Test: JUnit report
+    with pytest.raises(ConfigurationException):
+        lint(tmpdir.join('apps'), report_format='junit')
+    suite = fromstring(capsys.readouterr().out)
+    assert suite.get('tests') == str(len(valid) + 1)
+    assert suite.get('failures') == '1'
+
+    # Test: Not existing file
+    with pytest.raises(ConfigurationException):
+        lint(tmpdir.join('not_exists.yml'))
+    assert 'not_exists.yml' in capsys.readouterr().out
+
+    # Test: No file found
+    with pytest.raises(ConfigurationException):
+        lint(tmpdir.join('not_exists/*.yml'))
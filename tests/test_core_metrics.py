@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Prometheus metrics tests"""
+import pytest
+
+
+def test_metrics(tmpdir):
+    """
+    Test metrics.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from os import stat
+    from urllib.request import urlopen
+    from accelpy._metrics import (
+        observe_operation, observe_call, count_cache, generate_latest,
+        write_textfile, start_http_server, _parse)
+    from accelpy.exceptions import RuntimeException
+
+    # Clear metrics from other tests
+    generate_latest(clear=True)
+
+    try:
+        # Test: Host operations
+        with observe_operation('apply', 'aws,eu-west-1,f1'):
+            pass
+        with pytest.raises(RuntimeException):
+            with observe_operation('apply', 'aws,eu-west-1,f1'):
+                raise RuntimeException()
+
+        # Test: Subprocesses calls
+        observe_call(['/usr/bin/terraform', 'init'], 0.2, 2, 0)
+        observe_call(['/usr/bin/python3', '/bin/ansible-galaxy'], 1.5, 0, 1)
+
+        # Test: Caches
+        count_cache('cli', 'hit')
+        count_cache('cli', 'hit')
+        count_cache('cli', 'miss')
+
+        text = generate_latest()
+        lines = text.splitlines()
+        assert '# TYPE accelpy_host_operation_duration_seconds histogram' in \
+            lines
+        assert 'accelpy_host_operation_duration_seconds_count{operation=' \
+            '"apply",provider="aws,eu-west-1,f1",status="success"} 1' in lines
+        assert 'accelpy_host_operation_errors_total{operation="apply",' \
+            'provider="aws,eu-west-1,f1",error="RuntimeException"} 1' in lines
+        assert 'accelpy_call_duration_seconds_bucket{tool="terraform",' \
+            'status="success",le="0.1"} 0' in lines
+        assert 'accelpy_call_duration_seconds_bucket{tool="terraform",' \
+            'status="success",le="0.5"} 1' in lines
+        assert 'accelpy_call_duration_seconds_bucket{tool="ansible-galaxy",' \
+            'status="failure",le="+Inf"} 1' in lines
+        assert 'accelpy_call_duration_seconds_sum{tool="ansible-galaxy",' \
+            'status="failure"} 1.5' in lines
+        assert 'accelpy_call_retries_total{tool="terraform"} 2' in lines
+        assert 'accelpy_cache_requests_total{cache="cli",result="hit"} 2' in \
+            lines
+
+        # Test: HTTP endpoint
+        server = start_http_server('127.0.0.1:0')
+        try:
+            url = f'http://127.0.0.1:{server.server_port}'
+            with urlopen(f'{url}/metrics') as response:
+                assert response.read().decode() == text
+                assert response.headers['Content-Type'].startswith(
+                    'text/plain')
+            with pytest.raises(OSError):
+                urlopen(f'{url}/not_exists')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Test: Textfile is updated and metrics cleared
+        textfile = tmpdir.join('accelpy.prom')
+        write_textfile(textfile)
+        assert generate_latest() == ''
+        assert textfile.read() == text
+        assert stat(textfile).st_mode & 0o777 == 0o644
+
+        count_cache('cli', 'hit')
+        count_cache('yaml', 'miss')
+        write_textfile(textfile)
+        families = _parse(textfile.read())
+        samples = families['accelpy_cache_requests_total'][2]
+        assert samples['accelpy_cache_requests_total{cache="cli",'
+                       'result="hit"}'] == 3
+        assert samples['accelpy_cache_requests_total{cache="yaml",'
+                       'result="miss"}'] == 1
+        assert families['accelpy_call_retries_total'][:2] == [
+            'counter', 'Utilities subprocesses retries on error.']
+
+    finally:
+        generate_latest(clear=True)
@@ -0,0 +1,95 @@
+# coding=utf-8
+"""Command profiling tests"""
+
+
+def test_profiler(tmpdir):
+    """
+    Test profiler.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from io import StringIO
+    from json import load
+    from pstats import Stats
+    from sys import executable
+    import accelpy._tracing as tracing
+    from accelpy._common import call, propagate_context
+    from accelpy._profile import Profiler
+    from accelpy._tracing import span, set_exporters
+
+    exporters = tracing._exporters
+    set_exporters()
+    path = str(tmpdir.join('profile'))
+    summary = StringIO()
+
+    def in_thread():
+        """Function run in another thread"""
+        return sum(range(1000))
+
+    try:
+        with Profiler(path, 'accelpy init', file=summary):
+            with span('host.create_config'):
+                call([executable, '-c', 'pass'])
+                with ThreadPoolExecutor() as executor:
+                    executor.submit(propagate_context(call), [
+                        executable, '-c', 'import time; time.sleep(0.1)'])
+                    executor.submit(in_thread).result()
+
+        # Test: Tracing exporters restored
+        assert tracing._exporters == []
+
+    finally:
+        tracing._exporters = exporters
+
+    # Test: pstats report, including threads
+    functions = {name for _, _, name in Stats(f'{path}.pstats').stats}
+    assert 'call' in functions
+    assert 'in_thread' in functions
+
+    # Test: JSON report
+    with open(f'{path}.json') as file:
+        report = load(file)
+    assert report['command'] == 'accelpy init'
+    assert report['wall_time'] >= report['subprocesses_time'] > 0.1
+    assert report['python_time'] >= 0
+    assert len(report['subprocesses']) == 2
+    assert report['subprocesses'][0]['argv'] == [executable, '-c', 'pass']
+    assert report['subprocesses'][0]['returncode'] == 0
+    names = [item['name'] for item in report['timeline']]
+    assert names[0] == 'host.create_config' and names.count('call') == 2
+    assert report['timeline'][0]['start'] >= 0
+    assert report['functions'][0]['cumulative_time'] >= \
+        report['functions'][-1]['cumulative_time']
+
+    # Test: Summary
+    lines = summary.getvalue().splitlines()
+    assert lines[0].startswith('Profile of "accelpy init"')
+    assert 'Slowest subprocesses:' in lines
+    assert '-c import time' in lines[
+        lines.index('Slowest subprocesses:') + 1]
+    assert lines[-1] == f'Reports: "{path}.pstats", "{path}.json"'
+
+
+def test_profile_argv():
+    """
+    Test "--profile" command line argument handling.
+    """
+    from accelpy.__main__ import _profile_argv
+
+    actions = ('exec', 'lint', 'plan')
+
+    # Test: Without value, before the command
+    assert _profile_argv(['--profile', 'plan'], actions) == [
+        '--profile=', 'plan']
+
+    # Test: With value
+    assert _profile_argv(['--profile', 'out', 'lint', 'file'], actions) == [
+        '--profile', 'out', 'lint', 'file']
+    assert _profile_argv(['--profile=out', 'plan'], actions) == [
+        '--profile=out', 'plan']
+
+    # Test: Commands arguments are not changed
+    argv = ['exec', '--', 'echo', '--profile', 'plan']
+    assert _profile_argv(argv, actions) == argv
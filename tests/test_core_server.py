@@ -0,0 +1,255 @@
+# coding=utf-8
+"""Provisioning server tests"""
+import pytest
+
+
+def test_server(tmpdir):
+    """
+    Test provisioning server and client.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from argparse import Namespace
+    from threading import Thread, Lock
+    from time import sleep
+    import accelpy._server as accelpy_server
+    import accelpy._jobs as accelpy_jobs
+    import accelpy._common as common
+    import accelpy.__main__ as accelpy_main
+    from accelpy._server import Server, Client
+    from accelpy._jobs import JobQueue
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    hosts_dir = tmpdir.join('hosts').ensure(dir=True)
+    running = []
+    running_max = []
+    running_lock = Lock()
+    created = []
+
+    class Host:
+        """Mocked Host"""
+
+        def __init__(self, name=None, application=None, **_):
+            if not hosts_dir.join(name).isdir():
+                if not application:
+                    raise ConfigurationException('No configuration.')
+                hosts_dir.join(name).ensure(dir=True)
+            created.append(name)
+            self.name = name
+            self.applied = False
+            self.deleted = False
+
+        @staticmethod
+        def _run():
+            """Simulate a long running action"""
+            with running_lock:
+                running.append(None)
+                running_max.append(len(running))
+            sleep(0.05)
+            with running_lock:
+                running.pop()
+
+        def plan(self):
+            """Plan"""
+            self._run()
+            return f'plan {self.name}'
+
+        def apply(self, quiet=False):
+            """Apply"""
+            assert quiet
+            self._run()
+            self.applied = True
+
+        def build(self, quiet=False, update_application=False):
+            """Build"""
+            if update_application:
+                raise RuntimeException('Build error')
+            return 'image'
+
+        def destroy(self, quiet=False, delete=None):
+            """Destroy"""
+            self.applied = False
+            self.deleted = delete
+
+        def _clean_up(self):
+            """Clean up"""
+            if self.deleted:
+                hosts_dir.join(self.name).remove()
+
+        @property
+        def public_ip(self):
+            """Public IP"""
+            if not self.applied:
+                raise ConfigurationException('Configuration not applied.')
+            return '127.0.0.1'
+
+        ssh_private_key = ssh_user = private_ip = public_ip
+
+    # Mock host and configuration directory
+    server_host = accelpy_server.Host
+    jobs_host = accelpy_jobs.Host
+    server_iter_hosts_names = accelpy_server._iter_hosts_names
+    common_home_dir = common.HOME_DIR
+    accelpy_server.Host = Host
+    accelpy_jobs.Host = Host
+    accelpy_server._iter_hosts_names = lambda: (
+        path.basename for path in hosts_dir.listdir())
+    common.HOME_DIR = str(tmpdir)
+
+    servers = []
+    try:
+        for address in (str(tmpdir.join('server.sock')), '127.0.0.1:0'):
+            hosts_dir.remove()
+            hosts_dir.ensure(dir=True)
+            del created[:]
+
+            queue = JobQueue(tmpdir.join(f'jobs{len(servers)}.sqlite'))
+            server = Server(address=address, max_jobs=2, queue=queue)
+            servers.append(server)
+            Thread(target=server.serve_forever, daemon=True).start()
+            for _ in range(100):
+                if server._http_server is not None:
+                    break
+                sleep(0.01)
+            client = Client(server.address)
+
+            # Test: Init host
+            name = client.run('init', application='app', provider='provider')
+            assert name and client.list_hosts() == [name]
+            assert client.run('init', 'host', application='app') == 'host'
+            assert sorted(client.list_hosts()) == sorted([name, 'host'])
+
+            # Test: Run action
+            assert client.run('plan', 'host') == 'plan host'
+            assert client.run('build', 'host') == 'image'
+            assert client.get_outputs('host')['public_ip'] is None
+            assert client.run('apply', 'host') is None
+            assert client.get_outputs('host')['public_ip'] == '127.0.0.1'
+
+            # Test: Host is kept in memory
+            assert created.count('host') == 1
+
+            # Test: Errors
+            with pytest.raises(RuntimeException):
+                client.run('build', 'host', update_application=True)
+            with pytest.raises(ConfigurationException):
+                client.run('plan', 'not_exists')
+            with pytest.raises(ConfigurationException):
+                client.run('not_exists', 'host')
+            with pytest.raises(ConfigurationException):
+                client.run('plan')
+            with pytest.raises(RuntimeException):
+                client.get_job('not_exists')
+            with pytest.raises(RuntimeException):
+                client.request('GET', '/not_exists')
+            with pytest.raises(ConfigurationException):
+                client.run('init', 'host', application='app',
+                           keep_config=False)
+
+            # Test: Requests from web browsers or without token are rejected
+            def raw_request(method='GET', path='/hosts', **headers):
+                """Request without the client and returns status"""
+                connection = accelpy_server._connection(server.address)
+                try:
+                    connection.request(method, path, body=b'{}',
+                                       headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    return response.status
+                finally:
+                    connection.close()
+
+            tcp = not address.endswith('.sock')
+            token = f'Bearer {server.token}' if tcp else ''
+            assert raw_request(Authorization=token) == 200
+            assert raw_request(Host='evil.com', Authorization=token) == 403
+            assert raw_request(
+                'POST', '/jobs', Authorization=token,
+                **{'Content-Type': 'text/plain'}) == 415
+            if tcp:
+                assert raw_request() == 401
+                assert raw_request(Authorization='Bearer invalid') == 401
+                assert raw_request(path='/metrics') == 200
+                assert tmpdir.join('server.token').stat().mode & 0o777 == \
+                    0o600
+
+            # Test: Jobs concurrency is limited
+            del running_max[:]
+            for index in range(3):
+                client.run('init', f'host{index}', application='app')
+            jobs = [client.run('plan', f'host{index}', wait=False)
+                    for index in range(3)]
+            for job in jobs:
+                while client.get_job(job['id'], wait=1)['status'] != \
+                        'succeeded':
+                    continue
+            assert max(running_max) == 2
+
+            # Test: Jobs on the same host run sequentially
+            del running_max[:]
+            jobs = [client.run('plan', 'host', wait=False) for _ in range(2)]
+            for job in jobs:
+                assert client.get_job(job['id'], wait=5)['result'] == \
+                    'plan host'
+            assert max(running_max) == 1
+            assert len(client.request('GET', '/jobs')) > 4
+
+            # Test: Metrics
+            connection = accelpy_server._connection(server.address)
+            try:
+                connection.request('GET', '/metrics')
+                response = connection.getresponse()
+                assert response.status == 200
+                assert response.getheader('Content-Type').startswith(
+                    'text/plain')
+                response.read()
+            finally:
+                connection.close()
+
+            # Test: Command line thin client
+            args = Namespace(action='public_ip', name='host')
+            assert accelpy_main._remote_action(
+                server.address, args) == '127.0.0.1'
+            assert tmpdir.join('hosts/latest').read() == 'host'
+
+            args = Namespace(action='list', name=None)
+            assert 'host' in accelpy_main._remote_action(
+                server.address, args).split()
+
+            args = Namespace(action='destroy', name='host', quiet=True,
+                             delete=True)
+            accelpy_main._remote_action(server.address, args)
+            assert not hosts_dir.join('host').exists()
+
+            args = Namespace(action='init', name=None, application='app',
+                             provider=None, user_config=None)
+            name = accelpy_main._remote_action(server.address, args)
+            assert hosts_dir.join(name).isdir()
+
+            args = Namespace(action='public_ip', name=name)
+            with pytest.raises(ConfigurationException):
+                accelpy_main._remote_action(server.address, args)
+
+            server.shutdown()
+
+        # Test: Only loopback TCP addresses
+        for address in ('0.0.0.0:8000', '192.168.0.1:8000', 'example.com:80'):
+            with pytest.raises(ConfigurationException):
+                Server(address=address)
+        Server(address='localhost:0', queue=queue)
+
+        # Test: Unix socket removed on shutdown
+        assert not tmpdir.join('server.sock').exists()
+
+        # Test: Server not available
+        with pytest.raises(RuntimeException):
+            Client(str(tmpdir.join('server.sock'))).list_hosts()
+
+    finally:
+        for server in servers:
+            server.shutdown()
+        accelpy_server.Host = server_host
+        accelpy_jobs.Host = jobs_host
+        accelpy_server._iter_hosts_names = server_iter_hosts_names
+        common.HOME_DIR = common_home_dir
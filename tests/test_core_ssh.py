@@ -0,0 +1,426 @@
+# coding=utf-8
+"""SSH commands tests"""
+import pytest
+
+
+def mock_applied_host(config_dir, name, **outputs):
+    """
+    Mock an host configuration with a Terraform state.
+
+    Args:
+        config_dir (py.path.local): Hosts configurations directory.
+        name (str): Host name.
+        outputs: Override Terraform outputs.
+    """
+    from accelpy._common import json_write
+
+    values = dict(host_public_ip='127.0.0.1', host_private_ip='10.0.0.1',
+                  remote_user='user', host_ssh_private_key='./ssh_private.pem')
+    values.update(outputs)
+    json_write({'version': 4, 'outputs': {
+        key: {'value': value, 'type': 'string'}
+        for key, value in values.items()}},
+        config_dir.join(name).ensure(dir=True).join('terraform.tfstate'))
+
+
+def mock_ssh(tmpdir):
+    """
+    Mock the SSH client with a script that runs the command locally and
+    simulates master connections.
+
+    Commands run in a directory per host, named with the last number of the
+    host address, and connections are logged in the "connections" file.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+
+    Returns:
+        str: SSH client path.
+    """
+    from os import chmod
+    from sys import executable
+
+    ssh = tmpdir.join('ssh')
+    remote = tmpdir.join('remote').ensure(dir=True)
+    ssh.write('\n'.join((
+        f'#!{executable}',
+        'import os, sys',
+        f'remote = {str(remote)!r}',
+        'args = sys.argv[1:]',
+        'index = args.index("--")',
+        'options, destination, command = (',
+        '    args[:index], args[index + 1], args[index + 2:])',
+        'address = destination.split("@", 1)[1]',
+        'config = dict(options[i + 1].split("=", 1)',
+        '              for i, arg in enumerate(options) if arg == "-o")',
+        'if "-i" in options:',
+        '    key = options[options.index("-i") + 1]',
+        '    with open(os.path.join(os.path.dirname(key), "destination"),',
+        '              "wt") as file:',
+        '        file.write(destination)',
+        'if "ControlPath" in config:',
+        '    socket = config["ControlPath"].replace("%h", address)',
+        '    if "-O" in options:',
+        '        exists = os.path.exists(socket)',
+        '        if exists and options[options.index("-O") + 1] == "exit":',
+        '            os.remove(socket)',
+        '        sys.exit(0 if exists else 255)',
+        '    open(socket, "a").close()',
+        'if "-N" in options:',
+        '    sys.exit(0)',
+        'with open(os.path.join(remote, "connections"), "at") as file:',
+        '    file.write(destination + "\\n")',
+        'cwd = os.path.join(remote, address.rsplit(".", 1)[-1])',
+        'os.makedirs(cwd, exist_ok=True)',
+        'os.chdir(cwd)',
+        'os.execvp("sh", ["sh", "-c", " ".join(command)])', '')))
+    chmod(ssh, 0o755)
+    return str(ssh)
+
+
+def test_execute(tmpdir, capsys):
+    """
+    Test commands execution on hosts.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+        capsys (_pytest.capture.CaptureFixture) capsys pytest fixture
+    """
+    from argparse import Namespace
+    from io import StringIO
+    import accelpy._common as common
+    import accelpy._host as accelpy_host
+    import accelpy._ssh as accelpy_ssh
+    from accelpy._ssh import execute, format_summary, get_connection
+    from accelpy.__main__ import _action_exec
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    # Mock config dir and SSH client
+    common_home_dir = common.HOME_DIR
+    common.HOME_DIR = str(tmpdir.join('home'))
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('home/hosts').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    ssh_executable = accelpy_ssh.SSH_EXECUTABLE
+    accelpy_ssh.SSH_EXECUTABLE = mock_ssh(tmpdir)
+
+    for name in ('web_1', 'web_2', 'db_1'):
+        mock_applied_host(config_dir, name)
+    config_dir.join('not_applied').ensure(dir=True)
+
+    try:
+        # Test: Connection information from Terraform state
+        connection = get_connection('web_1')
+        assert connection['address'] == '127.0.0.1'
+        assert connection['user'] == 'user'
+        assert connection['key'] == str(config_dir.join(
+            'web_1/ssh_private.pem'))
+        assert get_connection('web_1', private_ip=True)['address'] == \
+            '10.0.0.1'
+        with pytest.raises(ConfigurationException):
+            get_connection('not_applied')
+
+        # Test: Run on hosts matching a pattern, with prefixed outputs
+        file = StringIO()
+        results = execute('echo hello; echo world', hosts='web_*', file=file)
+        assert [result['host'] for result in results] == ['web_1', 'web_2']
+        assert all(result['returncode'] == 0 for result in results)
+        assert all(result['error'] is None for result in results)
+        lines = file.getvalue().splitlines()
+        assert len(lines) == 4
+        assert 'web_1 | hello' in lines
+        assert lines.index('web_2 | hello') < lines.index('web_2 | world')
+        assert config_dir.join('web_1/destination').read().strip() == \
+            'user@127.0.0.1'
+
+        # Test: Private IP
+        execute(['true'], hosts='db_1', private_ip=True, file=file)
+        assert config_dir.join('db_1/destination').read().strip() == \
+            'user@10.0.0.1'
+
+        # Test: Failures, timeout and not applied hosts
+        results = {result['host']: result for result in execute(
+            'sleep 5', hosts='db_1,not_applied', timeout=0.2, file=file)}
+        assert results['db_1']['returncode'] != 0
+        assert results['db_1']['error'].startswith('Timed out')
+        assert results['db_1']['duration'] < 5
+        assert results['not_applied']['returncode'] is None
+        assert 'not applied' in results['not_applied']['error']
+        summary = format_summary(list(results.values())).splitlines()
+        assert summary[1].startswith('not_applied     -')
+
+        # Test: No matching host
+        with pytest.raises(ConfigurationException):
+            execute('true', hosts='not_exists*')
+
+        # Test: Command line
+        def cli_exec(*command, hosts='all'):
+            """Run "accelpy exec" and return outputs"""
+            _action_exec(Namespace(command=list(command), hosts=hosts, jobs=2,
+                                   private_ip=False, timeout=None))
+
+        cli_exec('exit', '$(test -f ~/not_exists && echo 1 || echo 0)',
+                 hosts='web_1,db_1')
+        captured = capsys.readouterr()
+        assert captured.err.splitlines()[0].startswith('db_1   ')
+
+        with pytest.raises(RuntimeException):
+            cli_exec('exit 1', hosts='web_*')
+
+    finally:
+        common.HOME_DIR = common_home_dir
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_ssh.SSH_EXECUTABLE = ssh_executable
+
+
+def test_master(tmpdir):
+    """
+    Test SSH master connections management.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from argparse import Namespace
+    from os import environ
+    import accelpy._common as common
+    import accelpy._host as accelpy_host
+    import accelpy._ssh as accelpy_ssh
+    from accelpy._ansible import Ansible
+    from accelpy._ssh import (
+        close_master, control_path, open_master, master_options, PERSIST_ENV)
+    from accelpy.__main__ import _action_ssh
+
+    # Mock config dir and SSH client
+    common_home_dir = common.HOME_DIR
+    common.HOME_DIR = str(tmpdir.join('home'))
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('home/hosts').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    ssh_executable = accelpy_ssh.SSH_EXECUTABLE
+    accelpy_ssh.SSH_EXECUTABLE = mock_ssh(tmpdir)
+    persist_env = environ.pop(PERSIST_ENV, None)
+
+    mock_applied_host(config_dir, 'host', host_private_ip='127.0.0.1')
+    host_dir = config_dir.join('host')
+    socket = host_dir.join('ssh-127.0.0.1')
+
+    try:
+        # Test: Sockets in host configuration directory, or temporary
+        # directory if path is too long
+        assert control_path(str(host_dir)) == str(host_dir.join('ssh-%h'))
+        long_path = control_path('/' + 'a' * 100)
+        assert long_path.endswith('-%h') and len(long_path) < 60
+
+        # Test: Master lifetime
+        assert 'ControlPersist=30m' in master_options(str(host_dir))
+        assert 'ControlPersist=1h' in master_options(str(host_dir), '1h')
+        environ[PERSIST_ENV] = '2h'
+        assert 'ControlPersist=2h' in master_options(str(host_dir))
+
+        # Test: Ansible reuses master connection
+        ssh_args = Ansible.environment(host_dir)['ANSIBLE_SSH_ARGS']
+        assert f'-o ControlPath={host_dir}/ssh-%h' in ssh_args
+        assert '-o ControlPersist=2h' in ssh_args
+
+        # Test: Start master connection
+        assert open_master('host')
+        assert socket.exists()
+        assert not open_master('host')
+
+        # Test: Close master connections
+        assert close_master('host') == 1
+        assert not socket.exists()
+        assert close_master('host') == 0
+        assert close_master('not_applied') == 0
+
+        # Test: Command line
+        def cli_ssh(*command, close=False):
+            """Run "accelpy ssh" and return outputs"""
+            return _action_ssh(Namespace(
+                command=list(command), name='host', close=close,
+                private_ip=False, persist=None))
+
+        assert cli_ssh('exit 0') is None
+        assert socket.exists()
+        with pytest.raises(SystemExit) as exception:
+            cli_ssh('exit 3')
+        assert exception.value.code == 3
+        assert cli_ssh(close=True).startswith('1 ')
+        assert not socket.exists()
+
+    finally:
+        common.HOME_DIR = common_home_dir
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_ssh.SSH_EXECUTABLE = ssh_executable
+        if persist_env is None:
+            environ.pop(PERSIST_ENV, None)
+        else:
+            environ[PERSIST_ENV] = persist_env
+
+
+def test_push_files(tmpdir):
+    """
+    Test files distribution to hosts.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from argparse import Namespace
+    from io import StringIO
+    from os import chmod, urandom
+    import accelpy._common as common
+    import accelpy._distribute as accelpy_distribute
+    import accelpy._host as accelpy_host
+    import accelpy._ssh as accelpy_ssh
+    from accelpy._common import json_read, json_write
+    from accelpy._distribute import format_summary, push_files
+    from accelpy.__main__ import _action_push_files
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    # Mock config dir, SSH client and SSH agent
+    common_home_dir = common.HOME_DIR
+    common.HOME_DIR = str(tmpdir.join('home'))
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('home/hosts').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    ssh_executable = accelpy_ssh.SSH_EXECUTABLE
+    relay_ssh_executable = accelpy_distribute.RELAY_SSH_EXECUTABLE
+    ssh = accelpy_ssh.SSH_EXECUTABLE = \
+        accelpy_distribute.RELAY_SSH_EXECUTABLE = mock_ssh(tmpdir)
+    ssh_agent_executable = accelpy_distribute.SSH_AGENT_EXECUTABLE
+    ssh_add_executable = accelpy_distribute.SSH_ADD_EXECUTABLE
+    agent = tmpdir.join('ssh-agent')
+    agent.write('#!/bin/sh\necho "SSH_AUTH_SOCK=/tmp/agent; export '
+                'SSH_AUTH_SOCK;"\necho "SSH_AGENT_PID=1; export '
+                'SSH_AGENT_PID;"\n')
+    chmod(agent, 0o755)
+    accelpy_distribute.SSH_AGENT_EXECUTABLE = str(agent)
+    accelpy_distribute.SSH_ADD_EXECUTABLE = 'true'
+
+    # Mock hosts, "other" is in another private network
+    for index in range(1, 9):
+        name = f'node_{index}' if index < 8 else 'other'
+        mock_applied_host(config_dir, name, host_public_ip=f'127.0.0.{index}',
+                          host_private_ip=f'10.0.0.{index}')
+        json_write(dict(provider='testing' if index < 8 else 'other'),
+                   config_dir.join(name, 'user_parameters.json'))
+    config_dir.join('not_applied').ensure(dir=True)
+
+    # Mock hosts without provider, and without private IP
+    for index in (9, 10):
+        mock_applied_host(config_dir, f'isolated_{index}',
+                          host_public_ip=f'127.0.0.{index}')
+    mock_applied_host(config_dir, 'public_only', host_public_ip='127.0.0.11')
+    state = config_dir.join('public_only', 'terraform.tfstate')
+    outputs = json_read(state)
+    del outputs['outputs']['host_private_ip']
+    json_write(outputs, state)
+    json_write(dict(provider='testing'),
+               config_dir.join('public_only', 'user_parameters.json'))
+
+    remote = tmpdir.join('remote')
+    connections = remote.join('connections')
+    files = tmpdir.join('files').ensure(dir=True)
+    content = urandom(300000)
+    files.join('a.bin').write_binary(content)
+    files.join('b.txt').write('b')
+    paths = [str(files.join('a.bin')), str(files.join('b.txt'))]
+    size = len(content) + 1
+
+    try:
+        # Test: Corrupted partially transferred file, without retries
+        remote.join('4/dest').ensure(dir=True).join('a.bin.part').write(
+            'corrupted')
+        result = push_files(paths, 'dest', hosts='node_4', retries=0,
+                            file=StringIO())[0]
+        assert result['error'] == 'Checksum mismatch: a.bin'
+        assert not remote.join('4/dest/a.bin.part').exists()
+
+        # Test: Distribution over relays with resumed transfer
+        remote.join('3/dest').ensure(dir=True).join('a.bin.part').write_binary(
+            content[:1000])
+        connections.remove()
+        file = StringIO()
+        results = push_files(paths, 'dest', hosts='node_*,other', seeds=1,
+                             fanout=1, file=file)
+        assert [result['host'] for result in results] == [
+            f'node_{index}' for index in range(1, 8)] + ['other']
+        assert all(result['error'] is None for result in results)
+        for index in range(1, 9):
+            dest = remote.join(f'{index}/dest')
+            assert dest.join('a.bin').read_binary() == content
+            assert dest.join('b.txt').read() == 'b'
+            assert not dest.join('a.bin.part').exists()
+        results = {result['host']: result for result in results}
+        assert results['node_3']['sent'] == size - 1000
+        assert results['node_1']['sent'] == size
+        assert len(file.getvalue().splitlines()) == 8
+
+        # Relays forward to private IP of hosts of the same provider
+        assert sum(1 for result in results.values() if result['source']) >= 3
+        assert results['other']['source'] is None
+        logged = connections.read().splitlines()
+        assert any(line.startswith('user@10.0.0.') for line in logged)
+        assert 'user@10.0.0.8' not in logged
+
+        # Test: Files already on hosts are skipped
+        results = push_files(paths, 'dest', file=StringIO(),
+                             hosts='node_*,other')
+        assert all(result['sent'] == 0 for result in results)
+
+        # Test: Controller only
+        results = push_files(paths[1:], 'other_dest', fanout=0, seeds=4,
+                             hosts='node_*', file=StringIO())
+        assert all(result['source'] is None and result['sent'] == 1
+                   for result in results)
+
+        # Test: No relay between hosts without provider, or to hosts without
+        # private IP
+        connections.remove()
+        results = push_files(paths, 'dest', seeds=1, fanout=2, file=StringIO(),
+                             hosts='node_1,isolated_*,public_only')
+        assert all(result['error'] is None and result['source'] is None
+                   for result in results)
+        assert not any(line.startswith('user@10.0.0.')
+                       for line in connections.read().splitlines())
+
+        # Test: Private IP is not required without relays
+        results = push_files(paths, 'other_dest', fanout=0, file=StringIO(),
+                             hosts='public_only')
+        assert results[0]['error'] is None
+        assert remote.join('11/other_dest/a.bin').read_binary() == content
+
+        # Test: Invalid parameters
+        for kwargs in (dict(files=[str(files.join('not_exists'))]),
+                       dict(files=[]), dict(files=paths * 2),
+                       dict(files=paths, seeds=0)):
+            with pytest.raises(ConfigurationException):
+                push_files(**kwargs)
+
+        # Test: Not applied hosts and command line
+        def cli_push_files(hosts):
+            """Run "accelpy push_files" """
+            _action_push_files(Namespace(
+                file=paths, destination='cli', hosts=hosts, seeds=None,
+                fanout=None, retries=None))
+
+        cli_push_files('node_1')
+        assert remote.join('1/cli/b.txt').exists()
+
+        with pytest.raises(RuntimeException):
+            cli_push_files('node_1,not_applied')
+
+        results = push_files(paths, 'dest', hosts='node_1,not_applied',
+                             file=StringIO())
+        assert 'not applied' in results[1]['error']
+        summary = format_summary(results).splitlines()
+        assert summary[0].startswith('node_1       controller')
+        assert 'not applied' in summary[1]
+
+    finally:
+        common.HOME_DIR = common_home_dir
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_ssh.SSH_EXECUTABLE = ssh_executable
+        accelpy_distribute.RELAY_SSH_EXECUTABLE = relay_ssh_executable
+        accelpy_distribute.SSH_AGENT_EXECUTABLE = ssh_agent_executable
+        accelpy_distribute.SSH_ADD_EXECUTABLE = ssh_add_executable
@@ -0,0 +1,126 @@
+# coding=utf-8
+"""Tracing tests"""
+import pytest
+
+
+def test_span(tmpdir):
+    """
+    Test spans and exporters.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from io import StringIO
+    from json import loads
+    from os import environ
+    from sys import executable
+    import accelpy._tracing as tracing
+    from accelpy._common import call, propagate_context
+    from accelpy._tracing import (
+        span, set_exporters, get_exporters, JsonLinesExporter,
+        OtlpJsonExporter, ConsoleExporter, TRACE_ENV)
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    exporters = tracing._exporters
+    trace_env = environ.get(TRACE_ENV)
+    try:
+        # Test: Tracing disabled
+        set_exporters()
+        with span('disabled', key='value') as current:
+            current.set_attribute('key', 'value')
+            assert tracing.current_span() is None
+
+        # Test: Spans with parents, attributes and errors
+        jsonl = tmpdir.join('trace.jsonl')
+        otlp = tmpdir.join('trace.otlp.json')
+        console = StringIO()
+        set_exporters(JsonLinesExporter(str(jsonl)),
+                      OtlpJsonExporter(str(otlp)), ConsoleExporter(console))
+
+        def child(index):
+            """Child span run in another thread"""
+            with span('child', index=index):
+                call([executable, '-c', 'pass'])
+
+        with span('root', host='host') as root:
+            assert tracing.current_span() is root
+            with ThreadPoolExecutor() as executor:
+                for future in [executor.submit(propagate_context(child), index)
+                               for index in range(2)]:
+                    future.result()
+            with pytest.raises(RuntimeException):
+                call([executable, '-c', 'exit(1)'], retries=1)
+            root.set_attribute('ratio', 0.5)
+        assert tracing.current_span() is None
+
+        spans = {}
+        for line in jsonl.readlines():
+            item = loads(line)
+            spans.setdefault(item['name'], []).append(item)
+        root = spans['root'][0]
+        assert root['parent_id'] is None
+        assert root['attributes'] == dict(host='host', ratio=0.5)
+        assert root['end'] >= root['start'] and root['status'] == 'ok'
+        assert len(spans['child']) == 2
+        for item in spans['child']:
+            assert item['parent_id'] == root['span_id']
+            assert item['trace_id'] == root['trace_id']
+        calls = spans['call']
+        assert len(calls) == 3
+        assert {item['parent_id'] for item in calls} == {
+            root['span_id']} | {item['span_id'] for item in spans['child']}
+        failed = [item for item in calls if item['status'] == 'error']
+        assert len(failed) == 1
+        assert failed[0]['error'].startswith('RuntimeException')
+        assert failed[0]['attributes']['returncode'] == 1
+        assert failed[0]['attributes']['retries'] == 1
+
+        request = loads(otlp.read())
+        scope_spans = request['resourceSpans'][0]['scopeSpans'][0]
+        assert scope_spans['scope']['name'] == 'accelpy'
+        otlp_spans = {item['name']: item for item in scope_spans['spans']}
+        assert len(scope_spans['spans']) == 6
+        assert otlp_spans['root']['traceId'] == root['trace_id']
+        assert 'parentSpanId' not in otlp_spans['root']
+        assert otlp_spans['child']['parentSpanId'] == root['span_id']
+        assert otlp_spans['root']['startTimeUnixNano'] == str(root['start'])
+        assert {'key': 'host', 'value': {'stringValue': 'host'}} in \
+            otlp_spans['root']['attributes']
+        assert {'key': 'ratio', 'value': {'doubleValue': 0.5}} in \
+            otlp_spans['root']['attributes']
+
+        lines = console.getvalue().splitlines()
+        assert lines[0].startswith('root ') and lines[0].endswith('s')
+        assert lines[1].startswith('  child ')
+        assert lines[2].startswith('    call ')
+        assert sum(line.endswith('(error)') for line in lines) == 1
+
+        # Test: Exporters errors does not stop the traced operation
+        set_exporters(JsonLinesExporter(str(tmpdir.join('not_exists/file'))))
+        with pytest.warns(RuntimeWarning):
+            with span('root'):
+                pass
+
+        # Test: Exporters configured from environment
+        tracing._exporters = None
+        environ[TRACE_ENV] = f'console, jsonl:{jsonl}'
+        assert [exporter.__class__ for exporter in get_exporters()] == [
+            ConsoleExporter, JsonLinesExporter]
+
+        for value in ('jsonl', 'not_exists:path'):
+            tracing._exporters = None
+            environ[TRACE_ENV] = value
+            with pytest.raises(ConfigurationException):
+                get_exporters()
+
+        tracing._exporters = None
+        del environ[TRACE_ENV]
+        assert get_exporters() == []
+
+    finally:
+        tracing._exporters = exporters
+        if trace_env is None:
+            environ.pop(TRACE_ENV, None)
+        else:
+            environ[TRACE_ENV] = trace_env